@@ -0,0 +1,113 @@
+"""
+Benchmark: the daily pre-generation job and artifact lookups.
+
+- job: pregenerate.generate() for all 48 readings against the fake LLM
+  (--latency-ms per call), at each --concurrency level
+- lookup: microseconds per reading served from the memory-mapped
+  artifact, vs the serialized mock horoscope
+- endpoint: /api/quick-horoscope in-process, served from the artifact,
+  with the upstream LLM calls made while serving (should be 0)
+
+    python benchmarks/bench_daily.py [--latency-ms 300] [--concurrency 1 8]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+DIRECTORY = tempfile.mkdtemp(prefix="astralsage-daily-")
+
+
+def bench_job(day, concurrency: int) -> tuple[dict, dict]:
+    import pregenerate
+
+    begin = time.perf_counter()
+    entries, failed = asyncio.run(pregenerate.generate(day, concurrency))
+    seconds = time.perf_counter() - begin
+    row = {"entries": len(entries), "failed": len(failed), "seconds": round(seconds, 2)}
+    return row, entries
+
+
+def bench_lookup(day, repeat: int) -> dict:
+    import mock_readings
+    from daily_artifact import DailyArtifacts, artifact_key
+
+    artifacts = DailyArtifacts(DIRECTORY)
+    key = artifact_key("quick_horoscope", "Leo", "today")
+    rows = {}
+    for name, lookup in (
+        ("artifact", lambda: artifacts.reading(day, key)),
+        ("mock", lambda: mock_readings.horoscope_json("Leo", "today")),
+    ):
+        begin = time.perf_counter()
+        for _ in range(repeat):
+            lookup()
+        rows[f"{name}_us"] = (time.perf_counter() - begin) / repeat * 1e6
+    return rows
+
+
+def bench_endpoint(requests: int) -> dict:
+    import httpx
+
+    import llm
+    import main
+
+    calls = llm.upstream.calls
+
+    async def run() -> float:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+            begin = time.perf_counter()
+            for i in range(requests):
+                body = {"sign": "Leo", "period": ("today", "this_week")[i % 2]}
+                (await c.post("/api/quick-horoscope", json=body)).raise_for_status()
+            return time.perf_counter() - begin
+
+    seconds = asyncio.run(run())
+    return {
+        "requests_per_s": requests / seconds,
+        "llm_calls": llm.upstream.calls - calls,
+        "artifact_hits": main.daily_artifacts.hits,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    os.environ.update(
+        FAKE_LLM="true",
+        FAKE_LLM_LATENCY_MS=str(args.latency_ms),
+        FAKE_LLM_JITTER_MS="0",
+        GEMINI_MAX_CONCURRENCY=str(max(args.concurrency)),
+        NATAL_CACHE_PATH="",
+        HOROSCOPE_PREWARM="false",
+        DAILY_ARTIFACT_DIR=DIRECTORY,
+        RATE_LIMIT_PER_MINUTE="0",
+        DEDUPE_WINDOW_SECONDS="0",
+    )
+
+    import main
+    from daily_artifact import artifact_path, write_artifact
+
+    day = main.horoscope_cache.today()
+    for concurrency in args.concurrency:
+        row, entries = bench_job(day, concurrency)
+        print(json.dumps({"bench": "job", "concurrency": concurrency, **row}))
+    size = write_artifact(artifact_path(DIRECTORY, day), day, entries)
+    print(json.dumps({"bench": "artifact", "entries": len(entries), "bytes": size}))
+    for name, row in (
+        ("lookup", bench_lookup(day, 20000)),
+        ("endpoint", bench_endpoint(args.requests)),
+    ):
+        row = {k: round(v, 2) if isinstance(v, float) else v for k, v in row.items()}
+        print(json.dumps({"bench": name, **row}))
+    shutil.rmtree(DIRECTORY)
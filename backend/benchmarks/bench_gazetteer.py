@@ -0,0 +1,108 @@
+"""
+Benchmark: the offline gazetteer.
+
+- index: time to build the index from data/*.tsv, its size, and the time
+  to map it (what the first lookup in a worker pays), vs parsing the
+  TSV into a dict
+- lookup: microseconds per resolve() (exact name, alternate name,
+  misspelling, cached) and per suggest() for a 2-letter prefix
+- endpoint: /api/places in-process, requests per second
+
+    python benchmarks/bench_gazetteer.py [--repeat 5000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+DIRECTORY = tempfile.mkdtemp(prefix="astralsage-gazetteer-")
+os.environ.update(
+    GEMINI_API_KEY="",
+    FAKE_LLM="false",
+    HOROSCOPE_PREWARM="false",
+    GAZETTEER_PATH=os.path.join(DIRECTORY, "gazetteer.idx"),
+    RATE_LIMIT_PER_MINUTE="0",
+)
+
+import gazetteer  # noqa: E402
+
+
+def elapsed_ms(run) -> float:
+    begin = time.perf_counter()
+    run()
+    return (time.perf_counter() - begin) * 1e3
+
+
+def tsv_dict() -> dict:
+    places = {}
+    for name, alternates, *fields in gazetteer._rows(gazetteer.CITIES_PATH):
+        for alias in (name, *alternates.split(",")):
+            places.setdefault(gazetteer.normalize(alias), []).append((name, *fields))
+    return places
+
+
+def bench_index() -> dict:
+    path = gazetteer.GAZETTEER_PATH
+    return {
+        "build_ms": elapsed_ms(lambda: gazetteer.build(path)),
+        "bytes": os.path.getsize(path),
+        "records": len(gazetteer.Gazetteer(path)),
+        "map_ms": elapsed_ms(lambda: gazetteer.Gazetteer(path)),
+        "tsv_dict_ms": elapsed_ms(tsv_dict),
+    }
+
+
+def bench_lookup(repeat: int) -> dict:
+    index = gazetteer.get()
+    rows = {}
+    for name, lookup in (
+        ("exact", lambda: index.resolve("Chennai", "India")),
+        ("alternate", lambda: index.resolve("Madras", "")),
+        ("fuzzy", lambda: index.resolve("Chenai", "India")),
+        ("cached", lambda: gazetteer.resolve("Chennai", "India")),
+        ("suggest", lambda: index.suggest("ch")),
+    ):
+        begin = time.perf_counter()
+        for _ in range(repeat):
+            lookup()
+        rows[f"{name}_us"] = (time.perf_counter() - begin) / repeat * 1e6
+    return rows
+
+
+def bench_endpoint(requests: int) -> dict:
+    import httpx
+
+    import main
+
+    async def run() -> float:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+            begin = time.perf_counter()
+            for i in range(requests):
+                q = ("ch", "mum", "san f", "kol")[i % 4]
+                (await c.get("/api/places", params={"q": q})).raise_for_status()
+            return time.perf_counter() - begin
+
+    return {"requests_per_s": requests / asyncio.run(run())}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, row in (
+        ("index", bench_index()),
+        ("lookup", bench_lookup(args.repeat)),
+        ("endpoint", bench_endpoint(args.requests)),
+    ):
+        row = {k: round(v, 2) if isinstance(v, float) else v for k, v in row.items()}
+        print(json.dumps({"bench": name, **row}))
+    shutil.rmtree(DIRECTORY)
@@ -0,0 +1,84 @@
+"""
+Benchmark: cacheable GET readings.
+
+- stability: distinct bodies and ETags over repeated requests, POST vs GET
+  (a CDN or browser can only reuse a response whose ETag repeats)
+- endpoint: requests per second in-process for POST, GET, and GET with
+  If-None-Match (304, no body), for quick horoscope and daily transits
+- bytes: response bytes per request, 200 vs 304
+
+    python benchmarks/bench_http_cache.py [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.update(
+    GEMINI_API_KEY="",
+    FAKE_LLM="false",
+    HOROSCOPE_PREWARM="false",
+    NATAL_CACHE_PATH="",
+    RATE_LIMIT_PER_MINUTE="0",
+    DEDUPE_WINDOW_SECONDS="0",
+)
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+
+ENDPOINTS = {
+    "/api/quick-horoscope": {"sign": "Leo", "period": "today"},
+    "/api/daily-transits": {"sign": "Leo"},
+}
+
+
+async def send(c, path: str, params: dict, mode: str, etag: str = ""):
+    if mode == "post":
+        return await c.post(path, json=params)
+    headers = {"If-None-Match": etag} if mode == "conditional" else {}
+    return await c.get(path, params=params, headers=headers)
+
+
+async def run(requests: int) -> list[dict]:
+    rows = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+        for path, params in ENDPOINTS.items():
+            etag = (await c.get(path, params=params)).headers["etag"]
+            for mode in ("post", "get", "conditional"):
+                bodies, etags, size = set(), set(), 0
+                begin = time.perf_counter()
+                for _ in range(requests):
+                    r = await send(c, path, params, mode, etag)
+                    bodies.add(r.content)
+                    etags.add(r.headers.get("etag"))
+                    size += len(r.content)
+                seconds = time.perf_counter() - begin
+                rows.append(
+                    {
+                        "endpoint": path,
+                        "mode": mode,
+                        "status": r.status_code,
+                        "requests_per_s": requests / seconds,
+                        "distinct_bodies": len(bodies),
+                        "distinct_etags": len(etags - {None}),
+                        "bytes_per_request": size / requests,
+                    }
+                )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    for row in asyncio.run(run(args.requests)):
+        row = {k: round(v, 2) if isinstance(v, float) else v for k, v in row.items()}
+        print(json.dumps({"bench": "endpoint", **row}))
+    print(json.dumps({"bench": "response_cache", **main.response_cache.stats()}))
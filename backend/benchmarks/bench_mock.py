@@ -0,0 +1,138 @@
+"""
+Benchmark: mock (demo/fallback) readings per second.
+
+Per-reading cost of building the reading dict and encoding it the way
+FastAPI does for a returned dict, versus splicing the pre-serialized
+fragments, then end-to-end requests/second for each endpoint in mock
+mode. The endpoint numbers run unchanged against older checkouts, which
+gives the before/after comparison.
+
+Runs the app in-process (httpx + ASGI transport), so numbers exclude
+network cost but include validation, routing and serialization.
+
+    python benchmarks/bench_mock.py [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Mock mode regardless of the local .env (dotenv never overrides these),
+# without the per-client limits a benchmark client would run into
+os.environ.update(
+    GEMINI_API_KEY="",
+    FAKE_LLM="false",
+    RATE_LIMIT_PER_MINUTE="0",
+    DEDUPE_WINDOW_SECONDS="0",
+)
+
+import httpx  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import main  # noqa: E402
+
+PLACE = {"city": "Chennai", "country": "India", "lat": 13.08, "lon": 80.27}
+
+ENDPOINTS = {
+    "/api/quick-horoscope": {"sign": "Leo", "period": "today"},
+    "/api/transit-forecast": {
+        "birth_date": "2004-08-15",
+        "birth_place": PLACE,
+        "focus": "career",
+    },
+    "/api/compatibility": {
+        "person_a_name": "Asha",
+        "person_a_birth_date": "2004-08-15",
+        "person_a_birth_place": PLACE,
+        "person_b_name": "Ravi",
+        "person_b_birth_date": "2005-01-02",
+        "person_b_birth_place": PLACE,
+        "focus": "friendship",
+    },
+    "/api/natal-chart": {
+        "name": "Asha",
+        "birth_date": "2004-08-15",
+        "birth_time": "14:30",
+        "birth_timezone": "+05:30",
+        "birth_place": PLACE,
+    },
+}
+
+
+def per_reading_us(fn, number: int = 2000) -> float:
+    return round(min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6, 2)
+
+
+def reading_costs() -> list[dict]:
+    import mock_readings
+
+    natal_req = main.NatalChartRequest(**ENDPOINTS["/api/natal-chart"])
+    natal_parts = main.natal_mock_parts(
+        natal_req, main.compute_natal_analysis(natal_req)
+    )
+    compat_req = main.CompatibilityRequest(**ENDPOINTS["/api/compatibility"])
+    compat_parts = main.compatibility_mock_parts(
+        compat_req, main.compute_synastry(compat_req)
+    )
+
+    def encoded(build):
+        return lambda: JSONResponse(jsonable_encoder(build())).body
+
+    cases = {
+        "horoscope": (
+            lambda: mock_readings.horoscope_reading("Leo", "today"),
+            lambda: mock_readings.horoscope_json("Leo", "today"),
+        ),
+        "natal": (
+            lambda: mock_readings.natal_reading(*natal_parts),
+            lambda: mock_readings.natal_json(*natal_parts),
+        ),
+        "compatibility": (
+            lambda: mock_readings.compatibility_reading(*compat_parts),
+            lambda: mock_readings.compatibility_json(*compat_parts),
+        ),
+    }
+    return [
+        {
+            "reading": name,
+            "dict_and_encode_us": per_reading_us(encoded(build)),
+            "spliced_us": per_reading_us(splice),
+        }
+        for name, (build, splice) in cases.items()
+    ]
+
+
+async def endpoint_rates(n: int) -> list[dict]:
+    transport = httpx.ASGITransport(app=main.app)
+    rows = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        for url, payload in ENDPOINTS.items():
+            for _ in range(50):
+                (await c.post(url, json=payload)).raise_for_status()
+            start = time.perf_counter()
+            for _ in range(n):
+                (await c.post(url, json=payload)).raise_for_status()
+            rate = n / (time.perf_counter() - start)
+            rows.append({"endpoint": url, "requests_per_s": round(rate)})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    if os.path.exists(
+        os.path.join(os.path.dirname(__file__), "..", "mock_readings.py")
+    ):
+        for row in reading_costs():
+            print(json.dumps(row))
+    for row in asyncio.run(endpoint_rates(args.requests)):
+        print(json.dumps(row))
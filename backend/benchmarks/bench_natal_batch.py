@@ -0,0 +1,110 @@
+"""
+Benchmark: natal charts/second, single endpoint vs batch endpoint vs
+direct Python call, at 1, 1k and 100k inputs.
+
+Runs the app in-process (httpx + ASGI transport), so numbers exclude
+network cost but include validation, serialization and routing.
+
+    python benchmarks/bench_natal_batch.py [--sizes 1 1000 100000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.update(RATE_LIMIT_PER_MINUTE="0", DEDUPE_WINDOW_SECONDS="0")
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+
+# Single-request runs are capped; the rate is extrapolated beyond this
+SINGLE_ENDPOINT_SAMPLE = 2000
+
+
+def make_payloads(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(n):
+        payloads.append(
+            {
+                "name": "Bench",
+                "birth_date": f"{rng.randint(1940, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "birth_time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+                "birth_timezone": "+05:30",
+                "birth_place": {
+                    "city": "Chennai",
+                    "country": "India",
+                    "lat": round(rng.uniform(-60, 60), 2),
+                    "lon": round(rng.uniform(-180, 180), 2),
+                },
+            }
+        )
+    return payloads
+
+
+async def bench_single(client: httpx.AsyncClient, payloads: list[dict]) -> float:
+    sample = payloads[:SINGLE_ENDPOINT_SAMPLE]
+    start = time.perf_counter()
+    for payload in sample:
+        response = await client.post("/api/natal-chart", json=payload)
+        response.raise_for_status()
+    return len(sample) / (time.perf_counter() - start)
+
+
+async def bench_batch(client: httpx.AsyncClient, payloads: list[dict]) -> float:
+    start = time.perf_counter()
+    response = await client.post("/api/natal-chart/batch", json=payloads)
+    response.raise_for_status()
+    lines = response.content.count(b"\n")
+    assert lines == len(payloads), (lines, len(payloads))
+    return len(payloads) / (time.perf_counter() - start)
+
+
+def bench_function(payloads: list[dict]) -> float:
+    requests = [main.NatalChartRequest(**p) for p in payloads]
+    start = time.perf_counter()
+    main.compute_natal_charts(requests)
+    return len(payloads) / (time.perf_counter() - start)
+
+
+async def run(sizes: list[int]) -> list[dict]:
+    transport = httpx.ASGITransport(app=main.app)
+    rows = []
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        # Warm up routing, the threadpool and NumPy before timing anything
+        warmup = make_payloads(8, seed=1)
+        await bench_single(client, warmup)
+        await bench_batch(client, warmup)
+
+        for n in sizes:
+            payloads = make_payloads(n)
+            rows.append(
+                {
+                    "inputs": n,
+                    "single_endpoint_charts_per_s": round(
+                        await bench_single(client, payloads)
+                    ),
+                    "batch_endpoint_charts_per_s": round(
+                        await bench_batch(client, payloads)
+                    ),
+                    "python_function_charts_per_s": round(bench_function(payloads)),
+                }
+            )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 1000, 100000])
+    args = parser.parse_args()
+
+    for row in asyncio.run(run(args.sizes)):
+        print(json.dumps(row))
@@ -0,0 +1,101 @@
+"""
+Benchmark: recovering readings from malformed model output.
+
+For each kind of reply the fake LLM can produce (clean, fenced, wrapped
+in prose, trailing comma, a field left out, cut off), compares:
+- fence_strip: the old parser, strip ``` fences then json.loads
+- llm_json: llm_json.parse_object
+
+and prints what main.generate_reading makes of each result (a valid
+reading, the fields it would ask for again, or unparseable: the mock)
+and the parse cost in microseconds. A last line times the streaming
+extractor fed one reading in 16-byte chunks.
+
+    python benchmarks/bench_parse.py [--repeat 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.update(GEMINI_API_KEY="", FAKE_LLM="false", HOROSCOPE_PREWARM="false")
+
+import fake_llm  # noqa: E402
+import llm_json  # noqa: E402
+from main import MODEL_FIELDS, check_reading  # noqa: E402
+from serialization import loads  # noqa: E402
+
+CLEAN = json.dumps(fake_llm.READING)
+REPLIES = {"clean": CLEAN}
+REPLIES.update((f.__name__.strip("_"), f(CLEAN)) for f in fake_llm.MALFORMATIONS)
+
+
+def fence_strip(text: str):
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    try:
+        return loads(text.strip())
+    except ValueError:
+        return None
+
+
+def recover(text: str):
+    return llm_json.parse_object(text)[0]
+
+
+def outcome(result) -> str:
+    if not isinstance(result, dict):
+        return "unparseable"
+    reading, invalid = check_reading(result)
+    if reading:
+        return "valid"
+    missing = [name for name in MODEL_FIELDS if name in invalid]
+    return "rerequest " + ",".join(missing) if missing else "invalid"
+
+
+def cost_us(parse, text: str, repeat: int) -> float:
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        parse(text)
+    return round((time.perf_counter() - begin) / repeat * 1e6, 1)
+
+
+def stream_cost_us(repeat: int) -> float:
+    lines = "\n".join(json.dumps(line) for line in fake_llm.STREAM_LINES)
+    chunks = [lines[i : i + 16] for i in range(0, len(lines), 16)]
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        extractor = llm_json.ObjectExtractor()
+        for chunk in chunks:
+            for candidate in extractor.feed(chunk):
+                llm_json.parse_candidate(candidate)
+    return round((time.perf_counter() - begin) / repeat * 1e6, 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    for kind, text in REPLIES.items():
+        for name, parse in (("fence_strip", fence_strip), ("llm_json", recover)):
+            row = {
+                "reply": kind,
+                "parser": name,
+                "outcome": outcome(parse(text)),
+                "parse_us": cost_us(parse, text, args.repeat),
+            }
+            print(json.dumps(row))
+    print(
+        json.dumps(
+            {"reply": "stream", "chunks_of": 16, "us": stream_cost_us(args.repeat)}
+        )
+    )
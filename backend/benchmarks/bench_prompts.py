@@ -0,0 +1,118 @@
+"""
+Benchmark: prompt bytes and tokens sent upstream per endpoint.
+
+Calls each reading endpoint in-process against the fake LLM, records
+what reaches the model and prints one JSON line per endpoint:
+- system / system_bytes: whether the system instruction is pasted into
+  every prompt ("inline") or configured once on the model client
+- prompt_bytes / prompt_tokens: the prompt text built per call
+- input_tokens: everything the model reads per call, system
+  instruction included
+
+Tokens are estimated at 4 bytes per token.
+
+Point --backend at another checkout to compare, e.g. a worktree of an
+older commit:
+
+    python benchmarks/bench_prompts.py [--backend path/to/backend]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+BYTES_PER_TOKEN = 4
+
+PLACE = {"city": "Chennai", "country": "India", "lat": 13.08, "lon": 80.27}
+NATAL = {
+    "name": "Asha",
+    "birth_date": "2004-08-15",
+    "birth_time": "14:30",
+    "birth_timezone": "+05:30",
+    "birth_place": PLACE,
+}
+ENDPOINTS = {
+    "/api/natal-chart": NATAL,
+    "/api/quick-horoscope": {"sign": "Leo", "period": "today"},
+    "/api/compatibility": {
+        "person_a_name": "Asha",
+        "person_a_birth_date": "2004-08-15",
+        "person_a_birth_place": PLACE,
+        "person_b_name": "Ravi",
+        "person_b_birth_date": "2005-01-02",
+        "person_b_birth_place": PLACE,
+    },
+    "/api/transit-forecast": {**NATAL, "range": "7-day", "focus": "career"},
+}
+
+
+def tokens(n_bytes: int) -> int:
+    return round(n_bytes / BYTES_PER_TOKEN)
+
+
+async def capture(main, llm, path: str, body: dict) -> list[str]:
+    import httpx
+
+    model = await llm.get_model()
+    prompts = []
+    generate = model.generate_content_async
+
+    async def recording(prompt, *args, **kwargs):
+        prompts.append(prompt)
+        return await generate(prompt, *args, **kwargs)
+
+    model.generate_content_async = recording
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+        # Transit forecasts only reach the model when streamed
+        query = "?stream=ndjson" if path == "/api/transit-forecast" else ""
+        (await c.post(path + query, json=body)).raise_for_status()
+    model.generate_content_async = generate
+    return prompts
+
+
+def report(backend: str) -> list[dict]:
+    os.environ.update(
+        FAKE_LLM="true",
+        FAKE_LLM_LATENCY_MS="0",
+        FAKE_LLM_JITTER_MS="0",
+        NATAL_CACHE_PATH="",
+        HOROSCOPE_PREWARM="false",
+    )
+    sys.path.insert(0, backend)
+    os.chdir(backend)
+    import llm
+    import main
+
+    system = getattr(main, "SYSTEM_PROMPT", None) or __import__("prompts").SYSTEM_PROMPT
+    rows = []
+    for path, body in ENDPOINTS.items():
+        prompt = asyncio.run(capture(main, llm, path, body))[0]
+        inline = system in prompt
+        prompt_bytes = len(prompt.encode())
+        system_bytes = len(system.encode())
+        input_bytes = prompt_bytes if inline else prompt_bytes + system_bytes
+        rows.append(
+            {
+                "endpoint": path,
+                "system": "inline" if inline else "configured",
+                "system_bytes": system_bytes,
+                "prompt_bytes": prompt_bytes,
+                "prompt_tokens": tokens(prompt_bytes),
+                "input_tokens": tokens(input_bytes),
+            }
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--backend",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."),
+    )
+    args = parser.parse_args()
+    for row in report(os.path.abspath(args.backend)):
+        print(json.dumps(row))
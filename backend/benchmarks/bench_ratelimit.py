@@ -0,0 +1,119 @@
+"""
+Benchmark: rate limiting and POST deduplication overhead.
+
+- buckets: microseconds per TokenBuckets.take() for a known client, a
+  limited one, and a stream of new clients evicting idle ones from a
+  full table; and the table's memory per client slot
+- middleware: microseconds added per request by RateLimitMiddleware,
+  driven directly over ASGI around a no-op app, for a GET and for a
+  1 KB POST (read, digested and remembered for deduplication)
+
+    python benchmarks/bench_ratelimit.py [--repeat 100000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import ratelimit  # noqa: E402
+
+MAX_CLIENTS = 10000
+
+
+def bench_buckets(repeat: int) -> dict:
+    rows = {}
+    buckets = ratelimit.TokenBuckets(1e9, 10**9, MAX_CLIENTS)
+    limited = ratelimit.TokenBuckets(1e-9, 1, MAX_CLIENTS)
+    limited.take("ip:10.0.0.1", 0.0)
+    churn = ratelimit.TokenBuckets(1.0, 30, MAX_CLIENTS)
+    clients = [f"ip:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(repeat)]
+    for name, take in (
+        ("known", lambda i: buckets.take("ip:10.0.0.1", i)),
+        ("limited", lambda i: limited.take("ip:10.0.0.1", i)),
+        ("new_evicting", lambda i: churn.take(clients[i], i)),
+    ):
+        begin = time.perf_counter()
+        for i in range(repeat):
+            take(i)
+        rows[f"{name}_us"] = (time.perf_counter() - begin) / repeat * 1e6
+    rows["evicted"] = churn.evicted
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    table = ratelimit.TokenBuckets(1.0, 30, MAX_CLIENTS)
+    for i in range(MAX_CLIENTS):
+        table.take(clients[i], 0.0)
+    rows["bytes_per_client"] = (
+        tracemalloc.get_traced_memory()[0] - before
+    ) / MAX_CLIENTS
+    tracemalloc.stop()
+    return rows
+
+
+async def noop_app(scope, receive, send):
+    if scope["method"] == "POST":
+        while (await receive()).get("more_body"):
+            pass
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def scope_for(method: str, client: int) -> dict:
+    return {
+        "type": "http",
+        "method": method,
+        "path": "/api/quick-horoscope",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": (f"10.0.{client >> 8 & 255}.{client & 255}", 50000),
+    }
+
+
+async def drive(app, method: str, repeat: int) -> float:
+    async def send(message):
+        pass
+
+    begin = time.perf_counter()
+    for i in range(repeat):
+        # Distinct bodies, so every POST is digested and remembered
+        body = b'{"sign":"Leo","n":%d}' % i + b" " * 1000
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await app(scope_for(method, i % 1000), receive, send)
+    return (time.perf_counter() - begin) / repeat * 1e6
+
+
+def bench_middleware(repeat: int) -> dict:
+    limited = ratelimit.RateLimitMiddleware(
+        noop_app,
+        ratelimit.TokenBuckets(1e9, 10**9, MAX_CLIENTS),
+        ratelimit.RecentPosts(2.0),
+    )
+    rows = {}
+    for method in ("GET", "POST"):
+        bare = asyncio.run(drive(noop_app, method, repeat))
+        wrapped = asyncio.run(drive(limited, method, repeat))
+        rows[f"{method.lower()}_bare_us"] = bare
+        rows[f"{method.lower()}_overhead_us"] = wrapped - bare
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, row in (
+        ("buckets", bench_buckets(args.repeat)),
+        ("middleware", bench_middleware(args.repeat)),
+    ):
+        row = {k: round(v, 2) if isinstance(v, float) else v for k, v in row.items()}
+        print(json.dumps({"bench": name, **row}))
@@ -0,0 +1,110 @@
+"""
+Benchmark: JSON serialization cost per endpoint response size.
+
+For each response shape, times FastAPI's default path for a returned
+dict (jsonable_encoder + stdlib json), validating and dumping through
+the Reading response model, and serialization.dumps with the stdlib and
+orjson backends. Also times parsing a model reply with both backends.
+
+    python benchmarks/bench_serialization.py
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import main  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PLACE = {"city": "Chennai", "country": "India", "lat": 13.08, "lon": 80.27}
+
+
+def stdlib_dumps(obj) -> bytes:
+    return json.dumps(
+        obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+def responses() -> dict:
+    natal = main.NatalChartRequest(
+        name="Asha",
+        birth_date="2004-08-15",
+        birth_time="14:30",
+        birth_timezone="+05:30",
+        birth_place=PLACE,
+    )
+    compat = main.CompatibilityRequest(
+        person_a_name="Asha",
+        person_a_birth_date="2004-08-15",
+        person_a_birth_place=PLACE,
+        person_b_name="Ravi",
+        person_b_birth_date="2005-01-02",
+        person_b_birth_place=PLACE,
+    )
+    batch = [natal] * main.NATAL_BATCH_CHUNK_SIZE
+    return {
+        "quick_horoscope": main.generate_mock_horoscope_response(
+            main.QuickHoroscopeRequest(sign="Leo")
+        ),
+        "compatibility": main.generate_mock_compatibility_response(
+            compat, main.compute_synastry(compat)
+        ),
+        "natal_chart": main.generate_mock_natal_response(natal),
+        "natal_batch_chunk": [
+            {"index": i, **item}
+            for i, item in enumerate(main.compute_natal_charts(batch))
+        ],
+    }
+
+
+def per_call_us(fn, budget_s: float = 0.3) -> float:
+    number, elapsed = 1, 0.0
+    while elapsed < budget_s / 5:
+        number *= 2
+        elapsed = timeit.timeit(fn, number=number)
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    return round(best / number * 1e6, 2)
+
+
+def bench_response(name: str, obj) -> dict:
+    row = {"response": name, "bytes": len(stdlib_dumps(obj))}
+    row["fastapi_default_us"] = per_call_us(
+        lambda: JSONResponse(jsonable_encoder(obj)).body
+    )
+    if isinstance(obj, dict):
+        row["reading_model_us"] = per_call_us(
+            lambda: main.Reading.model_validate(obj).model_dump_json()
+        )
+    row["stdlib_dumps_us"] = per_call_us(lambda: stdlib_dumps(obj))
+    if orjson:
+        row["orjson_dumps_us"] = per_call_us(
+            lambda: orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+        )
+    return row
+
+
+def bench_parse(obj) -> dict:
+    text = "```json\n" + json.dumps(obj, ensure_ascii=False, indent=2) + "\n```"
+    body = text.strip()[7:-3].strip()
+    row = {"parse": "natal_model_reply", "bytes": len(body.encode())}
+    row["stdlib_loads_us"] = per_call_us(lambda: json.loads(body))
+    if orjson:
+        row["orjson_loads_us"] = per_call_us(lambda: orjson.loads(body))
+    return row
+
+
+if __name__ == "__main__":
+    shapes = responses()
+    for name, obj in shapes.items():
+        print(json.dumps(bench_response(name, obj)))
+    print(json.dumps(bench_parse(shapes["natal_chart"])))
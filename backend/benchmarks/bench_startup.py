@@ -0,0 +1,132 @@
+"""
+Benchmark: cold start, from process launch to the first response.
+
+For each configuration, in fresh processes:
+- import_ms: time to `import main`
+- first_response_ms: launching uvicorn until /health answers 200
+- first_reading_ms: launching uvicorn until a mock quick horoscope is served
+  (mock configuration only; with a key that request would go upstream)
+- llm_ready_ms: launching uvicorn until /health reports the LLM client
+  ready (key configurations on checkouts that report readiness)
+
+The "gemini" configuration uses a dummy API key, so the SDK is set up but
+never called. Medians of --repeat runs are printed as JSON lines; run the
+script unchanged against an older checkout to compare.
+
+    python benchmarks/bench_startup.py [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CONFIGS = {
+    "mock": {"GEMINI_API_KEY": "", "FAKE_LLM": "false"},
+    "gemini": {"GEMINI_API_KEY": "bench-dummy-key", "FAKE_LLM": "false"},
+}
+
+# Shared settings: no cache file, no background horoscope fills
+BASE_ENV = {"NATAL_CACHE_PATH": "", "HOROSCOPE_PREWARM": "false"}
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def env_for(config: str) -> dict:
+    return {**os.environ, **BASE_ENV, **CONFIGS[config]}
+
+
+def import_seconds(config: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND,
+        env=env_for(config),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def poll(check, timeout: float = 30) -> float:
+    """Seconds until check() is true, retrying while the server comes up"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if check():
+                return time.perf_counter()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.005)
+    raise TimeoutError("server did not come up")
+
+
+def server_times(config: str) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)]
+        + ["--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND,
+        env=env_for(config),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=base_url, timeout=5) as client:
+            up = poll(lambda: client.get("/health").status_code == 200)
+            times = {"first_response_ms": (up - start) * 1000}
+            if config == "mock":
+                payload = {"sign": "Leo", "period": "today"}
+                client.post("/api/quick-horoscope", json=payload).raise_for_status()
+                times["first_reading_ms"] = (time.perf_counter() - start) * 1000
+            elif "llm_client" in client.get("/health").json():
+                ready = poll(
+                    lambda: client.get("/health").json()["llm_client"]["ready"]
+                )
+                times["llm_ready_ms"] = (ready - start) * 1000
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return times
+
+
+def run(config: str, repeat: int) -> dict:
+    samples: dict[str, list] = {
+        "import_ms": [import_seconds(config) * 1000 for _ in range(repeat)]
+    }
+    for _ in range(repeat):
+        for name, value in server_times(config).items():
+            samples.setdefault(name, []).append(value)
+    row = {"config": config, "repeat": repeat}
+    for name, values in samples.items():
+        row[name] = round(statistics.median(values), 1)
+    return row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGS))
+    args = parser.parse_args()
+
+    for config in args.configs:
+        print(json.dumps(run(config, args.repeat)))
@@ -0,0 +1,122 @@
+"""
+Benchmark: synastry pairs scored per second.
+
+Compares, for one person against --pool candidate charts (default 50k):
+- pairwise: pair_analysis() once per candidate, what ranking costs with
+  one compatibility reading per pair, timed on a sample
+- pool: score_against_pool() on the whole pool in one array pass
+- rank_endpoint: POST /api/compatibility/rank in-process, including
+  request validation, the candidates' ephemeris and top-K
+
+Also checks that the pool scores match the pairwise ones.
+
+    python benchmarks/bench_synastry.py [--pool 50000] [--top-k 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.update(
+    GEMINI_API_KEY="",
+    FAKE_LLM="false",
+    HOROSCOPE_PREWARM="false",
+    RATE_LIMIT_PER_MINUTE="0",
+    DEDUPE_WINDOW_SECONDS="0",
+)
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+import ephemeris  # noqa: E402
+import synastry  # noqa: E402
+
+# The pairwise baseline is slow, so only this many pairs are timed
+PAIRWISE_SAMPLE = 2000
+
+FOCUS = "romantic"
+
+
+def charts(n: int, seed: int = 11) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    jds = ephemeris.J2000 + rng.uniform(-40 * 365.25, 10 * 365.25, n)
+    return ephemeris.body_longitudes(jds), rng.random(n) < 0.7
+
+
+def rate(n: int, seconds: float) -> dict:
+    return {"pairs_per_s": round(n / seconds), "total_ms": seconds * 1000}
+
+
+def bench_pairwise(person, pool, known) -> dict:
+    sample = range(min(PAIRWISE_SAMPLE, len(pool)))
+    begin = time.perf_counter()
+    for i in sample:
+        synastry.pair_analysis(person, pool[i], FOCUS, True, bool(known[i]))
+    return rate(len(sample), time.perf_counter() - begin)
+
+
+def bench_pool(person, pool, known) -> dict:
+    begin = time.perf_counter()
+    synastry.score_against_pool(person, pool, FOCUS, True, known)
+    return rate(len(pool), time.perf_counter() - begin)
+
+
+def bench_endpoint(n: int, top_k: int) -> dict:
+    import main
+
+    rng = np.random.default_rng(5)
+    days = rng.integers(0, 50 * 365, n)
+    dates = (np.datetime64("1960-01-01") + days).astype(str).tolist()
+    candidates = [
+        {"id": str(i), "birth_date": d, "birth_time": "12:30" if i % 3 else "unknown"}
+        for i, d in enumerate(dates)
+    ]
+    payload = {
+        "person": {"birth_date": "2004-08-15", "birth_time": "14:30"},
+        "candidates": candidates,
+        "focus": FOCUS,
+        "top_k": top_k,
+    }
+
+    async def post() -> float:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+            begin = time.perf_counter()
+            response = await c.post("/api/compatibility/rank", json=payload)
+            elapsed = time.perf_counter() - begin
+            response.raise_for_status()
+        return elapsed
+
+    return rate(n, min(asyncio.run(post()) for _ in range(3)))
+
+
+def check(person, pool, known) -> bool:
+    scores = synastry.score_against_pool(person, pool[:256], FOCUS, True, known[:256])
+    single = [
+        synastry.pair_analysis(person, pool[i], FOCUS, True, bool(known[i]))["score"]
+        for i in range(256)
+    ]
+    return scores.tolist() == single
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pool", type=int, default=50000)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    all_charts, known = charts(args.pool + 1)
+    person, pool, known = all_charts[0], all_charts[1:], known[1:]
+    base = {"pool": args.pool, "focus": FOCUS}
+    print(json.dumps({**base, "pool_matches_pairwise": check(person, pool, known)}))
+    for name, row in (
+        ("pairwise", bench_pairwise(person, pool, known)),
+        ("pool", bench_pool(person, pool, known)),
+        ("rank_endpoint", bench_endpoint(args.pool, args.top_k)),
+    ):
+        row = {k: round(v, 1) if isinstance(v, float) else v for k, v in row.items()}
+        print(json.dumps({**base, "method": name, **row}))
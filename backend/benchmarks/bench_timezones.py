@@ -0,0 +1,154 @@
+"""
+Benchmark: historical UTC offsets for births.
+
+- table: time to build one (zone, year) offset table
+- resolve: microseconds per birth from a cached table vs zoneinfo
+  directly (a datetime built, then checked for a gap or overlap)
+- births: --births random births over --zones zones and 1950-2010, from
+  an empty cache (tables built as needed), with the cache hit rate and
+  the births whose offset or status differs from zoneinfo's
+- endpoint: /api/natal-chart/batch in-process with birth_timezone "auto"
+
+    python benchmarks/bench_timezones.py [--births 1000000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import available_timezones
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.update(
+    GEMINI_API_KEY="",
+    FAKE_LLM="false",
+    HOROSCOPE_PREWARM="false",
+    RATE_LIMIT_PER_MINUTE="0",
+    DEDUPE_WINDOW_SECONDS="0",
+)
+
+import timezones  # noqa: E402
+
+
+def zoneinfo_offset(name: str, day: date, hour: int, minute: int):
+    """What timezones.local_offset answers, straight from zoneinfo"""
+    tz = timezones.zone(name)
+    moment = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz)
+    early, late = moment.utcoffset(), moment.replace(fold=1).utcoffset()
+    if early == late:
+        status = "unique"
+    else:
+        # fold=0 is the offset before the change, for skipped times too
+        status = "ambiguous" if early > late else "nonexistent"
+    return timezones.LocalTime(int(early.total_seconds()), status)
+
+
+def sample_births(count: int, zones: int, seed: int = 7) -> list[tuple]:
+    rng = random.Random(seed)
+    names = rng.sample(
+        sorted(n for n in available_timezones() if "/" in n and "Etc" not in n), zones
+    )
+    first, days = date(1950, 1, 1), (date(2010, 12, 31) - date(1950, 1, 1)).days
+    return [
+        (
+            rng.choice(names),
+            first + timedelta(days=rng.randrange(days + 1)),
+            rng.randrange(24),
+            rng.randrange(60),
+        )
+        for _ in range(count)
+    ]
+
+
+def bench_table(repeat: int) -> dict:
+    begin = time.perf_counter()
+    for year in range(1900, 1900 + repeat):
+        timezones.year_table("Europe/London", year)
+    return {"build_ms": (time.perf_counter() - begin) / repeat * 1e3}
+
+
+def bench_resolve(births: list[tuple]) -> dict:
+    for birth in births:
+        timezones.local_offset(*birth)
+    rows = {}
+    for name, resolve in (
+        ("table", timezones.local_offset),
+        ("zoneinfo", zoneinfo_offset),
+    ):
+        begin = time.perf_counter()
+        for birth in births:
+            resolve(*birth)
+        rows[f"{name}_us"] = (time.perf_counter() - begin) / len(births) * 1e6
+    return rows
+
+
+def bench_births(births: list[tuple], check: int) -> dict:
+    timezones.year_table.cache_clear()
+    begin = time.perf_counter()
+    for birth in births:
+        timezones.local_offset(*birth)
+    seconds = time.perf_counter() - begin
+    stats = timezones.stats()
+    mismatches = sum(
+        timezones.local_offset(*birth) != zoneinfo_offset(*birth)
+        for birth in births[:check]
+    )
+    return {
+        "births": len(births),
+        "seconds": seconds,
+        "births_per_s": len(births) / seconds,
+        "tables": stats["entries"],
+        "hit_rate": stats["hit_rate"],
+        "checked": min(check, len(births)),
+        "mismatches": mismatches,
+    }
+
+
+def bench_endpoint(batches: int, size: int) -> dict:
+    import httpx
+
+    import main
+
+    cities = [("London", "UK"), ("New York", "USA"), ("Chennai", "India")]
+    births = [
+        {
+            "birth_date": f"{1950 + i % 60}-{1 + i % 12:02d}-15",
+            "birth_time": "09:30",
+            "birth_timezone": "auto",
+            "birth_place": dict(zip(("city", "country"), cities[i % 3])),
+        }
+        for i in range(size)
+    ]
+
+    async def run() -> float:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+            begin = time.perf_counter()
+            for _ in range(batches):
+                r = await c.post("/api/natal-chart/batch", json=births)
+                r.raise_for_status()
+            return time.perf_counter() - begin
+
+    return {"charts_per_s": batches * size / asyncio.run(run())}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--births", type=int, default=1_000_000)
+    parser.add_argument("--zones", type=int, default=50)
+    parser.add_argument("--check", type=int, default=100_000)
+    args = parser.parse_args()
+
+    births = sample_births(args.births, args.zones)
+    for name, row in (
+        ("table", bench_table(100)),
+        ("resolve", bench_resolve(births[:50_000])),
+        ("births", bench_births(births, args.check)),
+        ("endpoint", bench_endpoint(5, 1000)),
+    ):
+        row = {k: round(v, 2) if isinstance(v, float) else v for k, v in row.items()}
+        print(json.dumps({"bench": name, **row}))
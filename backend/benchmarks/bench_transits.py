@@ -0,0 +1,103 @@
+"""
+Benchmark: transit forecasts for many users over a 7-day window.
+
+Compares, for --users natal charts (default 10k) and --days days:
+- recompute_sky: forecast() with the sky recomputed for every user (what
+  a forecast costs without the shared sky), timed on a sample
+- shared_sky: the sky is computed once; each user runs forecast(), the
+  per-request path including the ranked, JSON-ready day list
+- vectorized: the sky is computed once; transit_hits() compares it with
+  all natal charts in chunks (aspect comparison only)
+
+Also checks that the vectorized hits match the per-user ones.
+
+    python benchmarks/bench_transits.py [--users 10000] [--days 7]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np  # noqa: E402
+
+import ephemeris  # noqa: E402
+import transits  # noqa: E402
+
+# Users per transit_hits() call; bounds the (users, days, 10, 10) arrays
+CHUNK = 2048
+
+# The recompute baseline is slow, so only this many users are timed
+RECOMPUTE_SAMPLE = 1000
+
+RANGES = {1: "today", 3: "3-day", 7: "7-day"}
+
+
+def natal_charts(n: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    jds = ephemeris.J2000 + rng.uniform(-60 * 365.25, 20 * 365.25, n)
+    return ephemeris.body_longitudes(jds)
+
+
+def rate(n: int, seconds: float) -> dict:
+    return {"users_per_s": round(n / seconds), "ms_per_user": seconds / n * 1000}
+
+
+def bench_recompute(natal: np.ndarray, start: date, days: int) -> dict:
+    sample = natal[:RECOMPUTE_SAMPLE]
+    begin = time.perf_counter()
+    for row in sample:
+        transits._windows.clear()
+        transits.forecast(row, start, RANGES[days])
+    return rate(len(sample), time.perf_counter() - begin)
+
+
+def bench_shared(natal: np.ndarray, start: date, days: int) -> dict:
+    transits._windows.clear()
+    begin = time.perf_counter()
+    for row in natal:
+        transits.forecast(row, start, RANGES[days])
+    return rate(len(natal), time.perf_counter() - begin)
+
+
+def bench_vectorized(natal: np.ndarray, start: date, days: int) -> dict:
+    transits._windows.clear()
+    begin = time.perf_counter()
+    sky = transits.sky_window(start, days).longitudes
+    hits = 0
+    for i in range(0, len(natal), CHUNK):
+        aspect, _ = transits.transit_hits(natal[i : i + CHUNK], sky)
+        hits += int((aspect >= 0).sum())
+    elapsed = time.perf_counter() - begin
+    return {**rate(len(natal), elapsed), "total_ms": elapsed * 1000, "hits": hits}
+
+
+def check(natal: np.ndarray, start: date, days: int) -> bool:
+    sky = transits.sky_window(start, days).longitudes
+    batch, _ = transits.transit_hits(natal[:256], sky)
+    single = [transits.transit_hits(row[None, :], sky)[0][0] for row in natal[:256]]
+    return bool(np.array_equal(batch, np.stack(single)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--days", type=int, choices=sorted(RANGES), default=7)
+    args = parser.parse_args()
+
+    natal = natal_charts(args.users)
+    start = date.today()
+    base = {"users": args.users, "days": args.days}
+    print(json.dumps({**base, "vectorized_matches_single": check(natal, start, 7)}))
+    for name, bench in (
+        ("recompute_sky", bench_recompute),
+        ("shared_sky", bench_shared),
+        ("vectorized", bench_vectorized),
+    ):
+        row = bench(natal, start, args.days)
+        row = {k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()}
+        print(json.dumps({**base, "method": name, **row}))
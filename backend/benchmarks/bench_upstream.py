@@ -0,0 +1,184 @@
+"""
+Benchmark: the upstream transport against a local fake Gemini server.
+
+Starts fake_llm.py servers with different behaviour and calls them through
+gemini_rest.GeminiRestModel and upstream.Upstream, as llm.py does:
+- pooling: --calls sequential calls to a zero-latency server, over one
+  keep-alive client vs a new client (and connection) per call
+- tail: 5% of calls are 1 s slower; plain calls vs hedged after p95
+- errors: 20% of calls fail with 503; no retries vs GEMINI_MAX_RETRIES=2
+- outage: every call fails; breaker off vs the default breaker
+
+Each scenario prints success rate, latency percentiles (failed calls
+included: failing fast matters too) and upstream requests per call as
+one JSON line.
+
+    python benchmarks/bench_upstream.py [--calls 400] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND)
+
+import httpx  # noqa: E402
+
+from gemini_rest import GeminiRestModel  # noqa: E402
+from upstream import CircuitBreaker, Upstream  # noqa: E402
+
+TIMEOUT = 10.0
+PROMPT = "Task: quick_horoscope"
+
+SERVERS = {
+    "fast": ["--latency-ms", "0", "--jitter-ms", "0"],
+    "tail": ["--latency-ms", "100", "--jitter-ms", "20"]
+    + ["--slow-rate", "0.05", "--slow-ms", "1000"],
+    "errors": ["--latency-ms", "100", "--jitter-ms", "20", "--error-rate", "0.2"],
+    "outage": ["--latency-ms", "100", "--jitter-ms", "20", "--error-rate", "1"],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(name: str) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "fake_llm.py", "--port", str(port), *SERVERS[name]],
+        cwd=BACKEND,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{url}/stats").raise_for_status()
+            return server, url
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    server.kill()
+    raise TimeoutError("fake server did not start")
+
+
+def new_model(url: str) -> GeminiRestModel:
+    return GeminiRestModel("bench", "fake", url, TIMEOUT, 64, 60)
+
+
+def new_upstream(retries=0, hedge=False, failures=1_000_000) -> Upstream:
+    return Upstream(retries, 0.2, hedge, CircuitBreaker(failures, 30))
+
+
+def summary(latencies: list, failures: int, upstream: Upstream, calls: int) -> dict:
+    ordered = sorted(latencies)
+
+    def pct(q):
+        return round(ordered[min(int(len(ordered) * q), len(ordered) - 1)] * 1000, 1)
+
+    return {
+        "success_rate": round(1 - failures / calls, 3),
+        "p50_ms": pct(0.5),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "requests_per_call": round(upstream.attempts / calls, 3),
+        "refused": upstream.breaker.refused,
+    }
+
+
+async def run_calls(model, upstream: Upstream, calls: int, concurrency: int):
+    latencies, failures = [], 0
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal failures
+        async with limit:
+            start = time.perf_counter()
+            try:
+                await upstream.call(
+                    lambda: model.generate_content_async(PROMPT), TIMEOUT
+                )
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return latencies, failures
+
+
+async def bench_pooling(url: str, calls: int) -> list[dict]:
+    rows = []
+    pooled = new_model(url)
+    for name, pool in (("keepalive_pool", True), ("new_connection", False)):
+        latencies = []
+        for _ in range(calls):
+            model = pooled if pool else new_model(url)
+            start = time.perf_counter()
+            await model.generate_content_async(PROMPT)
+            latencies.append(time.perf_counter() - start)
+            if not pool:
+                await model.aclose()
+        rows.append(
+            {
+                "policy": name,
+                "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+                "p95_ms": round(sorted(latencies)[int(calls * 0.95)] * 1000, 2),
+            }
+        )
+    await pooled.aclose()
+    return rows
+
+
+async def bench_policies(url: str, policies: dict, calls: int, concurrency: int):
+    rows = []
+    for name, options in policies.items():
+        model = new_model(url)
+        upstream = new_upstream(**options)
+        if options.get("hedge"):
+            # Enough latency samples for a p95 before measuring
+            await run_calls(model, upstream, 50, concurrency)
+            upstream.attempts = 0
+        latencies, failures = await run_calls(model, upstream, calls, concurrency)
+        rows.append({"policy": name, **summary(latencies, failures, upstream, calls)})
+        await model.aclose()
+    return rows
+
+
+async def main(calls: int, concurrency: int):
+    scenarios = {
+        "tail": {"plain": {}, "hedged": {"hedge": True}},
+        "errors": {"no_retries": {}, "retries": {"retries": 2}},
+        "outage": {
+            "no_breaker": {"retries": 2},
+            "breaker": {"retries": 2, "failures": 5},
+        },
+    }
+    for name in ("fast", *scenarios):
+        server, url = start_server(name)
+        try:
+            if name == "fast":
+                rows = await bench_pooling(url, calls)
+            else:
+                rows = await bench_policies(url, scenarios[name], calls, concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+        scenario = "pooling" if name == "fast" else name
+        for row in rows:
+            print(json.dumps({"scenario": scenario, "calls": calls, **row}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency))
@@ -0,0 +1,134 @@
+"""
+Benchmark: sun-sign lookup cost and correctness across all 366 days.
+
+Checks the day-of-year table against the conventional sign start dates
+and against the ephemeris (every non-cusp day must match the real Sun
+sign in every year of the range), then times one lookup through the
+table, through zodiac.sun_sign(), and through the old linear scan.
+
+    python benchmarks/bench_zodiac.py [--years 1900 2050]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np  # noqa: E402
+
+import ephemeris  # noqa: E402
+import zodiac  # noqa: E402
+
+# The string-compare scan previously copy-pasted into main.py
+LEGACY_TABLE = [
+    ("01-20", "Capricorn"),
+    ("02-19", "Aquarius"),
+    ("03-20", "Pisces"),
+    ("04-20", "Aries"),
+    ("05-21", "Taurus"),
+    ("06-21", "Gemini"),
+    ("07-22", "Cancer"),
+    ("08-23", "Leo"),
+    ("09-23", "Virgo"),
+    ("10-23", "Libra"),
+    ("11-22", "Scorpio"),
+    ("12-22", "Sagittarius"),
+    ("12-31", "Capricorn"),
+]
+
+
+def legacy_sun_sign(birth_date: str) -> str:
+    month_day = birth_date[5:]
+    for end_date, sign in LEGACY_TABLE:
+        if month_day <= end_date:
+            return sign
+    return "Aries"
+
+
+def reference_sign(month: int, day: int) -> str:
+    """Independent reference: latest conventional start on or before the day"""
+    starts = sorted(
+        ((m, d), zodiac.SIGNS[i]) for i, (m, d) in enumerate(zodiac._SIGN_STARTS)
+    )
+    sign = starts[-1][1]
+    for start, name in starts:
+        if (month, day) >= start:
+            sign = name
+    return sign
+
+
+def all_days() -> list[date]:
+    first = date(2000, 1, 1)
+    return [first + timedelta(days=i) for i in range(366)]
+
+
+def check_table() -> dict:
+    mismatches = [
+        d.strftime("%m-%d")
+        for d in all_days()
+        if zodiac.table_sun_sign(d.month, d.day) != reference_sign(d.month, d.day)
+    ]
+    return {"days": 366, "table_mismatches": mismatches}
+
+
+def check_against_ephemeris(first_year: int, last_year: int) -> dict:
+    days, jds = [], []
+    for year in range(first_year, last_year + 1):
+        day = date(year, 1, 1)
+        while day.year == year:
+            days.append(day)
+            jds.append(ephemeris.julian_day(day.isoformat(), "12:00"))
+            day += timedelta(days=1)
+    suns = ephemeris.body_longitudes(np.array(jds))[:, 0]
+    sky = (suns // 30).astype(int).tolist()
+
+    wrong_non_cusp, cusp_days = [], 0
+    for day, sign_index in zip(days, sky):
+        if zodiac.is_cusp(day.month, day.day):
+            cusp_days += 1
+            continue
+        if zodiac.table_sun_sign(day.month, day.day) != zodiac.SIGNS[sign_index]:
+            wrong_non_cusp.append(day.isoformat())
+    return {
+        "years": [first_year, last_year],
+        "dates_checked": len(days),
+        "cusp_dates_deferred_to_ephemeris": cusp_days,
+        "non_cusp_mismatches": wrong_non_cusp[:20],
+    }
+
+
+def per_lookup_ns(fn, args_list: list, repeat: int = 5) -> float:
+    n = len(args_list)
+
+    def run():
+        for args in args_list:
+            fn(*args)
+
+    return round(min(timeit.repeat(run, number=20, repeat=repeat)) / (20 * n) * 1e9)
+
+
+def timings() -> dict:
+    days = all_days()
+    md = [(d.month, d.day) for d in days]
+    iso = [(d.isoformat(),) for d in days]
+    non_cusp = [(d.isoformat(),) for d in days if not zodiac.is_cusp(d.month, d.day)]
+    return {
+        "legacy_linear_scan_ns": per_lookup_ns(legacy_sun_sign, iso),
+        "table_lookup_ns": per_lookup_ns(zodiac.table_sun_sign, md),
+        "sun_sign_non_cusp_ns": per_lookup_ns(zodiac.sun_sign, non_cusp),
+        "sun_sign_all_days_ns": per_lookup_ns(zodiac.sun_sign, iso, repeat=2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=int, nargs=2, default=[1900, 2050])
+    args = parser.parse_args()
+
+    print(json.dumps(check_table()))
+    print(json.dumps(check_against_ephemeris(*args.years)))
+    print(json.dumps(timings()))
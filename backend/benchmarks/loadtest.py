@@ -0,0 +1,289 @@
+"""
+Load test: throughput and p50/p95/p99 latency for every reading endpoint.
+
+Drives /api/quick-horoscope, /api/natal-chart, /api/compatibility and
+/api/transit-forecast with N concurrent closed-loop clients, either
+in-process (httpx + ASGI transport) or against a real server started on
+a free local port: plain uvicorn, or serve.py with --workers processes. In "fake" mode the app talks to the local
+fake LLM (fake_llm.py) with the given latency and error rate; in "mock"
+mode no model is configured at all.
+
+Prints one JSON object per (endpoint, concurrency) run, preceded by a
+header with the git revision and settings, so results can be appended
+to a file and compared across commits:
+
+    python benchmarks/loadtest.py --mode fake --latency-ms 300 \\
+        --transport uvicorn --concurrency 1 16 64 --output runs.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND)
+
+import httpx  # noqa: E402
+
+ENDPOINTS = (
+    "/api/quick-horoscope",
+    "/api/natal-chart",
+    "/api/compatibility",
+    "/api/transit-forecast",
+)
+
+# Mock readings carry the app's own model_version
+MOCK_MARKER = b'"model_version":"v1.0-astrology"'
+
+SIGNS = (
+    "Aries",
+    "Taurus",
+    "Gemini",
+    "Cancer",
+    "Leo",
+    "Virgo",
+    "Libra",
+    "Scorpio",
+    "Sagittarius",
+    "Capricorn",
+    "Aquarius",
+    "Pisces",
+)
+
+
+def _birth(rng: random.Random) -> dict:
+    return {
+        "birth_date": f"{rng.randint(1950, 2015)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "birth_time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+        "birth_place": {
+            "city": "Chennai",
+            "country": "India",
+            "lat": round(rng.uniform(-60, 60), 2),
+            "lon": round(rng.uniform(-180, 180), 2),
+        },
+    }
+
+
+def make_payload(endpoint: str, rng: random.Random) -> dict:
+    if endpoint == "/api/quick-horoscope":
+        return {
+            "sign": rng.choice(SIGNS),
+            "period": rng.choice(("today", "tomorrow", "this_week")),
+        }
+    if endpoint == "/api/natal-chart":
+        return {"name": "Load", "birth_timezone": "+05:30", **_birth(rng)}
+    if endpoint == "/api/compatibility":
+        a, b = _birth(rng), _birth(rng)
+        return {
+            "person_a_name": "A",
+            "person_a_birth_date": a["birth_date"],
+            "person_a_birth_place": a["birth_place"],
+            "person_b_name": "B",
+            "person_b_birth_date": b["birth_date"],
+            "person_b_birth_place": b["birth_place"],
+            "focus": rng.choice(("romantic", "work", "friendship")),
+        }
+    return {
+        **_birth(rng),
+        "focus": rng.choice(("career", "love", "health", "general")),
+    }
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(int(q / 100 * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    concurrency: int,
+    total: int,
+    seed: int,
+) -> dict:
+    rng = random.Random(seed)
+    payloads = [make_payload(endpoint, rng) for _ in range(total)]
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    sources = {"llm": 0, "mock": 0}
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < total:
+            payload = payloads[next_index]
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.post(endpoint, json=payload)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                mock = MOCK_MARKER in response.content
+                sources["mock" if mock else "llm"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(ms[-1], 2),
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "served_by": sources,
+    }
+
+
+def app_env(args) -> dict:
+    env = {
+        "FAKE_LLM": "true" if args.mode == "fake" else "false",
+        "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+        "FAKE_LLM_JITTER_MS": str(args.jitter_ms),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        # Every run starts cold; a warm natal cache would hide the LLM path
+        "NATAL_CACHE_PATH": "",
+        # One load generator is one client: it must not be limited or
+        # have its identical requests answered from the dedupe window
+        "RATE_LIMIT_PER_MINUTE": "0",
+        "DEDUPE_WINDOW_SECONDS": "0",
+    }
+    if args.mode == "mock":
+        env["GEMINI_API_KEY"] = ""
+    return env
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_until_up(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise
+            await asyncio.sleep(0.1)
+
+
+async def run(args) -> list[dict]:
+    server = None
+    if args.transport == "inprocess":
+        os.environ.update(app_env(args))
+        import main
+
+        def make_client(limits: httpx.Limits) -> httpx.AsyncClient:
+            return httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=main.app),
+                base_url="http://loadtest",
+                timeout=None,
+            )
+
+    else:
+        port = free_port()
+        if args.transport == "serve":
+            command = ["serve.py", "--workers", str(args.workers)]
+        else:
+            command = ["-m", "uvicorn", "main:app"]
+        server = subprocess.Popen(
+            [sys.executable, *command, "--port", str(port)]
+            + ["--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND,
+            env={**os.environ, **app_env(args)},
+            stdout=subprocess.DEVNULL,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        await wait_until_up(base_url)
+
+        def make_client(limits: httpx.Limits) -> httpx.AsyncClient:
+            return httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits)
+
+    rows = []
+    try:
+        for concurrency in args.concurrency:
+            limits = httpx.Limits(max_connections=concurrency)
+            async with make_client(limits) as client:
+                for endpoint in args.endpoints:
+                    # Warm-up, so imports and first-call setup are not timed
+                    await run_endpoint(client, endpoint, 1, 5, seed=args.seed + 1)
+                    rows.append(
+                        await run_endpoint(
+                            client, endpoint, concurrency, args.requests, args.seed
+                        )
+                    )
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+    return rows
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("mock", "fake"), default="mock")
+    parser.add_argument(
+        "--transport", choices=("inprocess", "uvicorn", "serve"), default="inprocess"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="for --transport serve")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=500, help="per run")
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS))
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="also append the JSON lines to this file")
+    args = parser.parse_args()
+
+    header = {
+        "run": "loadtest",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        **{k: v for k, v in vars(args).items() if k != "output"},
+    }
+    rows = asyncio.run(run(args))
+    lines = [json.dumps(header)] + [json.dumps(row) for row in rows]
+    print("\n".join(lines))
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write("\n".join(lines) + "\n")
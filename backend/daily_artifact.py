@@ -0,0 +1,175 @@
+"""
+AstralSage - Daily artifacts
+Readings pre-generated for one calendar day (see pregenerate.py), stored
+in one compact file per day and served by memory-mapped lookup.
+
+File layout:
+  MAGIC | header length (u32, little-endian) | header JSON | entries
+The header holds the day and an index of key -> [offset, length], with
+offsets counted from the end of the header. Each entry is a serialized
+reading without its braces and request_id, so a response is the entry
+with a fresh request_id spliced in. Files are written under a temporary
+name and renamed into place, so readers never see a partial file, and
+every worker maps the same pages.
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+import uuid
+from datetime import date, datetime
+from typing import Optional
+
+MAGIC = b"ASDAILY1"
+_HEADER_LENGTH = struct.Struct("<I")
+
+# How often a missing or replaced artifact file is looked for again
+RECHECK_SECONDS = 30.0
+
+
+def artifact_key(*parts: str) -> str:
+    """e.g. artifact_key("quick_horoscope", "Leo", "today")"""
+    return "/".join(parts)
+
+
+def artifact_path(directory: str, day: date) -> str:
+    return os.path.join(directory, f"daily-{day.isoformat()}.bin")
+
+
+def write_artifact(path: str, day: date, entries: dict[str, bytes]) -> int:
+    """Write entries (key -> serialized members) for day; returns the file size"""
+    index, offset = {}, 0
+    for key, entry in entries.items():
+        index[key] = [offset, len(entry)]
+        offset += len(entry)
+    header = json.dumps(
+        {
+            "date": day.isoformat(),
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "index": index,
+        },
+        separators=(",", ":"),
+    ).encode()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+        for entry in entries.values():
+            f.write(entry)
+    os.replace(temporary, path)
+    return os.path.getsize(path)
+
+
+def _identity(stat: os.stat_result) -> tuple:
+    # A rewritten artifact is a new file (renamed into place)
+    return stat.st_ino, stat.st_mtime_ns
+
+
+class DailyArtifact:
+    """One artifact file, memory-mapped read-only"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.identity = _identity(os.fstat(f.fileno()))
+        if self._map[: len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a daily artifact")
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        (length,) = _HEADER_LENGTH.unpack_from(self._map, len(MAGIC))
+        header = json.loads(self._map[start : start + length])
+        self.day = date.fromisoformat(header["date"])
+        self.created_at = header["created_at"]
+        base = start + length
+        self._index = {
+            key: (base + offset, base + offset + size)
+            for key, (offset, size) in header["index"].items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def entry(self, key: str) -> Optional[bytes]:
+        span = self._index.get(key)
+        if span is None:
+            return None
+        return self._map[span[0] : span[1]]
+
+    def close(self):
+        self._map.close()
+
+
+class DailyArtifacts:
+    """The artifact for the current day in a directory. Lookups cost a
+    dict access and a slice of the mapping; the file is looked for (or
+    checked for replacement) at most every RECHECK_SECONDS."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._artifact: Optional[DailyArtifact] = None
+        self._day: Optional[date] = None
+        self._checked = float("-inf")
+
+    def _current(self, day: date) -> Optional[DailyArtifact]:
+        now = time.monotonic()
+        if day == self._day and now - self._checked < RECHECK_SECONDS:
+            return self._artifact
+        self._day, self._checked = day, now
+        path = artifact_path(self.directory, day)
+        try:
+            identity = _identity(os.stat(path))
+        except OSError:
+            identity = None
+        artifact = self._artifact
+        if artifact and artifact.day == day and artifact.identity == identity:
+            return artifact
+        if artifact:
+            artifact.close()
+            self._artifact = None
+        if identity:
+            try:
+                self._artifact = DailyArtifact(path)
+                print(
+                    f"📦 Serving {len(self._artifact)} pre-generated readings for {day}"
+                )
+            except (OSError, ValueError, KeyError, struct.error) as e:
+                print(f"⚠️ Daily artifact {path} unreadable: {e}")
+        return self._artifact
+
+    def reading(
+        self, day: date, key: str, request_id: Optional[str] = None
+    ) -> Optional[bytes]:
+        """A serialized reading for key on day, or None if not pre-generated;
+        with a new request_id unless given"""
+        artifact = self._current(day)
+        entry = artifact.entry(key) if artifact else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return b"".join(
+            (
+                b'{"request_id":"',
+                (request_id or str(uuid.uuid4())).encode(),
+                b'",',
+                entry,
+                b"}",
+            )
+        )
+
+    def stats(self) -> dict:
+        artifact = self._artifact
+        lookups = self.hits + self.misses
+        return {
+            "date": artifact.day.isoformat() if artifact else None,
+            "created_at": artifact.created_at if artifact else None,
+            "entries": len(artifact) if artifact else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
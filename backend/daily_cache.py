@@ -0,0 +1,130 @@
+"""
+AstralSage - Daily response cache
+In-memory cache for readings that only change once per calendar day
+"""
+
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import Awaitable, Callable, Generic, Hashable, Optional, TypeVar
+from zoneinfo import ZoneInfo
+
+# Cached value type (the API's Reading models)
+V = TypeVar("V")
+
+
+class DailyResponseCache(Generic[V]):
+    """Caches responses per (key, calendar day) with single-flight fills.
+
+    Entries expire when the day rolls over in the configured timezone.
+    Concurrent misses for the same key share one upstream call. Cached
+    values are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, timezone: str = "UTC"):
+        self.tz = ZoneInfo(timezone)
+        self._entries: dict[tuple, V] = {}
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._day: Optional[date] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def today(self) -> date:
+        return datetime.now(self.tz).date()
+
+    def next_rollover(self) -> datetime:
+        """Start of the next calendar day in the cache timezone"""
+        return datetime.combine(self.today() + timedelta(days=1), time(), self.tz)
+
+    def seconds_until_rollover(self) -> float:
+        return (self.next_rollover() - datetime.now(self.tz)).total_seconds()
+
+    def _expire(self, today: date) -> None:
+        if self._day != today:
+            self._entries = {k: v for k, v in self._entries.items() if k[-1] >= today}
+            self._day = today
+
+    async def get_or_fill(
+        self,
+        key: Hashable,
+        fill: Callable[[], Awaitable[Optional[V]]],
+        day: Optional[date] = None,
+    ) -> Optional[V]:
+        """Return the cached value for key, calling fill() once on a miss.
+
+        A fill returning None (e.g. LLM unavailable) is not cached.
+        """
+        today = self.today()
+        self._expire(today)
+        full_key = (key, day or today)
+
+        cached = self._entries.get(full_key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        pending = self._inflight.get(full_key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await fill()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if value is not None and full_key[-1] >= self.today():
+                self._entries[full_key] = value
+            return value
+        finally:
+            del self._inflight[full_key]
+
+    def stats(self) -> dict:
+        served = self.hits + self.coalesced
+        lookups = served + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+            "timezone": str(self.tz),
+        }
+
+
+async def prewarm_forever(
+    cache: DailyResponseCache[V],
+    keys: list,
+    fill_for: Callable[[Hashable, date], Awaitable[Optional[V]]],
+    lead_seconds: float = 600,
+) -> None:
+    """Fill every key for the next day shortly before each midnight"""
+    while True:
+        await asyncio.sleep(max(cache.seconds_until_rollover() - lead_seconds, 0))
+        tomorrow = cache.today() + timedelta(days=1)
+        results = await asyncio.gather(
+            *(
+                cache.get_or_fill(
+                    key, lambda key=key: fill_for(key, tomorrow), tomorrow
+                )
+                for key in keys
+            ),
+            return_exceptions=True,
+        )
+        warmed = sum(
+            1 for r in results if r is not None and not isinstance(r, BaseException)
+        )
+        print(f"🌙 Pre-warmed {warmed}/{len(keys)} horoscopes for {tomorrow}")
+        # Wait until we are past midnight before scheduling the next round
+        while cache.today() < tomorrow:
+            await asyncio.sleep(cache.seconds_until_rollover() + 1)
@@ -0,0 +1,416 @@
+"""
+AstralSage - Ephemeris engine
+Offline, vectorized planetary positions for natal charts.
+
+Planets use the JPL "Keplerian Elements for Approximate Positions of the
+Major Planets" (E. M. Standish, table 1, valid 1800-2050); the Moon uses
+the principal terms of the ELP-2000/82 series as tabulated in Meeus,
+Astronomical Algorithms ch. 47. Accuracy is a few arcminutes for the
+planets and ~0.1 degree for the Moon, well within a one-degree display.
+All functions take arrays of Julian days so a batch of charts is a
+single pass of array math.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+
+from zodiac import RULERS, SIGNS, parse_utc_offset
+
+BODIES = (
+    "Sun",
+    "Moon",
+    "Mercury",
+    "Venus",
+    "Mars",
+    "Jupiter",
+    "Saturn",
+    "Uranus",
+    "Neptune",
+    "Pluto",
+)
+
+J2000 = 2451545.0
+_J2000_DATETIME = datetime(2000, 1, 1, 12, tzinfo=timezone.utc)
+_DEG = np.pi / 180.0
+
+# fmt: off
+# a (au), e, I, L, long.peri, long.node (deg) and their rates per century
+_ORBIT_NAMES = ("Mercury", "Venus", "EMBary", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto")
+_ELEMENTS = np.array(
+    [
+        [0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593],
+        [0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255],
+        [1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0],
+        [1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891],
+        [5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909],
+        [9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448],
+        [19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503],
+        [30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574],
+        [39.48211675, 0.24882730, 17.14001206, 238.92903833, 224.06891629, 110.30393684],
+    ]
+)
+_RATES = np.array(
+    [
+        [0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081],
+        [0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418],
+        [0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0],
+        [0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343],
+        [-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106],
+        [-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794],
+        [-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589],
+        [0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664],
+        [-0.00031596, 0.00005170, 0.00004818, 145.20780515, -0.04062942, -0.01183482],
+    ]
+)
+# fmt: on
+_EARTH = _ORBIT_NAMES.index("EMBary")
+_PLANETS = [i for i in range(len(_ORBIT_NAMES)) if i != _EARTH]
+
+# Moon longitude terms: multiples of D, M, M', F and amplitude (1e-6 deg)
+_MOON_TERMS = np.array(
+    [
+        [0, 0, 1, 0, 6288774],
+        [2, 0, -1, 0, 1274027],
+        [2, 0, 0, 0, 658314],
+        [0, 0, 2, 0, 213618],
+        [0, 1, 0, 0, -185116],
+        [0, 0, 0, 2, -114332],
+        [2, 0, -2, 0, 58793],
+        [2, -1, -1, 0, 57066],
+        [2, 0, 1, 0, 53322],
+        [2, -1, 0, 0, 45758],
+        [0, 1, -1, 0, -40923],
+        [1, 0, 0, 0, -34720],
+        [0, 1, 1, 0, -30383],
+        [2, 0, 0, -2, 15327],
+        [0, 0, 1, 2, -12528],
+        [0, 0, 1, -2, 10980],
+        [4, 0, -1, 0, 10675],
+        [0, 0, 3, 0, 10034],
+        [4, 0, -2, 0, 8548],
+        [2, 1, -1, 0, -7888],
+        [2, 1, 0, 0, -6766],
+        [1, 0, -1, 0, -5163],
+        [1, 1, 0, 0, 4987],
+        [2, -1, 1, 0, 4036],
+        [2, 0, 2, 0, 3994],
+        [4, 0, 0, 0, 3861],
+        [2, 0, -3, 0, 3665],
+        [0, 1, -2, 0, -2689],
+        [2, 0, -1, 2, -2602],
+        [2, -1, -2, 0, 2390],
+        [1, 0, 1, 0, -2348],
+        [2, -2, 0, 0, 2236],
+        [0, 1, 2, 0, -2120],
+        [0, 2, 0, 0, -2069],
+    ],
+    dtype=float,
+)
+_MOON_ARGS = _MOON_TERMS[:, :4]
+_MOON_AMPLITUDES = _MOON_TERMS[:, 4] * 1e-6
+_MOON_M_POWER = np.abs(_MOON_TERMS[:, 1])
+
+# Major aspects: (name, angle, orb)
+ASPECTS = (
+    ("conjunction", 0.0, 8.0),
+    ("sextile", 60.0, 5.0),
+    ("square", 90.0, 7.0),
+    ("trine", 120.0, 7.0),
+    ("opposition", 180.0, 8.0),
+)
+_ASPECT_ANGLES = np.array([a[1] for a in ASPECTS])
+_ASPECT_ORBS = np.array([a[2] for a in ASPECTS])
+_PAIR_I, _PAIR_J = np.triu_indices(len(BODIES), k=1)
+
+HOUSE_SYSTEM = "Porphyry"
+
+# Body index of each sign's ruler
+_RULER_IDX = np.array([BODIES.index(r) for r in RULERS])
+# Which bodies take part in each aspect pair, shape (pairs, bodies)
+_PAIR_BODIES = np.zeros((len(_PAIR_I), len(BODIES)))
+_PAIR_BODIES[np.arange(len(_PAIR_I)), _PAIR_I] = 1.0
+_PAIR_BODIES[np.arange(len(_PAIR_I)), _PAIR_J] = 1.0
+TIGHT_ORB = 3.0
+
+# Display strings, precomputed: "Libra 8°" for every whole degree
+_POSITION_LABELS = tuple(f"{SIGNS[d // 30]} {d % 30}°" for d in range(360))
+_ASPECT_NAMES = tuple(a[0] for a in ASPECTS)
+_PAIR_NAMES = tuple(f"{BODIES[i]}-{BODIES[j]}" for i, j in zip(_PAIR_I, _PAIR_J))
+
+
+def julian_day(
+    birth_date: str, birth_time: str = "unknown", utc_offset: str = "+00:00"
+) -> float:
+    """Julian day (UT) of a local birth date/time; unknown times use local noon"""
+    local = datetime.fromisoformat(birth_date).replace(hour=12, tzinfo=timezone.utc)
+    if birth_time and birth_time != "unknown":
+        hour, minute = birth_time[:5].split(":")
+        local = local.replace(hour=int(hour), minute=int(minute))
+    utc = local - parse_utc_offset(utc_offset)
+    return J2000 + (utc - _J2000_DATETIME) / timedelta(days=1)
+
+
+def _solve_kepler(mean_anomaly: np.ndarray, e: np.ndarray) -> np.ndarray:
+    """Eccentric anomaly (radians) by Newton iteration"""
+    ecc = mean_anomaly + e * np.sin(mean_anomaly)
+    for _ in range(4):
+        ecc = ecc - (ecc - e * np.sin(ecc) - mean_anomaly) / (1.0 - e * np.cos(ecc))
+    return ecc
+
+
+def _heliocentric(t: np.ndarray) -> np.ndarray:
+    """Heliocentric ecliptic J2000 x/y coordinates, shape (n, 9, 2)"""
+    el = _ELEMENTS + _RATES * t[:, None, None]
+    a, e, inc, mean_long, peri, node = (el[..., k] for k in range(6))
+    inc, node = inc * _DEG, node * _DEG
+    arg_peri = (peri * _DEG) - node
+    mean_anomaly = np.remainder(mean_long - peri + 180.0, 360.0) * _DEG - np.pi
+
+    ecc = _solve_kepler(mean_anomaly, e)
+    xp = a * (np.cos(ecc) - e)
+    yp = a * np.sqrt(1.0 - e * e) * np.sin(ecc)
+
+    cw, sw = np.cos(arg_peri), np.sin(arg_peri)
+    cn, sn = np.cos(node), np.sin(node)
+    ci = np.cos(inc)
+    x = (cw * cn - sw * sn * ci) * xp + (-sw * cn - cw * sn * ci) * yp
+    y = (cw * sn + sw * cn * ci) * xp + (-sw * sn + cw * cn * ci) * yp
+    # Only longitudes are needed, so the z (latitude) component is skipped
+    return np.stack((x, y), axis=-1)
+
+
+def _moon_longitude(t: np.ndarray) -> np.ndarray:
+    """Geocentric lunar longitude (deg, mean equinox of date)"""
+    mean_long = 218.3164477 + 481267.88123421 * t
+    args = np.stack(
+        (
+            297.8501921 + 445267.1114034 * t,  # D
+            357.5291092 + 35999.0502909 * t,  # M
+            134.9633964 + 477198.8675055 * t,  # M'
+            93.2720950 + 483202.0175233 * t,  # F
+        ),
+        axis=-1,
+    )
+    ecc_factor = (1.0 - 0.002516 * t)[:, None] ** _MOON_M_POWER
+    phases = (args @ _MOON_ARGS.T) * _DEG
+    return mean_long + (_MOON_AMPLITUDES * ecc_factor * np.sin(phases)).sum(axis=-1)
+
+
+def body_longitudes(jd) -> np.ndarray:
+    """Tropical ecliptic longitudes of BODIES, shape (n, 10), degrees"""
+    jd = np.atleast_1d(np.asarray(jd, dtype=float))
+    t = (jd - J2000) / 36525.0
+
+    helio = _heliocentric(t)
+    geo = helio[:, _PLANETS, :] - helio[:, _EARTH : _EARTH + 1, :]
+    sun = -helio[:, _EARTH, :]
+
+    lons = np.empty((jd.shape[0], len(BODIES)))
+    lons[:, 0] = np.arctan2(sun[:, 1], sun[:, 0]) / _DEG
+    lons[:, 2:] = np.arctan2(geo[..., 1], geo[..., 0]) / _DEG
+    # Precess J2000 positions to the equinox of date (tropical zodiac)
+    lons[:, [0, *range(2, len(BODIES))]] += (1.396971 * t)[:, None]
+    lons[:, 1] = _moon_longitude(t)
+    return np.remainder(lons, 360.0)
+
+
+def positions_and_motion(jd) -> tuple[np.ndarray, np.ndarray]:
+    """Longitudes of BODIES plus retrograde flags, in one stacked pass"""
+    jd = np.atleast_1d(np.asarray(jd, dtype=float))
+    n = jd.shape[0]
+    both = body_longitudes(np.concatenate((jd, jd + 0.5)))
+    now, later = both[:n], both[n:]
+    motion = np.remainder(later - now + 180.0, 360.0) - 180.0
+    return now, motion < 0
+
+
+def chart_angles(jd, lat, lon) -> tuple[np.ndarray, np.ndarray]:
+    """Ascendant and Midheaven longitudes (deg) for observers at lat/lon"""
+    jd = np.atleast_1d(np.asarray(jd, dtype=float))
+    t = (jd - J2000) / 36525.0
+    gmst = 280.46061837 + 360.98564736629 * (jd - J2000) + 0.000387933 * t * t
+    ramc = np.remainder(gmst + np.asarray(lon, dtype=float), 360.0) * _DEG
+    eps = (23.439291 - 0.0130042 * t) * _DEG
+    phi = np.asarray(lat, dtype=float) * _DEG
+
+    mc = np.arctan2(np.sin(ramc), np.cos(ramc) * np.cos(eps))
+    asc = np.arctan2(
+        np.cos(ramc), -(np.sin(ramc) * np.cos(eps) + np.tan(phi) * np.sin(eps))
+    )
+    return np.remainder(asc / _DEG, 360.0), np.remainder(mc / _DEG, 360.0)
+
+
+def house_cusps(asc, mc) -> np.ndarray:
+    """Porphyry house cusps 1-12, shape (n, 12), degrees"""
+    asc = np.atleast_1d(asc)
+    mc = np.atleast_1d(mc)
+    ic = mc + 180.0
+    upper = np.remainder(asc - mc, 360.0) / 3.0
+    lower = np.remainder(ic - asc, 360.0) / 3.0
+    first_half = np.stack(
+        (asc, asc + lower, asc + 2 * lower, ic, ic + upper, ic + 2 * upper), axis=-1
+    )
+    return np.remainder(
+        np.concatenate((first_half, first_half + 180.0), axis=-1), 360.0
+    )
+
+
+def house_of(longitudes: np.ndarray, cusps: np.ndarray) -> np.ndarray:
+    """1-based house number for each longitude, given (n, 12) cusps"""
+    offset = np.remainder(longitudes[:, :, None] - cusps[:, None, :], 360.0)
+    # The containing house is the cusp with the smallest forward distance
+    return np.argmin(offset, axis=-1) + 1
+
+
+def aspect_matrix(longitudes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Best aspect index (-1 = none) and orb for every body pair, shape (n, pairs)"""
+    sep = np.abs(
+        np.remainder(longitudes[:, _PAIR_I] - longitudes[:, _PAIR_J] + 180.0, 360.0)
+        - 180.0
+    )
+    orbs = np.abs(sep[..., None] - _ASPECT_ANGLES)
+    best = np.argmin(orbs, axis=-1)
+    best_orb = np.take_along_axis(orbs, best[..., None], axis=-1)[..., 0]
+    best = np.where(best_orb <= _ASPECT_ORBS[best], best, -1)
+    return best, best_orb
+
+
+def format_position(longitude: float) -> str:
+    """'Libra 8°' style label for an ecliptic longitude"""
+    return _POSITION_LABELS[int(float(longitude) % 360.0)]
+
+
+def sign_of(longitude: float) -> str:
+    return SIGNS[int((float(longitude) % 360.0) // 30)]
+
+
+def compute_chart(
+    birth_date: str,
+    birth_time: str = "unknown",
+    birth_timezone: str = "+00:00",
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+) -> dict:
+    """Compute placements, angles, houses and aspects for a single birth"""
+    jd = julian_day(birth_date, birth_time, birth_timezone)
+    time_known = np.array([bool(birth_time) and birth_time != "unknown"])
+    return charts_from_arrays(
+        np.array([jd]),
+        np.array([lat if lat is not None else np.nan]),
+        np.array([lon if lon is not None else np.nan]),
+        time_known,
+    )[0]
+
+
+def dominant_scores(
+    sign_idx: np.ndarray,
+    asc: np.ndarray,
+    houses: np.ndarray,
+    angles_known: np.ndarray,
+    tight: np.ndarray,
+) -> np.ndarray:
+    """Planet prominence by rulership, angularity and tight aspects, (n, 10)"""
+    n = sign_idx.shape[0]
+    rows = np.arange(n)
+    scores = np.zeros((n, len(BODIES)))
+    # One index per row in each update, so plain fancy-index adds are safe
+    scores[rows, _RULER_IDX[sign_idx[:, 0]]] += 3.0
+    scores[rows, _RULER_IDX[sign_idx[:, 1]]] += 1.0
+    asc_ruler = _RULER_IDX[(asc // 30).astype(int) % 12]
+    scores[rows, asc_ruler] += np.where(angles_known, 3.0, 0.0)
+    # Angular houses 1, 4, 7 and 10
+    angular = (houses % 3 == 1) & angles_known[:, None]
+    scores += 2.0 * angular
+    scores += tight.astype(float) @ _PAIR_BODIES
+    # Sun and Moon are reported separately, never as "dominant planets"
+    scores[:, :2] = -np.inf
+    return scores
+
+
+def charts_from_arrays(
+    jd: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    time_known: Optional[np.ndarray] = None,
+) -> list[dict]:
+    """Vectorized chart computation.
+
+    lat/lon may be NaN when unknown; angles and houses are only reported
+    where both the place and the birth time (time_known) are known.
+    """
+    lons, retro = positions_and_motion(jd)
+    aspect_idx, aspect_orb = aspect_matrix(lons)
+
+    has_place = ~(np.isnan(lat) | np.isnan(lon))
+    if time_known is not None:
+        has_place &= time_known
+    asc, mc = chart_angles(
+        jd, np.where(has_place, lat, 0.0), np.where(has_place, lon, 0.0)
+    )
+    cusps = house_cusps(asc, mc)
+    houses = house_of(lons, cusps)
+
+    sign_idx = (lons // 30).astype(int)
+    tight = (aspect_idx >= 0) & (aspect_orb <= TIGHT_ORB)
+    scores = dominant_scores(sign_idx, asc, houses, has_place, tight)
+    dominant = np.argsort(-scores, axis=1, kind="stable")[:, :2].tolist()
+
+    # Convert to plain Python once; per-element numpy access is slow
+    rounded = np.round(lons, 4).tolist()
+    sign_idx = sign_idx.tolist()
+    labels = lons.astype(int).tolist()
+    retro = retro.tolist()
+    # Real aspects first (tightest orb first), non-aspects sorted to the end
+    found = aspect_idx >= 0
+    order = np.argsort(np.where(found, aspect_orb, np.inf), axis=1)
+    aspect_counts = found.sum(axis=1).tolist()
+    aspect_idx = np.take_along_axis(aspect_idx, order, axis=1).tolist()
+    aspect_orb = np.round(np.take_along_axis(aspect_orb, order, axis=1), 1).tolist()
+    order = order.tolist()
+    has_place = has_place.tolist()
+    asc, mc = np.round(asc, 4).tolist(), np.round(mc, 4).tolist()
+    cusp_labels = cusps.astype(int).tolist()
+    cusps = np.round(cusps, 4).tolist()
+    houses = houses.tolist()
+
+    charts = []
+    for n in range(len(rounded)):
+        bodies = {
+            body: {
+                "longitude": rounded[n][k],
+                "sign": SIGNS[sign_idx[n][k]],
+                "position": _POSITION_LABELS[labels[n][k]],
+                "retrograde": retro[n][k],
+            }
+            for k, body in enumerate(BODIES)
+        }
+        chart = {
+            "julian_day": float(jd[n]),
+            "bodies": bodies,
+            "aspects": [
+                {
+                    "type": _ASPECT_NAMES[aspect_idx[n][a]],
+                    "between": _PAIR_NAMES[order[n][a]],
+                    "orb": f"{aspect_orb[n][a]}°",
+                }
+                for a in range(aspect_counts[n])
+            ],
+            "dominant_planets": [BODIES[k] for k in dominant[n]],
+            "ascendant": None,
+            "midheaven": None,
+            "houses": None,
+        }
+        if has_place[n]:
+            chart["ascendant"] = asc[n]
+            chart["midheaven"] = mc[n]
+            chart["houses"] = {
+                "system": HOUSE_SYSTEM,
+                "cusps": cusps[n],
+                "positions": [_POSITION_LABELS[c] for c in cusp_labels[n]],
+            }
+            for k, body in enumerate(BODIES):
+                bodies[body]["house"] = houses[n][k]
+        charts.append(chart)
+    return charts
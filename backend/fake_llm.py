@@ -0,0 +1,233 @@
+"""
+AstralSage - Fake LLM
+A local stand-in for the Gemini model, for load tests and offline work.
+It has the same generate_content_async() surface, sleeps for a
+configurable latency, fails at a configurable rate and answers with a
+schema-valid reading (or the line-per-object format when streaming).
+A share of replies can come back malformed the way real model output
+does: fenced, wrapped in prose, with a trailing comma, a field left out
+or cut off.
+
+Enable with FAKE_LLM=true; tune with FAKE_LLM_LATENCY_MS,
+FAKE_LLM_JITTER_MS, FAKE_LLM_ERROR_RATE, FAKE_LLM_SLOW_RATE,
+FAKE_LLM_SLOW_MS and FAKE_LLM_MALFORMED_RATE.
+
+Run as a script it serves the same model over the Gemini REST API, so
+the real HTTP transport (pooling, retries, hedging, circuit breaker) can
+be exercised locally; injected failures answer 503:
+
+    python fake_llm.py --port 8090 --latency-ms 300 --error-rate 0.1
+    GEMINI_API_KEY=fake GEMINI_BASE_URL=http://127.0.0.1:8090 uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Optional
+
+READING = {
+    "meta": {"model_version": "fake-llm", "generated_at": "1970-01-01T00:00:00Z"},
+    "request_id": "fake",
+    "input_summary": {},
+    "analysis": {},
+    "interpretation": "The stars are quiet today; this reading comes from the fake LLM.",
+    "sections": [
+        {"title": "Focus", "content": "Pick one task and finish it."},
+        {"title": "Social", "content": "Send a message to a friend."},
+    ],
+    "remedies": ["Take a short walk", "Drink a glass of water"],
+    "confidence_score": 0.5,
+    "warnings": [],
+}
+
+STREAM_LINES = [
+    {"interpretation": READING["interpretation"]},
+    *({"section": section} for section in READING["sections"]),
+    *({"remedy": remedy} for remedy in READING["remedies"]),
+    {"confidence_score": READING["confidence_score"]},
+    {"warnings": []},
+]
+
+
+def _fenced(text: str) -> str:
+    return "```json\n" + text + "\n```"
+
+
+def _prose(text: str) -> str:
+    return "Here is your reading:\n" + text + "\nLet me know if you need more!"
+
+
+def _trailing_comma(text: str) -> str:
+    return text[:-1] + ",}"
+
+
+def _missing_field(text: str) -> str:
+    reading = json.loads(text)
+    reading.pop("remedies", None)
+    return json.dumps(reading)
+
+
+def _truncated(text: str) -> str:
+    return text[: len(text) * 3 // 4]
+
+
+MALFORMATIONS = (_fenced, _prose, _trailing_comma, _missing_field, _truncated)
+
+
+class FakeLLMError(Exception):
+    """Injected upstream failure"""
+
+
+class _Response:
+    def __init__(self, text: str, usage_metadata: Optional[dict] = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class _StreamedResponse:
+    def __init__(self, lines: list[str], delay: float):
+        self._lines = lines
+        self._delay = delay
+
+    async def __aiter__(self):
+        for line in self._lines:
+            await asyncio.sleep(self._delay)
+            yield _Response(line + "\n")
+
+
+class FakeModel:
+    def __init__(
+        self,
+        latency_ms: float,
+        jitter_ms: float = 0,
+        error_rate: float = 0,
+        slow_rate: float = 0,
+        slow_ms: float = 0,
+        system_instruction: Optional[str] = None,
+        malformed_rate: float = 0,
+    ):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        # A share of calls that take slow_ms longer: the latency tail
+        self.slow_rate = slow_rate
+        self.slow = slow_ms / 1000
+        self.system_instruction = system_instruction
+        self.malformed_rate = malformed_rate
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, stream=False, request_options=None):
+        self.calls += 1
+        delay = max(self.latency + random.uniform(-self.jitter, self.jitter), 0)
+        if random.random() < self.slow_rate:
+            delay += self.slow
+        if random.random() < self.error_rate:
+            await asyncio.sleep(delay / 2)
+            raise FakeLLMError("injected upstream failure")
+        malformed = random.random() < self.malformed_rate
+        if stream:
+            lines = [json.dumps(line) for line in STREAM_LINES]
+            if malformed:
+                lines = _fenced("\n".join(lines)).split("\n")
+            # First token after a fifth of the latency, the rest spread out
+            await asyncio.sleep(delay / 5)
+            return _StreamedResponse(lines, delay * 4 / 5 / len(lines))
+        await asyncio.sleep(delay)
+        text = json.dumps(READING)
+        if malformed:
+            text = random.choice(MALFORMATIONS)(text)
+        return _Response(text)
+
+
+def _candidate(text: str, usage: Optional[dict] = None) -> dict:
+    payload = {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]
+    }
+    if usage:
+        payload["usageMetadata"] = usage
+    return payload
+
+
+def _usage(body: dict, prompt: str, text: str) -> dict:
+    """Token counts like the API's usageMetadata, at 4 bytes per token"""
+    system = body.get("systemInstruction", {}).get("parts", [{}])[0].get("text", "")
+    prompt_tokens = len((system + prompt).encode()) // 4
+    output_tokens = len(text.encode()) // 4
+    return {
+        "promptTokenCount": prompt_tokens,
+        "candidatesTokenCount": output_tokens,
+        "totalTokenCount": prompt_tokens + output_tokens,
+    }
+
+
+def fake_gemini_app(model: FakeModel):
+    """An ASGI app answering generateContent and streamGenerateContent"""
+    from starlette.applications import Starlette
+    from starlette.requests import ClientDisconnect, Request
+    from starlette.responses import JSONResponse, Response, StreamingResponse
+    from starlette.routing import Route
+
+    async def generate(request: Request):
+        try:
+            body = await request.json()
+        except ClientDisconnect:
+            # e.g. the losing half of a hedged pair, cancelled early
+            return Response(status_code=499)
+        prompt = "".join(p.get("text", "") for p in body["contents"][0]["parts"])
+        stream = request.path_params["method"] == "streamGenerateContent"
+        try:
+            response = await model.generate_content_async(prompt, stream=stream)
+        except FakeLLMError as e:
+            error = {"code": 503, "message": str(e), "status": "UNAVAILABLE"}
+            return JSONResponse({"error": error}, status_code=503)
+        if not stream:
+            usage = _usage(body, prompt, response.text)
+            return JSONResponse(_candidate(response.text, usage))
+
+        async def events():
+            async for chunk in response:
+                yield f"data: {json.dumps(_candidate(chunk.text))}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def stats(request: Request):
+        return JSONResponse({"calls": model.calls})
+
+    return Starlette(
+        routes=[
+            Route("/v1beta/models/{name}:{method}", generate, methods=["POST"]),
+            Route("/stats", stats),
+        ]
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Gemini REST server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--slow-rate", type=float, default=0)
+    parser.add_argument("--slow-ms", type=float, default=0)
+    parser.add_argument("--malformed-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    fake = FakeModel(
+        args.latency_ms,
+        args.jitter_ms,
+        args.error_rate,
+        args.slow_rate,
+        args.slow_ms,
+        malformed_rate=args.malformed_rate,
+    )
+    uvicorn.run(
+        fake_gemini_app(fake),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+        access_log=False,
+    )
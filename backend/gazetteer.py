@@ -0,0 +1,333 @@
+"""
+AstralSage - Gazetteer
+Offline birth place lookup: city and country to coordinates and IANA
+timezone, plus prefix suggestions for the forms' autocomplete.
+
+data/cities.tsv and data/countries.tsv are the sources; build() turns
+them into one compact index file:
+  MAGIC | header length (u32, little-endian) | header JSON | padding
+  | record offsets (native u32, one more than records) | records
+The header maps normalized country names and aliases to ISO codes.
+There is one record per city name and alternate name,
+"key\\tname\\tcountry\\tlat\\tlon\\ttimezone\\tpopulation\\n", sorted by
+normalized key and then largest city first. The file is memory-mapped
+and searched by binary search over the offsets, so a lookup reads a
+dozen keys from the mapping and parses only the records it returns.
+
+The index is built (or rebuilt, when older than the sources) the first
+time a lookup needs it, not at import.
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+import unicodedata
+from array import array
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+MAGIC = b"ASPLACE1"
+_HEADER_LENGTH = struct.Struct("<I")
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CITIES_PATH = os.path.join(DATA_DIR, "cities.tsv")
+COUNTRIES_PATH = os.path.join(DATA_DIR, "countries.tsv")
+# Where the index is built and mapped from; "" disables geocoding
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", os.path.join(DATA_DIR, "gazetteer.idx"))
+
+# Misspelled names match a key at least this similar (difflib ratio)
+FUZZY_CUTOFF = 0.8
+
+# Letters NFKD does not split into a base letter and an accent
+_LETTERS = str.maketrans({"ł": "l", "ø": "o", "đ": "d", "ı": "i", "æ": "ae"})
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+class Place(NamedTuple):
+    name: str
+    country: str  # ISO 3166 code
+    lat: float
+    lon: float
+    timezone: str  # IANA name
+    population: int
+    match: str = "exact"  # or "fuzzy"
+
+
+@lru_cache(maxsize=8192)
+def normalize(text: str) -> str:
+    """Lookup key: casefolded, accents stripped, punctuation as spaces"""
+    text = unicodedata.normalize("NFKD", text.casefold().translate(_LETTERS))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def _rows(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                yield line.rstrip("\n").split("\t")
+
+
+def build(path: str = GAZETTEER_PATH) -> int:
+    """Write the index from the source files; returns the number of records"""
+    records = set()
+    for name, alternates, country, lat, lon, timezone, population in _rows(CITIES_PATH):
+        for alias in (name, *alternates.split(",")):
+            key = normalize(alias)
+            if key:
+                records.add((key, -int(population), name, country, lat, lon, timezone))
+    countries, names = {}, {}
+    for code, name, alternates in _rows(COUNTRIES_PATH):
+        names[code] = name
+        for alias in (name, *alternates.split(",")):
+            countries.setdefault(normalize(alias), code)
+
+    lines = [
+        "\t".join((key, name, country, lat, lon, timezone, str(-population)))
+        for key, population, name, country, lat, lon, timezone in sorted(records)
+    ]
+    blob = "\n".join(lines).encode() + b"\n"
+    offsets = array("I", [0])
+    for line in lines:
+        offsets.append(offsets[-1] + len(line.encode()) + 1)
+    header = json.dumps(
+        {"records": len(lines), "countries": countries, "names": names},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+    start = len(MAGIC) + _HEADER_LENGTH.size + len(header)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+        f.write(b"\0" * (-start % offsets.itemsize))  # align the offsets
+        f.write(offsets.tobytes())
+        f.write(blob)
+    os.replace(temporary, path)
+    return len(lines)
+
+
+def _stale(path: str) -> bool:
+    try:
+        built = os.path.getmtime(path)
+    except OSError:
+        return True
+    return any(
+        os.path.getmtime(source) > built for source in (CITIES_PATH, COUNTRIES_PATH)
+    )
+
+
+class _Keys:
+    """The sorted record keys, as bytes read from the mapping, for bisect"""
+
+    def __init__(self, index: "Gazetteer"):
+        self._map = index._map
+        self._offsets = index._offsets
+        self._base = index._base
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self._base + self._offsets[i]
+        return self._map[start : self._map.find(b"\t", start)]
+
+
+class Gazetteer:
+    """The index file, memory-mapped read-only"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a gazetteer index")
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        (length,) = _HEADER_LENGTH.unpack_from(self._map, len(MAGIC))
+        header = json.loads(self._map[start : start + length])
+        self.countries: dict[str, str] = header["countries"]
+        self.country_names: dict[str, str] = header["names"]
+        table = start + length
+        table += -table % 4
+        count = header["records"] + 1
+        # Zero-copy view; the mapping stays open for the life of the process
+        self._offsets = memoryview(self._map)[table : table + 4 * count].cast("I")
+        self._base = table + 4 * count
+        self._keys = _Keys(self)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _place(self, i: int, match: str = "exact") -> Place:
+        start = self._base + self._offsets[i]
+        end = self._base + self._offsets[i + 1] - 1
+        _, name, country, lat, lon, timezone, population = (
+            self._map[start:end].decode().split("\t")
+        )
+        return Place(
+            name, country, float(lat), float(lon), timezone, int(population), match
+        )
+
+    def _span(self, key: bytes, prefix: bool = False) -> range:
+        """Indexes of the records whose key is key (or starts with it)"""
+        keys = self._keys
+        lo = bisect.bisect_left(keys, key, 0, len(keys))
+        if prefix:
+            # No UTF-8 sequence contains 0xff, so this sorts after every extension
+            hi = bisect.bisect_left(keys, key + b"\xff", lo, len(keys))
+        else:
+            hi = bisect.bisect_right(keys, key, lo, len(keys))
+        return range(lo, hi)
+
+    def country_code(self, country: str) -> Optional[str]:
+        """ISO code for a country name, alias or code; None if unknown"""
+        key = normalize(country)
+        code = key.upper()
+        if code in self.country_names:
+            return code
+        return self.countries.get(key)
+
+    def resolve(
+        self, city: str, country: str = "", anywhere: bool = False
+    ) -> Optional[Place]:
+        """The best place for a city name: an exact name or alternate name,
+        else the closest spelling with the same first letter; the largest
+        city wins ties. A country restricts the candidates; one that is not
+        recognized (a state, a typo) finds nothing, unless anywhere is set
+        to search every country instead."""
+        key = normalize(city)
+        if not key:
+            return None
+        code = None
+        if country.strip():
+            code = self.country_code(country)
+            if code is None and not anywhere:
+                return None
+        for i in self._span(key.encode()):
+            place = self._place(i)
+            if code is None or place.country == code:
+                return place
+        return self._fuzzy(key, code)
+
+    def _fuzzy(self, key: str, code: Optional[str]) -> Optional[Place]:
+        # Deferred: only names that are not in the index need it
+        import difflib
+
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        best, best_ratio = None, FUZZY_CUTOFF
+        for i in self._span(key[:1].encode(), prefix=True):
+            matcher.set_seq1(self._keys[i].decode())
+            if (
+                matcher.real_quick_ratio() < best_ratio
+                or matcher.quick_ratio() < best_ratio
+            ):
+                continue
+            ratio = matcher.ratio()
+            # Ties go to the first key; its records come largest city first
+            if ratio < best_ratio or (best and ratio == best_ratio):
+                continue
+            place = self._place(i, "fuzzy")
+            if code is None or place.country == code:
+                best, best_ratio = place, ratio
+        return best
+
+    def suggest(self, text: str, country: str = "", limit: int = 8) -> list[Place]:
+        """Places whose name or alternate name starts with text: those
+        matched by name first, each group largest first"""
+        key = normalize(text)
+        if not key:
+            return []
+        code = self.country_code(country) if country else None
+        found = {}
+        for i in self._span(key.encode(), prefix=True):
+            place = self._place(i)
+            if code is None or place.country == code:
+                found.setdefault((place.name, place.country), place)
+        return sorted(
+            found.values(),
+            key=lambda place: (
+                not normalize(place.name).startswith(key),
+                -place.population,
+            ),
+        )[:limit]
+
+    def describe(self, place: Place) -> dict:
+        """JSON form of a place, as the API returns it"""
+        country_name = self.country_names.get(place.country, place.country)
+        return {
+            "city": place.name,
+            "country": country_name,
+            "country_code": place.country,
+            "lat": place.lat,
+            "lon": place.lon,
+            "timezone": place.timezone,
+            "label": f"{place.name}, {country_name}",
+        }
+
+
+_gazetteer: Optional[Gazetteer] = None
+_unavailable = False
+
+
+def get() -> Optional[Gazetteer]:
+    """The shared index, built and mapped on first use; None if it cannot be"""
+    global _gazetteer, _unavailable
+    if _gazetteer is None and not _unavailable and GAZETTEER_PATH:
+        try:
+            if _stale(GAZETTEER_PATH):
+                print(f"🗺️ Building gazetteer index {GAZETTEER_PATH}")
+                build(GAZETTEER_PATH)
+            _gazetteer = Gazetteer(GAZETTEER_PATH)
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            print(f"⚠️ Gazetteer unavailable, birth places not geocoded: {e}")
+            _unavailable = True
+    return _gazetteer
+
+
+@lru_cache(maxsize=4096)
+def resolve(city: str, country: str = "", anywhere: bool = False) -> Optional[Place]:
+    """Gazetteer.resolve on the shared index, cached per (city, country)"""
+    index = get()
+    return index.resolve(city, country, anywhere) if index else None
+
+
+def suggest(text: str, country: str = "", limit: int = 8) -> list[dict]:
+    index = get()
+    if not index:
+        return []
+    return [index.describe(place) for place in index.suggest(text, country, limit)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the gazetteer")
+    parser.add_argument("--build", action="store_true", help="(re)build the index")
+    parser.add_argument("city", nargs="?")
+    parser.add_argument("country", nargs="?", default="")
+    args = parser.parse_args()
+    if args.build:
+        start = time.perf_counter()
+        records = build(GAZETTEER_PATH)
+        summary = {
+            "path": GAZETTEER_PATH,
+            "records": records,
+            "bytes": os.path.getsize(GAZETTEER_PATH),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        print(json.dumps(summary))
+    if args.city:
+        place = resolve(args.city, args.country)
+        print(
+            json.dumps(
+                get().describe(place) | {"match": place.match} if place else None
+            )
+        )
+    elif not args.build:
+        parser.print_usage()
+        sys.exit(2)
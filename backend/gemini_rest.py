@@ -0,0 +1,126 @@
+"""
+AstralSage - Gemini REST client
+Gemini over plain HTTPS with one pooled httpx client per worker, so
+calls reuse keep-alive connections instead of paying for a new TLS
+handshake each time. It has the SDK's generate_content_async() surface,
+so llm.py and upstream.Upstream treat both alike, and it can point at a
+local fake server (python fake_llm.py).
+
+The system instruction is set once per client and its JSON encoded
+once; each request only encodes the prompt behind that fixed prefix.
+"""
+
+import json
+from typing import Optional
+
+import httpx
+
+from upstream import UpstreamHTTPError
+
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+class _Response:
+    """Response text plus the API's usageMetadata (token counts), if sent"""
+
+    __slots__ = ("text", "usage_metadata")
+
+    def __init__(self, payload: dict):
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            feedback = payload.get("promptFeedback", {})
+            raise ValueError(f"no candidates in response ({feedback or 'empty'})")
+        parts = candidates[0].get("content", {}).get("parts", [])
+        self.text = "".join(part.get("text", "") for part in parts)
+        self.usage_metadata = payload.get("usageMetadata")
+
+
+class _StreamedResponse:
+    """Text chunks of a streamGenerateContent call, read as SSE events"""
+
+    def __init__(self, response: httpx.Response):
+        self._response = response
+
+    async def __aiter__(self):
+        try:
+            async for line in self._response.aiter_lines():
+                if line.startswith("data:"):
+                    yield _Response(json.loads(line[5:]))
+        finally:
+            await self._response.aclose()
+
+
+class GeminiRestModel:
+    """generateContent / streamGenerateContent over a keep-alive pool"""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str,
+        timeout: float,
+        max_connections: int,
+        keepalive_seconds: float,
+        system_instruction: Optional[str] = None,
+    ):
+        self.path = f"/v1beta/models/{model}"
+        self._prefix = b"{"
+        if system_instruction:
+            instruction = {"parts": [{"text": system_instruction}]}
+            self._prefix += b'"systemInstruction":' + json.dumps(instruction).encode()
+            self._prefix += b","
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"x-goog-api-key": api_key},
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_seconds,
+            ),
+        )
+
+    def _body(self, prompt: str) -> bytes:
+        contents = [{"role": "user", "parts": [{"text": prompt}]}]
+        return self._prefix + b'"contents":' + json.dumps(contents).encode() + b"}"
+
+    @staticmethod
+    async def _raise_for_status(response: httpx.Response):
+        if response.status_code < 400:
+            return
+        await response.aread()
+        await response.aclose()
+        raise UpstreamHTTPError(
+            response.status_code, response.text[:200], _retry_after(response)
+        )
+
+    async def generate_content_async(self, prompt, stream=False, request_options=None):
+        if not stream:
+            response = await self.client.post(
+                f"{self.path}:generateContent",
+                content=self._body(prompt),
+                headers=_JSON_HEADERS,
+            )
+            await self._raise_for_status(response)
+            return _Response(response.json())
+
+        request = self.client.build_request(
+            "POST",
+            f"{self.path}:streamGenerateContent",
+            params={"alt": "sse"},
+            content=self._body(prompt),
+            headers=_JSON_HEADERS,
+        )
+        response = await self.client.send(request, stream=True)
+        await self._raise_for_status(response)
+        return _StreamedResponse(response)
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -0,0 +1,109 @@
+"""
+AstralSage - HTTP caching
+ETag, Cache-Control and 304 Not Modified for the GET variants of
+readings that only change when the horoscope day rolls over.
+
+Those bodies carry a request_id derived from the reading (endpoint, key
+and day) instead of a fresh one, so the same reading is the same bytes
+on every request and a strong ETag names it. The per-request id is sent
+as the X-Request-ID header instead. Finished bodies are kept per day in
+a ResponseCache, in front of the daily artifact, the LLM cache and the
+mock: a repeated GET is a dict lookup, and a conditional one a string
+compare.
+"""
+
+import hashlib
+import uuid
+from datetime import date
+from typing import Hashable, NamedTuple, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# uuid5 namespace of the stable reading ids
+_READING_IDS = uuid.UUID("b90acec9-481c-4e46-a50b-614e54b9ee09")
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def reading_id(*parts) -> str:
+    """Stable request_id of a cacheable reading, e.g. ("quick_horoscope",
+    "Leo", "today", day); the same in every worker"""
+    return str(uuid.uuid5(_READING_IDS, "/".join(map(str, parts))))
+
+
+def etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def not_modified(if_none_match: Optional[str], tag: str) -> bool:
+    """Whether an If-None-Match header matches tag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(t.strip().removeprefix("W/") == tag for t in if_none_match.split(","))
+
+
+def request_id(request: Request) -> str:
+    """The X-Request-ID set by a proxy in front of us, else a new one"""
+    given = request.headers.get("x-request-id", "")
+    if 0 < len(given) <= 128 and given.isprintable():
+        return given
+    return str(uuid.uuid4())
+
+
+def cached_response(request: Request, cached: CachedBody, max_age: int) -> Response:
+    """cached as a 200, or a 304 when the client already has it; max_age
+    0 makes caches revalidate every time"""
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": f"public, max-age={max_age}" if max_age > 0 else "no-cache",
+        "X-Request-ID": request_id(request),
+    }
+    if not_modified(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """Finished response bodies and their ETags, for the current day only.
+
+    Keys are few (one per sign and period), so entries are simply dropped
+    when the day changes.
+    """
+
+    def __init__(self):
+        self._entries: dict[Hashable, CachedBody] = {}
+        self._day: Optional[date] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, day: date, key: Hashable) -> Optional[CachedBody]:
+        if day != self._day:
+            self._entries.clear()
+            self._day = day
+        cached = self._entries.get(key)
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+
+    def put(self, day: date, key: Hashable, body: bytes) -> CachedBody:
+        cached = CachedBody(body, etag(body))
+        if day == self._day:
+            self._entries[key] = cached
+        return cached
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
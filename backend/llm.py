@@ -0,0 +1,287 @@
+"""
+AstralSage - LLM client
+Async Gemini access through the scheduler (bounded concurrency and
+queue, prompt coalescing), with per-call timeouts and cancellation when
+the HTTP client goes away. Calls go through upstream.Upstream (retries,
+hedging, circuit breaker), over pooled HTTPS by default. The system
+instruction is configured on the client once, so callers send only the
+task prompt. The client is built lazily, so importing this module stays
+cheap
+"""
+
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Optional
+
+from dotenv import load_dotenv
+from starlette.requests import Request
+
+import metrics
+from prompts import SYSTEM_PROMPT, estimate_tokens
+from scheduler import LLMScheduler
+from upstream import CircuitBreaker, Upstream
+
+load_dotenv()
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_MAX_QUEUE = int(os.getenv("GEMINI_MAX_QUEUE", "64"))
+GEMINI_MAX_QUEUE_WAIT_SECONDS = float(os.getenv("GEMINI_MAX_QUEUE_WAIT_SECONDS", "5"))
+
+# "rest": pooled HTTPS to GEMINI_BASE_URL (a fake_llm.py server works
+# too); "sdk": the google-generativeai client
+GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT", "rest").lower()
+GEMINI_BASE_URL = os.getenv(
+    "GEMINI_BASE_URL", "https://generativelanguage.googleapis.com"
+)
+GEMINI_KEEPALIVE_SECONDS = float(os.getenv("GEMINI_KEEPALIVE_SECONDS", "60"))
+
+# Retries of transient failures, with exponential backoff from this base
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+GEMINI_RETRY_BACKOFF_SECONDS = float(os.getenv("GEMINI_RETRY_BACKOFF_SECONDS", "0.2"))
+
+# Send a second, hedged request when a call runs past the recent p95
+GEMINI_HEDGE = os.getenv("GEMINI_HEDGE", "true").lower() in ("1", "true", "yes")
+
+# After this many failures in a row, skip the upstream for the cooldown
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_BREAKER_COOLDOWN_SECONDS = float(
+    os.getenv("GEMINI_BREAKER_COOLDOWN_SECONDS", "30")
+)
+
+FAKE_LLM = os.getenv("FAKE_LLM", "false").lower() in ("1", "true", "yes")
+
+# How often a pending LLM call checks whether its HTTP client is still there
+DISCONNECT_POLL_SECONDS = 0.25
+
+# Start loading the model client in the background at startup, so the
+# first LLM request does not pay for it; off means load on first use only
+LLM_WARMUP = os.getenv("LLM_WARMUP", "true").lower() in ("1", "true", "yes")
+
+# The Gemini SDK takes most of a second to import, so the client is built
+# on first use (in a thread) rather than at import; mock-only workers
+# never load it at all
+gemini_model = None
+_state = "cold" if FAKE_LLM or GEMINI_API_KEY else "disabled"
+_loading: Optional[asyncio.Future] = None
+_load_seconds: Optional[float] = None
+
+if _state == "disabled":
+    print("ℹ️ No GEMINI_API_KEY found - using mock data (perfect for demo!)")
+
+
+def _load_model():
+    if FAKE_LLM:
+        from fake_llm import FakeModel
+
+        print("🧪 FAKE_LLM enabled - using the local fake model")
+        return FakeModel(
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "800")),
+            jitter_ms=float(os.getenv("FAKE_LLM_JITTER_MS", "200")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            slow_rate=float(os.getenv("FAKE_LLM_SLOW_RATE", "0")),
+            slow_ms=float(os.getenv("FAKE_LLM_SLOW_MS", "0")),
+            system_instruction=SYSTEM_PROMPT,
+            malformed_rate=float(os.getenv("FAKE_LLM_MALFORMED_RATE", "0")),
+        )
+
+    if GEMINI_TRANSPORT == "sdk":
+        import google.generativeai as genai
+
+        genai.configure(api_key=GEMINI_API_KEY)
+        model = genai.GenerativeModel(
+            GEMINI_MODEL_NAME, system_instruction=SYSTEM_PROMPT
+        )
+        print("✅ Gemini AI configured successfully!")
+        return model
+
+    from gemini_rest import GeminiRestModel
+
+    model = GeminiRestModel(
+        api_key=GEMINI_API_KEY,
+        model=GEMINI_MODEL_NAME,
+        base_url=GEMINI_BASE_URL,
+        timeout=GEMINI_TIMEOUT_SECONDS,
+        # Hedged requests can briefly double the calls in flight
+        max_connections=GEMINI_MAX_CONCURRENCY * 2,
+        keepalive_seconds=GEMINI_KEEPALIVE_SECONDS,
+        system_instruction=SYSTEM_PROMPT,
+    )
+    print(f"✅ Gemini AI configured successfully! ({GEMINI_BASE_URL})")
+    return model
+
+
+async def _load():
+    global gemini_model, _state, _load_seconds
+    _state = "loading"
+    start = time.perf_counter()
+    try:
+        gemini_model = await asyncio.to_thread(_load_model)
+        _state = "ready"
+    except Exception as e:
+        print(f"⚠️ Gemini setup failed: {e}")
+        _state = "failed"
+    _load_seconds = time.perf_counter() - start
+
+
+def enabled() -> bool:
+    """Whether readings should try the LLM (it may still be loading)"""
+    return _state not in ("disabled", "failed")
+
+
+async def get_model():
+    """The model client, loading it on first use; None when unavailable"""
+    global _loading
+    if _state == "ready" or not enabled():
+        return gemini_model
+    if _loading is None:
+        _loading = asyncio.ensure_future(_load())
+    # Shielded: a cancelled request must not abort the shared load
+    await asyncio.shield(_loading)
+    return gemini_model
+
+
+def warm_up():
+    """Start loading the client in the background (call from a running loop)"""
+    if LLM_WARMUP and enabled():
+        asyncio.ensure_future(get_model())
+
+
+def readiness() -> dict:
+    return {
+        "state": _state,
+        "ready": _state == "ready",
+        "backend": "fake" if FAKE_LLM else f"gemini-{GEMINI_TRANSPORT}",
+        "load_ms": None if _load_seconds is None else round(_load_seconds * 1000, 1),
+    }
+
+
+# Caps LLM round-trips in flight and how long requests queue for one
+scheduler = LLMScheduler(
+    max_in_flight=GEMINI_MAX_CONCURRENCY,
+    max_queue=GEMINI_MAX_QUEUE,
+    max_wait=GEMINI_MAX_QUEUE_WAIT_SECONDS,
+)
+
+upstream = Upstream(
+    max_retries=GEMINI_MAX_RETRIES,
+    backoff=GEMINI_RETRY_BACKOFF_SECONDS,
+    hedge=GEMINI_HEDGE,
+    breaker=CircuitBreaker(GEMINI_BREAKER_FAILURES, GEMINI_BREAKER_COOLDOWN_SECONDS),
+)
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away before the LLM call finished"""
+
+
+def _account(prompt: str, text: str, usage) -> None:
+    """Record prompt bytes and tokens, as reported by the upstream
+    (REST usageMetadata dict or SDK usage_metadata) or else estimated"""
+    if isinstance(usage, dict):
+        counts = (
+            usage.get("promptTokenCount", 0),
+            usage.get("candidatesTokenCount", 0),
+            usage.get("cachedContentTokenCount", 0),
+        )
+    elif getattr(usage, "prompt_token_count", 0):
+        counts = (
+            usage.prompt_token_count,
+            usage.candidates_token_count,
+            getattr(usage, "cached_content_token_count", 0),
+        )
+    else:
+        counts = (estimate_tokens(SYSTEM_PROMPT + prompt), estimate_tokens(text), 0)
+    metrics.count_llm_usage(len(prompt.encode()), *counts)
+
+
+async def _generate(prompt: str) -> str:
+    async def attempt():
+        return await gemini_model.generate_content_async(
+            prompt, request_options={"timeout": GEMINI_TIMEOUT_SECONDS}
+        )
+
+    response = await upstream.call(attempt, GEMINI_TIMEOUT_SECONDS)
+    _account(prompt, response.text, getattr(response, "usage_metadata", None))
+    return response.text
+
+
+async def generate_text(prompt: str) -> Optional[str]:
+    """Run one non-blocking Gemini call and return the raw response text.
+
+    Identical prompts already in flight share a single upstream call.
+    Raises LLMOverloaded when the scheduler cannot start it in time, and
+    upstream.CircuitOpen while the upstream is failing.
+    """
+    if not await get_model():
+        return None
+    # Refuse before queueing: no slot is worth waiting for
+    upstream.check()
+    return await scheduler.run(prompt, lambda: _generate(prompt))
+
+
+async def stream_text(prompt: str) -> AsyncIterator[str]:
+    """Yield Gemini response text chunks as they are generated"""
+    if not await get_model():
+        return
+
+    upstream.check()
+    async with scheduler.slot():
+        response = await upstream.open_stream(
+            lambda: gemini_model.generate_content_async(
+                prompt,
+                stream=True,
+                request_options={"timeout": GEMINI_TIMEOUT_SECONDS},
+            ),
+            GEMINI_TIMEOUT_SECONDS,
+        )
+        chunks = response.__aiter__()
+        deadline = asyncio.get_running_loop().time() + GEMINI_TIMEOUT_SECONDS
+        produced, usage = [], None
+        try:
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                try:
+                    chunk = await asyncio.wait_for(
+                        chunks.__anext__(), max(remaining, 0)
+                    )
+                except StopAsyncIteration:
+                    return
+                # Streamed usage counts are running totals; keep the last
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                produced.append(chunk.text)
+                yield chunk.text
+        finally:
+            _account(prompt, "".join(produced), usage)
+            # Hands a pooled connection back even when the reader stops early
+            close = getattr(chunks, "aclose", None)
+            if close:
+                await close()
+
+
+async def aclose():
+    """Close the model's connection pool, if it has one"""
+    close = getattr(gemini_model, "aclose", None)
+    if close:
+        await close()
+
+
+async def cancel_on_disconnect(request: Optional[Request], coro):
+    """Await coro, cancelling it if the HTTP client disconnects meanwhile"""
+    if request is None:
+        return await coro
+
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
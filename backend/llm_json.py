@@ -0,0 +1,149 @@
+"""
+AstralSage - LLM JSON recovery
+Pull JSON objects out of model output that is not clean JSON: Markdown
+fences, prose before or after the object, several objects in a row, or
+a reply cut off mid-object.
+
+ObjectExtractor is fed text as it arrives and returns each top-level
+object as soon as its closing brace is seen. It tracks only brackets and
+string state, jumping from one structural character to the next, so the
+text is scanned once however it is chunked. parse_object() then repairs
+the usual defects (trailing commas, raw newlines inside strings, a
+truncated tail) when the object does not parse as it is.
+"""
+
+import json
+import re
+from typing import Optional
+
+from serialization import loads
+
+# Characters that change the scanner's state; everything else is skipped
+_STRUCTURAL = re.compile(r'[{}\[\]",\\]')
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+# How many cut points parse_object() tries on a truncated object
+MAX_CUTS = 16
+
+
+class ObjectExtractor:
+    """Finds complete top-level JSON objects in text fed piece by piece"""
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0  # next index to scan
+        self._start = -1  # index of the current object's "{", -1 outside one
+        self._closers: list[str] = []
+        self._in_string = False
+        # (index, depth) of commas in open containers; text[:index] plus
+        # the first depth closers is a complete prefix of the object
+        self._cuts: list[tuple[int, int]] = []
+
+    def feed(self, text: str) -> list[str]:
+        """Add text; return the objects it completed, in order"""
+        self._text += text
+        found = []
+        for match in _STRUCTURAL.finditer(self._text, self._pos):
+            i = match.start()
+            if i < self._pos:
+                continue  # the character after a backslash
+            char = match.group()
+            self._pos = i + 1
+            if self._start < 0:
+                if char == "{":
+                    self._start = i
+                    self._closers = ["}"]
+                    self._cuts = [(i + 1, 1)]
+            elif self._in_string:
+                if char == "\\":
+                    self._pos = i + 2
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._closers.append("}")
+            elif char == "[":
+                self._closers.append("]")
+            elif char == ",":
+                self._cuts.append((i, len(self._closers)))
+            elif char in "}]":
+                self._closers.pop()
+                while self._cuts and self._cuts[-1][1] > len(self._closers):
+                    self._cuts.pop()
+                if not self._closers:
+                    found.append(self._text[self._start : i + 1])
+                    self._start = -1
+        self._pos = max(self._pos, len(self._text))
+        self._trim()
+        return found
+
+    def _trim(self):
+        """Drop text that can no longer belong to an object"""
+        if self._start < 0:
+            self._text, self._pos = "", 0
+        elif self._start > 0:
+            start = self._start
+            self._text = self._text[start:]
+            self._pos -= start
+            self._start = 0
+            self._cuts = [(index - start, depth) for index, depth in self._cuts]
+
+    def unfinished(self) -> list[str]:
+        """Closed-off versions of the object still open at the end of the
+        text, longest first: as it is (unless cut inside a string), then
+        cut back to each earlier comma"""
+        if self._start < 0:
+            return []
+        candidates = []
+        if not self._in_string:
+            text = self._text.rstrip().rstrip(",")
+            candidates.append(text + "".join(reversed(self._closers)))
+        for index, depth in reversed(self._cuts[-MAX_CUTS:]):
+            closers = "".join(reversed(self._closers[:depth]))
+            candidates.append(self._text[:index] + closers)
+        return candidates
+
+
+def _loads_lenient(text: str):
+    # Raw newlines and tabs inside strings are a common model slip;
+    # the stdlib parser accepts them with strict=False
+    return json.loads(_TRAILING_COMMA.sub(r"\1", text), strict=False)
+
+
+def parse_object(text: str) -> tuple[Optional[dict], str]:
+    """The first JSON object in text and how it was recovered: "clean"
+    (the text is the object), "extracted" (found among other text),
+    "repaired", or (None, "failed")"""
+    try:
+        value = loads(text)
+        if isinstance(value, dict):
+            return value, "clean"
+    except ValueError:
+        pass
+
+    extractor = ObjectExtractor()
+    for candidate in extractor.feed(text):
+        value, outcome = parse_candidate(candidate)
+        if value is not None:
+            return value, "extracted" if outcome == "clean" else outcome
+    for candidate in extractor.unfinished():
+        try:
+            value = _loads_lenient(candidate)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value, "repaired"
+    return None, "failed"
+
+
+def parse_candidate(candidate: str) -> tuple[Optional[dict], str]:
+    """Parse one extracted object, repairing it if needed"""
+    for outcome, parse in (("clean", loads), ("repaired", _loads_lenient)):
+        try:
+            value = parse(candidate)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value, outcome
+    return None, "failed"
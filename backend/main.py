@@ -3,91 +3,280 @@ AstralSage - Astrology Prediction API
 FastAPI backend for astrology readings
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 from typing import Optional, Literal
-from datetime import datetime
+from datetime import date, datetime, time, timezone
+from math import ceil, nan
+import asyncio
 import uuid
 import os
 from dotenv import load_dotenv
 
+import gazetteer
+import http_cache
+import llm
+import llm_json
+import metrics
+import mock_readings
+import prompts
+import ratelimit
+import timezones
+import zodiac
+from daily_artifact import DailyArtifacts, artifact_key
+from daily_cache import DailyResponseCache, prewarm_forever
+from natal_cache import NatalReadingCache, natal_key, reading_version
+from scheduler import LLMOverloaded
+from serialization import FastJSONResponse, dumps, json_bytes_response
+from streaming import MEDIA_TYPES, STREAM_INSTRUCTIONS, StreamFormat, stream_reading
+from upstream import CircuitOpen
+
 load_dotenv()
 
-app = FastAPI(title="AstralSage API", version="1.0.0")
+app = FastAPI(
+    title="AstralSage API",
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+)
 
-# CORS for React frontend
+# Browser origins allowed to call the API (the React dev servers by
+# default), comma-separated; "*" allows any, without credentials
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv(
+        "CORS_ORIGINS", "http://localhost:5173,http://localhost:3000"
+    ).split(",")
+    if origin.strip()
+]
+
+# Per-client token bucket on /api/ requests, per worker; 0 disables
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "30"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+# Key clients by the first X-Forwarded-For address; only behind a proxy
+# that sets it, or clients could pick their own key
+RATE_LIMIT_TRUST_FORWARDED = os.getenv(
+    "RATE_LIMIT_TRUST_FORWARDED", "false"
+).lower() in ("1", "true", "yes")
+# API keys (X-API-Key) that get a bucket of their own, comma-separated;
+# any other key is ignored and the client is keyed by address
+RATE_LIMIT_API_KEYS = frozenset(
+    key.strip()
+    for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",")
+    if key.strip()
+)
+# Identical POSTs from one client within this many seconds (or while the
+# first is running) share its response; 0 disables
+DEDUPE_WINDOW_SECONDS = float(os.getenv("DEDUPE_WINDOW_SECONDS", "2"))
+
+rate_limits = (
+    ratelimit.TokenBuckets(
+        RATE_LIMIT_PER_MINUTE / 60, RATE_LIMIT_BURST, RATE_LIMIT_MAX_CLIENTS
+    )
+    if RATE_LIMIT_PER_MINUTE > 0
+    else None
+)
+recent_posts = (
+    ratelimit.RecentPosts(DEDUPE_WINDOW_SECONDS) if DEDUPE_WINDOW_SECONDS > 0 else None
+)
+
+# Inside CORS, so refusals carry CORS headers the browser can read
+app.add_middleware(
+    ratelimit.RateLimitMiddleware,
+    buckets=rate_limits,
+    recent=recent_posts,
+    trust_forwarded=RATE_LIMIT_TRUST_FORWARDED,
+    api_keys=RATE_LIMIT_API_KEYS,
+)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:3000", "*"],
-    allow_credentials=True,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials="*" not in CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", "X-Request-ID"],
 )
+# Outermost, so request timings include CORS handling
+app.add_middleware(metrics.MetricsMiddleware)
 
-# Try to initialize Gemini client
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-gemini_model = None
+HOROSCOPE_PERIODS = ("today", "tomorrow", "this_week")
 
-if GEMINI_API_KEY:
-    try:
-        import google.generativeai as genai
+# Quick horoscopes only vary by (sign, period, day), so cache them per day
+HOROSCOPE_TIMEZONE = os.getenv("HOROSCOPE_TIMEZONE", "UTC")
+HOROSCOPE_PREWARM = os.getenv("HOROSCOPE_PREWARM", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+HOROSCOPE_PREWARM_LEAD_MINUTES = float(
+    os.getenv("HOROSCOPE_PREWARM_LEAD_MINUTES", "10")
+)
 
-        genai.configure(api_key=GEMINI_API_KEY)
-        gemini_model = genai.GenerativeModel("gemini-1.5-flash")
-        print("✅ Gemini AI configured successfully!")
-    except Exception as e:
-        print(f"⚠️ Gemini setup failed: {e}")
-        gemini_model = None
-else:
-    print("ℹ️ No GEMINI_API_KEY found - using mock data (perfect for demo!)")
-
-# System prompt for AstralSage
-SYSTEM_PROMPT = """You are "AstralSage", an expert astrology assistant. Always behave as an informational/entertainment service, not a substitute for professional advice. When given birth data (date, time, place) compute or interpret standard western astrological elements (sun, moon, rising/ascendant, houses, major aspects, transits). When asked for compatibility, compare key placements and explain strengths/risks. When asked for daily/weekly forecasts, use transits relative to natal placements.
-
-Output MUST be valid JSON exactly matching the schema provided. Do not include any extra text outside the JSON. Keep language clear, practical, and give short actionable suggestions called "remedies" (e.g., focus actions, reflection prompts) — avoid medical/legal prescriptions. Provide a confidence_score (0–1). If any required input is missing or invalid, return an error object per schema. If geolocation is approximate or birth time unknown, clearly label interpretations as "approximate".
-
-Follow privacy best practices: never invent precise times/locations. If asked to predict events like death, elections, crimes, or illegal/harmful acts, refuse and instead give general, ethical guidance.
-
-response_schema:
-{
-  "type":"object",
-  "properties":{
-    "meta":{"type":"object","properties":{"model_version":{"type":"string"},"generated_at":{"type":"string","format":"date-time"}}},
-    "request_id":{"type":"string"},
-    "input_summary":{"type":"object"},
-    "analysis":{"type":"object"},
-    "interpretation":{"type":"string"},
-    "sections":{"type":"array"},
-    "remedies":{"type":"array"},
-    "confidence_score":{"type":"number"},
-    "warnings":{"type":"array"}
-  },
-  "required":["meta","request_id","input_summary","analysis","interpretation","sections","remedies","confidence_score"]
-}"""
+horoscope_cache = DailyResponseCache(HOROSCOPE_TIMEZONE)
+
+# Readings pre-generated by pregenerate.py, one file per day; "" disables
+DAILY_ARTIFACT_DIR = os.getenv("DAILY_ARTIFACT_DIR", "daily")
+daily_artifacts = DailyArtifacts(DAILY_ARTIFACT_DIR) if DAILY_ARTIFACT_DIR else None
+
+# Finished bodies of the cacheable GET readings, for the current day
+response_cache = http_cache.ResponseCache()
+
+# Place suggestions only change when the gazetteer sources do
+PLACES_MAX_AGE_SECONDS = int(os.getenv("PLACES_MAX_AGE_SECONDS", "86400"))
+
+# What to do when the LLM queue is full: "mock" serves the demo reading,
+# "reject" answers 503 with Retry-After so clients back off
+GEMINI_OVERLOAD_POLICY = os.getenv("GEMINI_OVERLOAD_POLICY", "mock").lower()
+
+# Ask the LLM again for just the fields a reading is missing (or got
+# wrong), rather than falling back to the mock for the whole reading
+GEMINI_REREQUEST_FIELDS = os.getenv("GEMINI_REREQUEST_FIELDS", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# How long a stopping worker waits for LLM calls still running (e.g.
+# horoscope prewarm fills); serve.py uses it for request draining too
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "30"))
+
+# Batch chart computation (deterministic, no LLM)
+NATAL_BATCH_MAX_SIZE = int(os.getenv("NATAL_BATCH_MAX_SIZE", "100000"))
+NATAL_BATCH_CHUNK_SIZE = 2048
+
+# Largest candidate pool one compatibility ranking may score
+COMPATIBILITY_RANK_MAX_POOL = int(os.getenv("COMPATIBILITY_RANK_MAX_POOL", "100000"))
+
+# LLM natal readings, shared by all workers on this host; "" disables
+NATAL_CACHE_PATH = os.getenv("NATAL_CACHE_PATH", "natal_cache.sqlite3")
+NATAL_CACHE_MAX_ENTRIES = int(os.getenv("NATAL_CACHE_MAX_ENTRIES", "50000"))
+
+natal_cache = (
+    NatalReadingCache(
+        NATAL_CACHE_PATH,
+        NATAL_CACHE_MAX_ENTRIES,
+        version=reading_version(
+            prompts.SYSTEM_PROMPT,
+            prompts.TASK_INSTRUCTIONS["natal_chart"],
+            "fake-llm" if llm.FAKE_LLM else llm.GEMINI_MODEL_NAME,
+        ),
+    )
+    if NATAL_CACHE_PATH
+    else None
+)
 
 
 # Request Models
+def _valid_zone(value: Optional[str]) -> Optional[str]:
+    if value is not None and timezones.zone(value) is None:
+        raise ValueError(f"Unknown timezone {value!r}: expected an IANA name")
+    return value
+
+
 class BirthPlace(BaseModel):
     city: str
     country: str
     lat: Optional[float] = None
     lon: Optional[float] = None
+    timezone: Optional[str] = None  # IANA name, e.g. "Asia/Kolkata"
+
+    _check_timezone = field_validator("timezone")(_valid_zone)
+    # Set by locate_birth_place: the gazetteer place used and how it matched
+    _geocoded: Optional[dict] = None
+
+
+def locate_birth_place(place: BirthPlace, timezone_needed: bool = False):
+    """Fill in missing coordinates (and timezone) from the gazetteer"""
+    if place.lat is not None and place.lon is not None:
+        if place.timezone or not timezone_needed:
+            return
+    with metrics.span("geocode"):
+        found = gazetteer.resolve(place.city, place.country)
+    metrics.count_geocode(found.match if found else "not_found")
+    if found:
+        if place.lat is None or place.lon is None:
+            place.lat, place.lon = found.lat, found.lon
+        place.timezone = place.timezone or found.timezone
+        described = gazetteer.get().describe(found)
+        place._geocoded = {
+            "place": described["label"],
+            "match": found.match,
+            "country_matched": bool(place.country.strip()),
+        }
+
+
+def geocode_warning(place: BirthPlace) -> Optional[str]:
+    """A warning when the gazetteer place used may not be the one meant"""
+    geocoded = place._geocoded
+    if not geocoded:
+        return None
+    if geocoded["match"] == "fuzzy":
+        return (
+            f"Birth place {place.city!r} not found exactly - used the closest "
+            f"spelling, {geocoded['place']}; send lat/lon if that is wrong"
+        )
+    if not geocoded["country_matched"]:
+        return (
+            f"Birth place country not given - used {geocoded['place']}; "
+            "send the country or lat/lon if that is wrong"
+        )
+    return None
+
+
+def _valid_date(value: str) -> str:
+    return zodiac.parse_birth_date(value).isoformat()
+
+
+def _is_offset(value: str) -> bool:
+    try:
+        zodiac.parse_utc_offset(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _valid_timezone(value: str) -> str:
+    """A UTC offset, an IANA zone, or "auto" for the birth place's zone"""
+    value = value.strip()
+    if value.lower() == "auto":
+        return "auto"
+    if not _is_offset(value) and timezones.zone(value) is None:
+        raise ValueError(
+            f"Invalid timezone {value!r}: expected a UTC offset like +05:30, "
+            "an IANA zone like Asia/Kolkata, or auto"
+        )
+    return value
 
 
 class NatalChartRequest(BaseModel):
     name: Optional[str] = ""
     birth_date: str  # YYYY-MM-DD
     birth_time: str = "unknown"  # HH:MM or "unknown"
-    birth_timezone: str = "+00:00"
+    birth_timezone: str = "+00:00"  # offset, IANA zone or "auto"
     birth_place: BirthPlace
     tone: Literal["concise", "friendly", "mystical"] = "friendly"
 
+    _check_date = field_validator("birth_date")(_valid_date)
+    _check_time = field_validator("birth_time")(zodiac.parse_birth_time)
+    _check_timezone = field_validator("birth_timezone")(_valid_timezone)
+    # Set by resolve_birth_timezone when the zone makes the time approximate
+    _timezone_warning: Optional[str] = None
+
 
 class QuickHoroscopeRequest(BaseModel):
     sign: str
     period: Literal["today", "tomorrow", "this_week"] = "today"
 
+    _check_sign = field_validator("sign")(zodiac.normalize_sign)
+
+
+class DailyTransitsRequest(BaseModel):
+    sign: str
+
+    _check_sign = field_validator("sign")(zodiac.normalize_sign)
+
 
 class CompatibilityRequest(BaseModel):
     person_a_name: Optional[str] = ""
@@ -100,369 +289,495 @@ class CompatibilityRequest(BaseModel):
     person_b_birth_place: BirthPlace
     focus: Literal["romantic", "work", "friendship"] = "romantic"
 
+    _check_dates = field_validator("person_a_birth_date", "person_b_birth_date")(
+        _valid_date
+    )
+    _check_times = field_validator("person_a_birth_time", "person_b_birth_time")(
+        zodiac.parse_birth_time
+    )
+
+
+class RankPerson(BaseModel):
+    id: Optional[str] = None
+    name: Optional[str] = ""
+    birth_date: str
+    birth_time: str = "unknown"
+
+    _check_date = field_validator("birth_date")(_valid_date)
+    _check_time = field_validator("birth_time")(zodiac.parse_birth_time)
+
+
+class CompatibilityRankRequest(BaseModel):
+    person: RankPerson
+    candidates: list[RankPerson]
+    focus: Literal["romantic", "work", "friendship"] = "romantic"
+    top_k: int = Field(default=10, ge=1, le=1000)
+
 
 class TransitForecastRequest(BaseModel):
     birth_date: str
     birth_time: str = "unknown"
-    birth_timezone: str = "+00:00"
+    birth_timezone: str = "+00:00"  # offset, IANA zone or "auto"
     birth_place: BirthPlace
     range: Literal["today", "3-day", "7-day"] = "today"
     focus: Literal["career", "love", "health", "general"] = "general"
 
+    _check_date = field_validator("birth_date")(_valid_date)
+    _check_time = field_validator("birth_time")(zodiac.parse_birth_time)
+    _check_timezone = field_validator("birth_timezone")(_valid_timezone)
+    _timezone_warning: Optional[str] = None
 
-def generate_mock_natal_response(request: NatalChartRequest) -> dict:
-    """Generate a realistic mock response for demo purposes"""
-    request_id = str(uuid.uuid4())
-    now = datetime.utcnow().isoformat() + "Z"
-
-    # Calculate approximate zodiac sign from birth date
-    month_day = request.birth_date[5:]  # MM-DD
-    signs = [
-        ("01-20", "Capricorn"),
-        ("02-19", "Aquarius"),
-        ("03-20", "Pisces"),
-        ("04-20", "Aries"),
-        ("05-21", "Taurus"),
-        ("06-21", "Gemini"),
-        ("07-22", "Cancer"),
-        ("08-23", "Leo"),
-        ("09-23", "Virgo"),
-        ("10-23", "Libra"),
-        ("11-22", "Scorpio"),
-        ("12-22", "Sagittarius"),
-        ("12-31", "Capricorn"),
-    ]
-    sun_sign = "Aries"
-    for end_date, sign in signs:
-        if month_day <= end_date:
-            sun_sign = sign
-            break
 
-    return {
-        "meta": {"model_version": "v1.0-astrology", "generated_at": now},
-        "request_id": request_id,
-        "input_summary": {
-            "name": request.name or "Anonymous",
-            "birth_date": request.birth_date,
-            "birth_time": request.birth_time,
-            "birth_place": {
-                "city": request.birth_place.city,
-                "country": request.birth_place.country,
-            },
-            "notes": (
-                "exact time provided"
-                if request.birth_time != "unknown"
-                else "time unknown - approximate reading"
-            ),
-        },
-        "analysis": {
-            "sun": f"{sun_sign} 15°",
-            "moon": (
-                "Libra 8°"
-                if request.birth_time != "unknown"
-                else "Unknown (birth time required)"
-            ),
-            "ascendant": (
-                "Gemini 12°"
-                if request.birth_time != "unknown"
-                else "Unknown (birth time required)"
-            ),
-            "dominant_planets": ["Venus", "Mercury"],
-            "major_aspects": [
-                {"type": "conjunction", "between": "Sun-Mercury", "orb": "2.5°"},
-                {"type": "trine", "between": "Moon-Jupiter", "orb": "3.1°"},
-                {"type": "square", "between": "Mars-Saturn", "orb": "1.8°"},
-            ],
-        },
-        "interpretation": f"As a {sun_sign}, you possess natural determination and a practical approach to life. Your personality blends creativity with groundedness. You excel when you have clear goals and steady progress. Your challenge is balancing ambition with patience. The cosmic energies suggest this is a great time for learning and personal growth!",
-        "sections": [
-            {
-                "title": "Personality",
-                "content": f"Your {sun_sign} Sun gives you a strong core identity. You're known for being reliable, determined, and having a good sense of aesthetics. Friends see you as someone who follows through on commitments.",
-            },
-            {
-                "title": "Career & Studies",
-                "content": "Your analytical mind and creative spark make you well-suited for subjects that blend logic with creativity. Consider exploring technology, design, or communication fields. Group projects bring out your best!",
-            },
-            {
-                "title": "Relationships",
-                "content": "You value deep, meaningful connections over superficial friendships. You're loyal and supportive, but need intellectual stimulation. Communication is your love language.",
-            },
-            {
-                "title": "Growth Areas",
-                "content": "Practice flexibility when plans change. Your perfectionist tendencies can sometimes slow you down. Remember: done is better than perfect!",
-            },
-        ],
-        "remedies": [
-            "Start a morning routine: 5 minutes of planning your day's priorities",
-            "Try a new creative hobby this month - art, music, or writing",
-            "Practice active listening: ask 2 questions before sharing your opinion",
-            "Take 3 deep breaths before reacting to stressful situations",
-        ],
-        "confidence_score": 0.85 if request.birth_time != "unknown" else 0.65,
-        "warnings": (
-            []
-            if request.birth_time != "unknown"
-            else [
-                "Birth time unknown - Moon and Ascendant calculations are approximate"
-            ]
+# Response Models
+class ReadingMeta(BaseModel):
+    model_config = ConfigDict(extra="allow", protected_namespaces=())
+
+    model_version: str
+    generated_at: str
+
+
+class ReadingSection(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    title: str
+    content: str
+
+
+class Reading(BaseModel):
+    """The response_schema from prompts.SYSTEM_PROMPT; extra model keys are kept.
+    meta is filled in when the model leaves it out."""
+
+    model_config = ConfigDict(extra="allow")
+
+    meta: ReadingMeta = Field(
+        default_factory=lambda: ReadingMeta(
+            model_version=mock_readings.MODEL_VERSION,
+            generated_at=datetime.utcnow().isoformat() + "Z",
+        )
+    )
+    request_id: str
+    input_summary: dict
+    analysis: dict
+    interpretation: str
+    sections: list[ReadingSection]
+    remedies: list[str]
+    confidence_score: float = Field(ge=0, le=1)
+    warnings: list[str] = []
+
+
+# Reading fields the model writes; meta and request_id are ours
+MODEL_FIELDS = tuple(
+    name
+    for name in prompts.RESPONSE_SCHEMA["properties"]
+    if name not in ("meta", "request_id")
+)
+
+
+def check_reading(result: dict) -> tuple[Optional[Reading], set]:
+    """Validate an LLM reading; on failure, the top-level fields at fault"""
+    try:
+        with metrics.span("schema"):
+            # request_id is ours to assign, also for replies shared between callers
+            reading = Reading.model_validate(
+                {**result, "request_id": str(uuid.uuid4())}
+            )
+        return reading, set()
+    except ValidationError as e:
+        return None, {error["loc"][0] for error in e.errors() if error["loc"]}
+
+
+TIMEZONE_WARNINGS = {
+    "ambiguous": (
+        "Birth time happened twice that night (clocks went back) - the earlier "
+        "one is used, so Moon and Ascendant are approximate"
+    ),
+    "nonexistent": (
+        "Birth time was skipped when clocks went forward - read with the "
+        "earlier offset, so Moon and Ascendant are approximate"
+    ),
+    "unknown": "Birth timezone unknown - read as UTC, so Moon and Ascendant may be off",
+}
+
+
+def resolve_birth_timezone(request: NatalChartRequest | TransitForecastRequest):
+    """Replace a zone in birth_timezone ("auto": the birth place's zone,
+    looked up if need be) by the UTC offset in force at the birth, so
+    the ephemeris and cache keys only ever see offsets"""
+    name = request.birth_timezone
+    if name != "auto" and _is_offset(name):
+        return
+    place = request.birth_place
+    if name == "auto":
+        locate_birth_place(place, timezone_needed=True)
+        name = place.timezone
+        if not name:
+            request.birth_timezone = "+00:00"
+            request._timezone_warning = TIMEZONE_WARNINGS["unknown"]
+            return
+    hour, minute = 12, 0  # like the ephemeris, for unknown times
+    if request.birth_time != "unknown":
+        hour, minute = map(int, request.birth_time.split(":"))
+    local = timezones.local_offset(
+        name, date.fromisoformat(request.birth_date), hour, minute
+    )
+    request.birth_timezone = timezones.format_offset(local.offset)
+    place.timezone = name
+    request._timezone_warning = TIMEZONE_WARNINGS.get(local.status)
+
+
+def birth_warnings(request: NatalChartRequest | TransitForecastRequest) -> list:
+    """Warnings about the request's birth place and timezone lookups"""
+    warnings = [geocode_warning(request.birth_place), request._timezone_warning]
+    return [warning for warning in warnings if warning]
+
+
+def birth_warned(reading: Reading, request: NatalChartRequest) -> Reading:
+    """The reading with the request's birth_warnings() first, if any"""
+    missing = [w for w in birth_warnings(request) if w not in reading.warnings]
+    if not missing:
+        return reading
+    return reading.model_copy(update={"warnings": [*missing, *reading.warnings]})
+
+
+def reading_response(reading: Reading) -> Response:
+    with metrics.span("serialize"):
+        body = reading.model_dump_json().encode()
+    return json_bytes_response(body)
+
+
+def compute_natal_analysis(request: NatalChartRequest) -> dict:
+    """Deterministic chart placements from the built-in ephemeris; a birth
+    place without coordinates is geocoded, and a timezone resolved, first"""
+    # Deferred, like NumPy below it, so mock-only workers start faster
+    import ephemeris
+
+    place = request.birth_place
+    locate_birth_place(place)
+    resolve_birth_timezone(request)
+    chart = ephemeris.compute_chart(
+        request.birth_date,
+        request.birth_time,
+        request.birth_timezone,
+        place.lat,
+        place.lon,
+    )
+    return analysis_from_chart(chart, request.birth_time != "unknown")
+
+
+def analysis_from_chart(chart: dict, time_known: bool) -> dict:
+    import ephemeris
+
+    bodies = chart["bodies"]
+    analysis = {
+        "sun": bodies["Sun"]["position"],
+        "moon": (
+            bodies["Moon"]["position"]
+            if time_known
+            else f"{bodies['Moon']['position']} (approximate)"
         ),
+        "ascendant": "Unknown (birth time required)",
+        "placements": {body: data["position"] for body, data in bodies.items()},
+        "retrograde": [body for body, data in bodies.items() if data["retrograde"]],
+        "dominant_planets": chart["dominant_planets"],
+        "major_aspects": chart["aspects"][:4],
     }
+    if time_known and chart["ascendant"] is None:
+        analysis["ascendant"] = "Unknown (birth place coordinates required)"
+    elif time_known:
+        analysis["ascendant"] = ephemeris.format_position(chart["ascendant"])
+        analysis["midheaven"] = ephemeris.format_position(chart["midheaven"])
+        analysis["houses"] = {
+            "system": chart["houses"]["system"],
+            "cusps": chart["houses"]["positions"],
+        }
+    return analysis
+
+
+def compute_natal_charts(requests: list[NatalChartRequest]) -> list[dict]:
+    """Vectorized natal analyses for many births in one ephemeris pass.
+
+    Returns one item per request: {"birth_timezone", "analysis", "warnings"}
+    or {"error"}; birth_timezone is the offset used.
+    """
+    import numpy as np
+
+    import ephemeris
+
+    results: list[dict] = [{} for _ in requests]
+    valid, jds, lats, lons, times = [], [], [], [], []
+    for i, req in enumerate(requests):
+        try:
+            locate_birth_place(req.birth_place)
+            resolve_birth_timezone(req)
+            jds.append(
+                ephemeris.julian_day(req.birth_date, req.birth_time, req.birth_timezone)
+            )
+        except ValueError as e:
+            results[i] = {"error": str(e)}
+            continue
+        valid.append(i)
+        lats.append(req.birth_place.lat if req.birth_place.lat is not None else nan)
+        lons.append(req.birth_place.lon if req.birth_place.lon is not None else nan)
+        times.append(req.birth_time != "unknown")
+
+    if valid:
+        charts = ephemeris.charts_from_arrays(
+            np.array(jds), np.array(lats), np.array(lons), np.array(times)
+        )
+        for i, chart in zip(valid, charts):
+            req = requests[i]
+            analysis = analysis_from_chart(chart, req.birth_time != "unknown")
+            results[i] = {
+                "birth_timezone": req.birth_timezone,
+                "analysis": analysis,
+                "warnings": natal_warnings(req, analysis),
+            }
+    return results
+
+
+def stream_natal_charts(requests: list[NatalChartRequest]):
+    """NDJSON lines for a batch, computed one vectorized chunk at a time"""
+    for start in range(0, len(requests), NATAL_BATCH_CHUNK_SIZE):
+        chunk = requests[start : start + NATAL_BATCH_CHUNK_SIZE]
+        lines = [
+            dumps({"index": start + offset, **item})
+            for offset, item in enumerate(compute_natal_charts(chunk))
+        ]
+        yield b"\n".join(lines) + b"\n"
+
+
+def natal_mock_parts(request: NatalChartRequest, analysis: dict) -> tuple:
+    """Per-request inputs of the mock natal reading"""
+    time_known = request.birth_time != "unknown"
+    input_summary = {
+        "name": request.name or "Anonymous",
+        "birth_date": request.birth_date,
+        "birth_time": request.birth_time,
+        "birth_timezone": request.birth_timezone,
+        "birth_place": request.birth_place.model_dump(exclude_none=True),
+        **geocoded_summary(request.birth_place),
+        "notes": (
+            "exact time provided"
+            if time_known
+            else "time unknown - approximate reading"
+        ),
+    }
+    sun_sign = analysis["sun"].split()[0]
+    warnings = natal_warnings(request, analysis)
+    return input_summary, analysis, warnings, sun_sign, time_known
+
+
+def geocoded_summary(place: BirthPlace) -> dict:
+    return {"geocoded": place._geocoded} if place._geocoded else {}
+
+
+def generate_mock_natal_response(
+    request: NatalChartRequest, analysis: Optional[dict] = None
+) -> dict:
+    """Generate a realistic mock response for demo purposes"""
+    if analysis is None:
+        analysis = compute_natal_analysis(request)
+    return mock_readings.natal_reading(*natal_mock_parts(request, analysis))
+
+
+def natal_warnings(request: NatalChartRequest, analysis: dict) -> list:
+    warnings = birth_warnings(request)
+    if request.birth_time == "unknown":
+        warnings.append(
+            "Birth time unknown - Moon and Ascendant calculations are approximate"
+        )
+    elif "midheaven" not in analysis:
+        warnings.append(
+            "Birth place not found - send lat/lon to compute Ascendant and houses"
+        )
+    return warnings
+
+
+def natal_cache_key(request: NatalChartRequest) -> str:
+    place = request.birth_place
+    offset = zodiac.parse_utc_offset(request.birth_timezone)
+    return natal_key(
+        request.birth_date,
+        request.birth_time,
+        int(offset.total_seconds() // 60),
+        place.city,
+        place.country,
+        place.lat,
+        place.lon,
+        request.tone,
+    )
 
 
 def generate_mock_horoscope_response(request: QuickHoroscopeRequest) -> dict:
     """Generate a mock quick horoscope"""
-    request_id = str(uuid.uuid4())
-    now = datetime.utcnow().isoformat() + "Z"
-
-    horoscopes = {
-        "Aries": {
-            "headline": "Bold moves lead to breakthrough moments! 🔥",
-            "bullets": [
-                "Career: Take initiative in group projects",
-                "Social: Reconnect with an old friend",
-                "Self: Channel energy into sports or exercise",
-            ],
-        },
-        "Taurus": {
-            "headline": "Steady progress brings sweet rewards! 🌿",
-            "bullets": [
-                "Studies: Focus on one subject deeply today",
-                "Money: Good day for saving, not spending",
-                "Self: Enjoy some comfort food guilt-free",
-            ],
-        },
-        "Gemini": {
-            "headline": "Your words have extra power today! 💬",
-            "bullets": [
-                "Communication: Express your ideas clearly",
-                "Learning: Pick up that book you've been eyeing",
-                "Social: Great day for meaningful conversations",
-            ],
-        },
-        "Cancer": {
-            "headline": "Home and heart take center stage! 🏠",
-            "bullets": [
-                "Family: Quality time creates lasting memories",
-                "Creative: Try cooking or crafting",
-                "Emotional: Journal your feelings tonight",
-            ],
-        },
-        "Leo": {
-            "headline": "Time to shine and inspire others! ✨",
-            "bullets": [
-                "Leadership: Others look to you for guidance",
-                "Creative: Your artistic side is strong today",
-                "Social: You're the life of the party",
-            ],
-        },
-        "Virgo": {
-            "headline": "Organization leads to opportunities! 📚",
-            "bullets": [
-                "Studies: Perfect day for detailed work",
-                "Health: Start a new wellness habit",
-                "Practical: Organize your space, clear your mind",
-            ],
-        },
-        "Libra": {
-            "headline": "Balance and beauty guide your day! ⚖️",
-            "bullets": [
-                "Relationships: Resolve any lingering conflicts",
-                "Artistic: Appreciate beauty around you",
-                "Decision: Trust your sense of fairness",
-            ],
-        },
-        "Scorpio": {
-            "headline": "Deep insights surface today! 🦂",
-            "bullets": [
-                "Research: Dig deeper into topics that fascinate you",
-                "Intuition: Trust your gut feelings",
-                "Transformation: Let go of what no longer serves you",
-            ],
-        },
-        "Sagittarius": {
-            "headline": "Adventure calls your name! 🏹",
-            "bullets": [
-                "Learning: Explore new ideas and cultures",
-                "Social: Plan something fun with friends",
-                "Growth: Step outside your comfort zone",
-            ],
-        },
-        "Capricorn": {
-            "headline": "Hard work pays off today! 🏔️",
-            "bullets": [
-                "Goals: Make progress on long-term plans",
-                "Responsibility: Others count on you",
-                "Career: Leadership qualities shine through",
-            ],
-        },
-        "Aquarius": {
-            "headline": "Innovation and friendship align! 💡",
-            "bullets": [
-                "Ideas: Your unique perspective is valuable",
-                "Technology: Good day for tech projects",
-                "Community: Connect with like-minded people",
-            ],
-        },
-        "Pisces": {
-            "headline": "Creativity and intuition flow freely! 🌊",
-            "bullets": [
-                "Artistic: Express yourself through art or music",
-                "Dreams: Pay attention to nighttime messages",
-                "Compassion: Help someone who needs it",
-            ],
-        },
-    }
+    return mock_readings.horoscope_reading(request.sign, request.period)
 
-    sign_data = horoscopes.get(request.sign, horoscopes["Aries"])
 
-    return {
-        "meta": {"model_version": "v1.0-astrology", "generated_at": now},
-        "request_id": request_id,
-        "input_summary": {"sign": request.sign, "period": request.period},
-        "analysis": {
-            "sign": request.sign,
-            "period": request.period,
-            "ruling_planet": get_ruling_planet(request.sign),
-        },
-        "interpretation": sign_data["headline"],
-        "sections": [
-            {"title": point.split(":")[0], "content": point.split(":")[1].strip()}
-            for point in sign_data["bullets"]
-        ],
-        "remedies": [
-            f"Lucky color: {get_lucky_color(request.sign)}",
-            f"Lucky number: {get_lucky_number(request.sign)}",
-            "Best time for important tasks: Morning hours",
-        ],
-        "confidence_score": 0.75,
-        "warnings": [],
-    }
+ELEMENT_HARMONY = {
+    ("Fire", "Fire"): "Fire + Fire = Shared Spark",
+    ("Earth", "Fire"): "Fire + Earth = Warmth Meets Stability",
+    ("Air", "Fire"): "Fire + Air = Fanned Flames",
+    ("Fire", "Water"): "Fire + Water = Steam and Passion",
+    ("Earth", "Earth"): "Earth + Earth = Solid Foundation",
+    ("Air", "Earth"): "Earth + Air = Ideas Made Real",
+    ("Earth", "Water"): "Earth + Water = Fertile Ground",
+    ("Air", "Air"): "Air + Air = Endless Conversation",
+    ("Air", "Water"): "Air + Water = Head Meets Heart",
+    ("Water", "Water"): "Water + Water = Deep Currents",
+}
 
 
-def get_ruling_planet(sign: str) -> str:
-    planets = {
-        "Aries": "Mars",
-        "Taurus": "Venus",
-        "Gemini": "Mercury",
-        "Cancer": "Moon",
-        "Leo": "Sun",
-        "Virgo": "Mercury",
-        "Libra": "Venus",
-        "Scorpio": "Pluto",
-        "Sagittarius": "Jupiter",
-        "Capricorn": "Saturn",
-        "Aquarius": "Uranus",
-        "Pisces": "Neptune",
-    }
-    return planets.get(sign, "Sun")
-
-
-def get_lucky_color(sign: str) -> str:
-    colors = {
-        "Aries": "Red",
-        "Taurus": "Green",
-        "Gemini": "Yellow",
-        "Cancer": "Silver",
-        "Leo": "Gold",
-        "Virgo": "Navy Blue",
-        "Libra": "Pink",
-        "Scorpio": "Maroon",
-        "Sagittarius": "Purple",
-        "Capricorn": "Brown",
-        "Aquarius": "Electric Blue",
-        "Pisces": "Sea Green",
+def element_harmony(sign_a: str, sign_b: str) -> str:
+    pair = sorted((zodiac.element_of(sign_a), zodiac.element_of(sign_b)))
+    return ELEMENT_HARMONY[tuple(pair)]
+
+
+def compute_synastry(request: CompatibilityRequest) -> dict:
+    """Synastry score and key aspects between the two births"""
+    # Deferred like the ephemeris it builds on
+    import synastry
+
+    return synastry.pair_analysis(
+        synastry.chart_longitudes(
+            request.person_a_birth_date, request.person_a_birth_time
+        ),
+        synastry.chart_longitudes(
+            request.person_b_birth_date, request.person_b_birth_time
+        ),
+        request.focus,
+        request.person_a_birth_time != "unknown",
+        request.person_b_birth_time != "unknown",
+    )
+
+
+def compatibility_mock_parts(request: CompatibilityRequest, computed: dict) -> tuple:
+    """Per-request inputs of the mock compatibility reading"""
+    sun_a = zodiac.sun_sign(request.person_a_birth_date, request.person_a_birth_time)
+    sun_b = zodiac.sun_sign(request.person_b_birth_date, request.person_b_birth_time)
+    input_summary = {
+        "person_a": request.person_a_name or "Person A",
+        "person_b": request.person_b_name or "Person B",
+        "focus": request.focus,
     }
-    return colors.get(sign, "Blue")
-
-
-def get_lucky_number(sign: str) -> int:
-    numbers = {
-        "Aries": 9,
-        "Taurus": 6,
-        "Gemini": 5,
-        "Cancer": 2,
-        "Leo": 1,
-        "Virgo": 5,
-        "Libra": 6,
-        "Scorpio": 8,
-        "Sagittarius": 3,
-        "Capricorn": 4,
-        "Aquarius": 7,
-        "Pisces": 7,
+    analysis = {
+        "person_a_sun": sun_a["sign"],
+        "person_b_sun": sun_b["sign"],
+        "compatibility_score": computed["score"],
+        "element_harmony": element_harmony(sun_a["sign"], sun_b["sign"]),
+        "major_aspects": computed["aspects"],
     }
-    return numbers.get(sign, 7)
+    warnings = []
+    if "unknown" in (request.person_a_birth_time, request.person_b_birth_time):
+        warnings.append("Birth times unknown - analysis based on Sun signs only")
+    return input_summary, analysis, request.focus, warnings
 
 
-def generate_mock_compatibility_response(request: CompatibilityRequest) -> dict:
+def generate_mock_compatibility_response(
+    request: CompatibilityRequest, computed: dict
+) -> dict:
     """Generate a mock compatibility response"""
-    request_id = str(uuid.uuid4())
-    now = datetime.utcnow().isoformat() + "Z"
-
-    return {
-        "meta": {"model_version": "v1.0-astrology", "generated_at": now},
-        "request_id": request_id,
-        "input_summary": {
-            "person_a": request.person_a_name or "Person A",
-            "person_b": request.person_b_name or "Person B",
-            "focus": request.focus,
-        },
-        "analysis": {
-            "person_a_sun": "Taurus",
-            "person_b_sun": "Cancer",
-            "compatibility_score": 78,
-            "element_harmony": "Earth + Water = Fertile Ground",
-        },
-        "interpretation": f"This {request.focus} connection shows strong potential! Both individuals value loyalty and emotional security. The combination creates a nurturing dynamic where each person's strengths complement the other's needs.",
-        "sections": [
-            {
-                "title": "Top 3 Strengths",
-                "content": "1. Deep emotional understanding\n2. Shared values of loyalty and commitment\n3. Complementary communication styles",
-            },
-            {
-                "title": "Potential Friction Points",
-                "content": "1. Different approaches to change (one prefers stability, other seeks growth)\n2. Communication timing - one processes feelings slowly\n3. Social energy levels may differ",
-            },
-            {
-                "title": "Making It Work",
-                "content": "Schedule regular check-ins to share feelings. Respect each other's pace. Celebrate differences as strengths, not obstacles.",
-            },
-        ],
-        "remedies": [
-            "Practice patience: allow each other processing time",
-            "Create shared rituals: weekly hangouts or activities",
-            "Learn each other's love languages",
-            "Celebrate small wins together",
-        ],
-        "confidence_score": 0.72,
-        "warnings": ["Birth times unknown - analysis based on Sun signs only"],
-    }
+    return mock_readings.compatibility_reading(
+        *compatibility_mock_parts(request, computed)
+    )
 
 
-async def call_gemini(prompt: str) -> dict:
+async def call_gemini(prompt: str, http_request: Optional[Request] = None) -> dict:
     """Call Gemini API - falls back to mock if no API key"""
-    if not gemini_model:
+    if not await llm.get_model():
+        metrics.count_fallback("no_model")
         return None
 
     try:
-        full_prompt = SYSTEM_PROMPT + "\n\n" + prompt
-        response = gemini_model.generate_content(full_prompt)
-        import json
-
-        # Clean up response - remove markdown code blocks if present
-        text = response.text.strip()
-        if text.startswith("```json"):
-            text = text[7:]
-        if text.startswith("```"):
-            text = text[3:]
-        if text.endswith("```"):
-            text = text[:-3]
-        return json.loads(text.strip())
+        with metrics.span("llm_wait"):
+            text = await llm.cancel_on_disconnect(
+                http_request, llm.generate_text(prompt)
+            )
+
+        with metrics.span("parse"):
+            # Fences, stray prose and small defects are tolerated
+            result, outcome = llm_json.parse_object(text)
+        metrics.count_parse(outcome)
+        if result is None:
+            print("Gemini response has no JSON object")
+            metrics.count_fallback("unparseable")
+        return result
+    except llm.ClientDisconnected:
+        print("Gemini call cancelled: client disconnected")
+        metrics.count_fallback("disconnected")
+        return None
+    except CircuitOpen as e:
+        # The upstream keeps failing: serve the mock now instead of waiting
+        print(f"Gemini call skipped: {e}")
+        metrics.count_fallback("circuit_open")
+        return None
+    except LLMOverloaded as e:
+        print(f"Gemini call not started: {e}")
+        metrics.count_fallback("overloaded")
+        # Shared cache fills (no http_request) always fall back to mock
+        if GEMINI_OVERLOAD_POLICY == "reject" and http_request is not None:
+            raise HTTPException(
+                status_code=503,
+                detail="Readings are busy right now, please retry shortly",
+                headers={"Retry-After": str(ceil(e.retry_after))},
+            )
+        return None
+    except asyncio.TimeoutError:
+        print(f"Gemini API timeout after {llm.GEMINI_TIMEOUT_SECONDS}s")
+        metrics.count_fallback("timeout")
+        return None
     except Exception as e:
         print(f"Gemini API error: {e}")
+        metrics.count_fallback("error")
         return None
 
 
+async def generate_reading(
+    prompt: str, http_request: Optional[Request] = None, known: Optional[dict] = None
+) -> Optional[Reading]:
+    """An LLM reading for prompt, checked against the schema; None means use
+    the mock. known fills fields we computed ourselves if the model left
+    them out. When a reply is usable but some fields are missing or
+    invalid, only those fields are asked for again."""
+    result = await call_gemini(prompt, http_request)
+    if result is None:
+        return None
+    reading, invalid = check_reading({**(known or {}), **result})
+    if reading:
+        return reading
+
+    kept = {**(known or {}), **{k: v for k, v in result.items() if k not in invalid}}
+    missing = [name for name in MODEL_FIELDS if name in invalid]
+    if not missing:
+        # Only our own fields (meta) were bad; the defaults replace them
+        reading, invalid = check_reading(kept)
+    elif GEMINI_REREQUEST_FIELDS and any(name in kept for name in MODEL_FIELDS):
+        print(f"Gemini reading incomplete, asking again for {', '.join(missing)}")
+        extra = await call_gemini(
+            prompts.build_followup_prompt(prompt, missing), http_request
+        )
+        if extra:
+            kept.update((name, extra[name]) for name in missing if name in extra)
+            reading, invalid = check_reading(kept)
+        metrics.count_rerequest("completed" if reading else "failed")
+
+    if not reading:
+        print(f"Gemini response failed schema validation: {', '.join(sorted(invalid))}")
+        metrics.count_fallback("invalid_schema")
+    return reading
+
+
+def streaming_reading_response(
+    mock: dict, prompt: str, fmt: StreamFormat
+) -> StreamingResponse:
+    """Send the mock's deterministic head now and stream the LLM body after it"""
+    full_prompt = prompt + "\n\n" + STREAM_INSTRUCTIONS
+    return StreamingResponse(
+        stream_reading(mock, full_prompt, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # API Endpoints
 @app.get("/")
 async def root():
@@ -471,130 +786,614 @@ async def root():
         "version": "1.0.0",
         "endpoints": [
             "/api/natal-chart",
+            "/api/natal-chart/batch",
             "/api/quick-horoscope",
+            "/api/daily-transits",
             "/api/compatibility",
+            "/api/compatibility/rank",
             "/api/transit-forecast",
+            "/api/places",
+            "/metrics",
         ],
     }
 
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "pid": os.getpid(),
+        "horoscope_cache": horoscope_cache.stats(),
+        "daily_artifact": daily_artifacts.stats() if daily_artifacts else None,
+        "response_cache": response_cache.stats(),
+        "rate_limit": rate_limits.stats() if rate_limits else None,
+        "dedupe": recent_posts.stats() if recent_posts else None,
+        "llm_client": llm.readiness(),
+        "llm": llm.scheduler.stats(),
+        "upstream": llm.upstream.stats(),
+        "natal_cache": natal_cache.stats() if natal_cache else None,
+        "timezone_tables": timezones.stats(),
+    }
 
 
-@app.post("/api/natal-chart")
-async def natal_chart(request: NatalChartRequest):
+def collect_cache_and_llm_metrics() -> list:
+    """Scrape-time series from the caches and the LLM scheduler"""
+    caches = [("horoscope", horoscope_cache.stats())]
+    if daily_artifacts:
+        caches.append(("daily_artifact", daily_artifacts.stats()))
+    if natal_cache:
+        caches.append(("natal", natal_cache.stats()))
+    caches.append(("timezone_tables", timezones.stats()))
+    caches.append(("responses", response_cache.stats()))
+    lines = []
+    for field, kind, description in (
+        ("hits", "counter", "Cache lookups answered from the cache"),
+        ("misses", "counter", "Cache lookups that had to generate a reading"),
+        ("hit_rate", "gauge", "Share of lookups answered from the cache"),
+        ("entries", "gauge", "Readings currently cached"),
+    ):
+        suffix = "_total" if kind == "counter" else ""
+        lines += metrics.sample_lines(
+            f"astralsage_cache_{field}{suffix}",
+            kind,
+            description,
+            [({"cache": cache}, stats[field]) for cache, stats in caches],
+        )
+
+    llm_stats = llm.scheduler.stats()
+    for field, kind, description in (
+        ("in_flight", "gauge", "LLM calls running now"),
+        ("queue_depth", "gauge", "LLM calls waiting for a slot"),
+        ("started", "counter", "LLM calls started"),
+        ("coalesced", "counter", "Requests that joined an identical running call"),
+        ("rejected", "counter", "LLM calls refused by admission control"),
+        ("avg_upstream_ms", "gauge", "Moving average of LLM call latency"),
+    ):
+        suffix = "_total" if kind == "counter" else ""
+        lines += metrics.sample_lines(
+            f"astralsage_llm_{field}{suffix}",
+            kind,
+            description,
+            [({}, llm_stats[field])],
+        )
+
+    upstream_stats = llm.upstream.stats()
+    for field, description in (
+        ("attempts", "Upstream requests sent, retries and hedges included"),
+        ("retries", "Upstream requests retried after a transient failure"),
+        ("hedges", "Hedged second requests sent after the p95 delay"),
+        ("hedge_wins", "Hedged requests that answered first"),
+        ("circuit_opens", "Times the circuit breaker opened"),
+        ("circuit_refused", "Calls refused while the circuit was open"),
+    ):
+        lines += metrics.sample_lines(
+            f"astralsage_upstream_{field}_total",
+            "counter",
+            description,
+            [({}, upstream_stats[field])],
+        )
+    lines += metrics.sample_lines(
+        "astralsage_upstream_circuit_open",
+        "gauge",
+        "1 while the circuit breaker skips the upstream",
+        [({}, int(upstream_stats["circuit"] == "open"))],
+    )
+    if rate_limits:
+        limit_stats = rate_limits.stats()
+        lines += metrics.sample_lines(
+            "astralsage_rate_limit_clients",
+            "gauge",
+            "Clients in the rate limit table",
+            [({}, limit_stats["clients"])],
+        )
+        lines += metrics.sample_lines(
+            "astralsage_rate_limit_evicted_total",
+            "counter",
+            "Idle clients dropped from the full rate limit table",
+            [({}, limit_stats["evicted"])],
+        )
+    return lines
+
+
+metrics.register_collector(collect_cache_and_llm_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Request timings, stage timings and counters in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.on_event("startup")
+async def warm_up_llm():
+    llm.warm_up()
+
+
+@app.on_event("startup")
+async def start_horoscope_prewarm():
+    if HOROSCOPE_PREWARM and llm.enabled():
+        keys = [(sign, period) for sign in zodiac.SIGNS for period in HOROSCOPE_PERIODS]
+        asyncio.create_task(
+            prewarm_forever(
+                horoscope_cache,
+                keys,
+                fetch_quick_horoscope,
+                lead_seconds=HOROSCOPE_PREWARM_LEAD_MINUTES * 60,
+            )
+        )
+
+
+@app.on_event("shutdown")
+async def drain_llm_calls():
+    """Let LLM calls no request is waiting on finish before the worker exits"""
+    if not await llm.scheduler.drain(SHUTDOWN_DRAIN_SECONDS):
+        print(f"⚠️ LLM calls still running after {SHUTDOWN_DRAIN_SECONDS}s drain")
+    await llm.aclose()
+
+
+@app.post("/api/natal-chart", response_model=Reading)
+@metrics.instrument
+async def natal_chart(
+    request: NatalChartRequest,
+    http_request: Request,
+    stream: Optional[StreamFormat] = None,
+):
     """Generate a full natal/birth chart reading"""
-    # Build prompt
-    prompt = f"""Task: natal_chart
-request_id: "{uuid.uuid4()}"
-
-Data:
-- name: "{request.name}"
-- birth_date: "{request.birth_date}"
-- birth_time: "{request.birth_time}"
-- birth_timezone: "{request.birth_timezone}"
-- birth_place: {{ city: "{request.birth_place.city}", country: "{request.birth_place.country}" }}
-- tone: "{request.tone}"
-
-Instructions:
-1) Summarize input.
-2) Compute Sun, Moon, Ascendant (if birth_time known). If time unknown, note limitations.
-3) List top 8 placements and 4 major aspects.
-4) Provide concise interpretation (max 250 words).
-5) Provide 3-4 practical remedies/actions suitable for students.
-6) Provide confidence_score.
-Return JSON matching schema."""
+    try:
+        with metrics.span("ephemeris"):
+            analysis = compute_natal_analysis(request)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    with metrics.span("prompt"):
+        prompt = prompts.build_prompt(
+            "natal_chart",
+            {
+                "birth_date": request.birth_date,
+                "birth_time": request.birth_time,
+                "birth_timezone": request.birth_timezone,
+                "birth_place": {
+                    "city": request.birth_place.city,
+                    "country": request.birth_place.country,
+                },
+                "tone": request.tone,
+                "computed_analysis": analysis,
+            },
+        )
+
+    if stream:
+        mock = generate_mock_natal_response(request, analysis)
+        return streaming_reading_response(mock, prompt, stream)
+
+    parts = natal_mock_parts(request, analysis)
+    input_summary = parts[0]
+    key = None
+    if natal_cache and llm.enabled():
+        key = natal_cache_key(request)
+        with metrics.span("cache"):
+            cached = await asyncio.to_thread(natal_cache.get, key)
+        if cached:
+            reading = Reading.model_validate_json(cached).model_copy(
+                update={
+                    "request_id": str(uuid.uuid4()),
+                    "input_summary": input_summary,
+                }
+            )
+            return reading_response(birth_warned(reading, request))
 
     # Try Gemini, fallback to mock
-    result = await call_gemini(prompt)
-    if not result:
-        result = generate_mock_natal_response(request)
-
-    return result
-
-
-@app.post("/api/quick-horoscope")
+    reading = await generate_reading(
+        prompt, http_request, {"input_summary": input_summary, "analysis": analysis}
+    )
+    if not reading:
+        with metrics.span("mock"):
+            body = mock_readings.natal_json(*parts)
+        return json_bytes_response(body)
+
+    # Placements come from the ephemeris, never from the model; the name is
+    # not sent to it, so the reading can be shared by identical births
+    reading.analysis = analysis
+    reading.input_summary = input_summary
+    with metrics.span("serialize"):
+        body = reading.model_dump_json().encode()
+    if key:
+        with metrics.span("cache"):
+            await asyncio.to_thread(natal_cache.put, key, body)
+    if birth_warnings(request):
+        # Not in the cached body: births that resolve to the same offset share it
+        return reading_response(birth_warned(reading, request))
+    return json_bytes_response(body)
+
+
+@app.post("/api/natal-chart/batch")
+@metrics.instrument
+async def natal_chart_batch(requests: list[NatalChartRequest]):
+    """Compute chart placements for many births, streamed back as NDJSON"""
+    if len(requests) > NATAL_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: max {NATAL_BATCH_MAX_SIZE} charts per request",
+        )
+    return StreamingResponse(
+        stream_natal_charts(requests), media_type="application/x-ndjson"
+    )
+
+
+@app.get("/api/places")
+@metrics.instrument
+async def places(
+    http_request: Request,
+    q: str = Query(min_length=1, max_length=100),
+    country: str = "",
+    limit: int = Query(default=8, ge=1, le=20),
+):
+    """Birth place suggestions for a partly typed city name (autocomplete)"""
+    with metrics.span("geocode"):
+        found = gazetteer.suggest(q, country, limit)
+    body = dumps({"query": q, "places": found})
+    cached = http_cache.CachedBody(body, http_cache.etag(body))
+    return http_cache.cached_response(http_request, cached, PLACES_MAX_AGE_SECONDS)
+
+
+def build_quick_horoscope_prompt(sign: str, period: str, day: date) -> str:
+    return prompts.build_prompt(
+        "quick_horoscope", {"sign": sign, "period": period, "date": day.isoformat()}
+    )
+
+
+async def fetch_quick_horoscope(key: tuple, day: date) -> Optional[Reading]:
+    """Ask Gemini for the shared (sign, period) horoscope of a given day"""
+    sign, period = key
+    with metrics.span("prompt"):
+        prompt = build_quick_horoscope_prompt(sign, period, day)
+    return await generate_reading(prompt)
+
+
+def pregenerated(*key: str, request_id: Optional[str] = None) -> Optional[bytes]:
+    """Today's reading for key from the daily artifact, if there is one"""
+    if not daily_artifacts:
+        return None
+    with metrics.span("cache"):
+        return daily_artifacts.reading(
+            horoscope_cache.today(), artifact_key(*key), request_id
+        )
+
+
+def day_start(day: date) -> datetime:
+    """Start of a horoscope day, as naive UTC like generated_at"""
+    start = datetime.combine(day, time(), horoscope_cache.tz)
+    return start.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def quick_horoscope_body(
+    sign: str, period: str, reading_id: Optional[str] = None
+) -> tuple[bytes, bool]:
+    """The serialized horoscope, and whether it is the day's final one
+    (False for a mock standing in for the LLM). With reading_id, the
+    body is the same on every call: that request_id, and the start of
+    the day as the mock's generated_at."""
+    body = pregenerated("quick_horoscope", sign, period, request_id=reading_id)
+    if body:
+        return body, True
+
+    day = horoscope_cache.today()
+    if llm.enabled():
+        # Shared across all callers, so one client leaving must not cancel it
+        key = (sign, period)
+        cached = await horoscope_cache.get_or_fill(
+            key, lambda: fetch_quick_horoscope(key, day), day
+        )
+        if cached:
+            reading = cached.model_copy(
+                update={"request_id": reading_id or str(uuid.uuid4())}
+            )
+            with metrics.span("serialize"):
+                return reading.model_dump_json().encode(), True
+    else:
+        metrics.count_fallback("no_model")
+
+    with metrics.span("mock"):
+        body = mock_readings.horoscope_json(
+            sign,
+            period,
+            request_id=reading_id,
+            generated_at=day_start(day) if reading_id else None,
+        )
+    return body, not llm.enabled()
+
+
+async def cacheable_reading(http_request: Request, key: tuple, fill) -> Response:
+    """A GET reading from the response cache, else fill(reading_id) ->
+    (body, final); bodies that are not final are served but not kept"""
+    day = horoscope_cache.today()
+    max_age = int(horoscope_cache.seconds_until_rollover())
+    with metrics.span("cache"):
+        cached = response_cache.get(day, key)
+    if cached is None:
+        body, final = await fill(http_cache.reading_id(*key, day))
+        if final:
+            cached = response_cache.put(day, key, body)
+        else:
+            cached = http_cache.CachedBody(body, http_cache.etag(body))
+            max_age = 0
+    return http_cache.cached_response(http_request, cached, max_age)
+
+
+@app.post("/api/quick-horoscope", response_model=Reading)
+@metrics.instrument
 async def quick_horoscope(request: QuickHoroscopeRequest):
     """Generate a quick horoscope by zodiac sign"""
-    prompt = f"""Task: quick_horoscope
-request_id: "{uuid.uuid4()}"
-Data:
-- sign: "{request.sign}"
-- period: "{request.period}"
-- tone: "friendly"
-
-Instructions: Give a 1-line headline + 3 actionable bullets (studies/social/self for students). Keep it fun and positive. Return JSON matching schema."""
-
-    result = await call_gemini(prompt)
-    if not result:
-        result = generate_mock_horoscope_response(request)
+    body, _ = await quick_horoscope_body(request.sign, request.period)
+    return json_bytes_response(body)
+
+
+@app.get("/api/quick-horoscope", response_model=Reading)
+@metrics.instrument
+async def quick_horoscope_get(
+    http_request: Request,
+    sign: str = Query(max_length=20),
+    period: Literal["today", "tomorrow", "this_week"] = "today",
+):
+    """Quick horoscope as a cacheable GET: the same body and ETag for
+    everyone until the horoscope day rolls over"""
+    try:
+        sign = zodiac.normalize_sign(sign)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await cacheable_reading(
+        http_request,
+        ("quick_horoscope", sign, period),
+        lambda reading_id: quick_horoscope_body(sign, period, reading_id),
+    )
+
+
+def daily_transits_parts(sign: str, day: date) -> tuple[dict, dict]:
+    """input_summary and analysis of a sign's daily transit summary"""
+    # Deferred like the ephemeris; the sky itself is shared by all signs
+    import transits
+
+    return {"sign": sign, "date": day.isoformat()}, transits.sign_sky(sign, day)
+
+
+async def fetch_daily_transits(sign: str, day: date) -> Optional[Reading]:
+    """Ask Gemini for a sign's daily transit summary (see pregenerate.py)"""
+    input_summary, analysis = daily_transits_parts(sign, day)
+    prompt = prompts.build_prompt(
+        "daily_transits", {"sign": sign, "computed_sky": analysis}
+    )
+    reading = await generate_reading(
+        prompt, known={"input_summary": input_summary, "analysis": analysis}
+    )
+    if reading:
+        reading.input_summary = input_summary
+        reading.analysis = analysis
+    return reading
+
+
+async def daily_transits_body(
+    sign: str, reading_id: Optional[str] = None
+) -> tuple[bytes, bool]:
+    """Like quick_horoscope_body; the computed summary is always final"""
+    body = pregenerated("daily_transits", sign, request_id=reading_id)
+    if body:
+        return body, True
+
+    day = horoscope_cache.today()
+    with metrics.span("ephemeris"):
+        input_summary, analysis = daily_transits_parts(sign, day)
+    with metrics.span("mock"):
+        body = mock_readings.sign_sky_json(
+            input_summary,
+            analysis,
+            request_id=reading_id,
+            generated_at=day_start(day) if reading_id else None,
+        )
+    return body, True
+
+
+@app.post("/api/daily-transits", response_model=Reading)
+@metrics.instrument
+async def daily_transits(request: DailyTransitsRequest):
+    """Today's transits to a sun sign, as pre-generated for the day"""
+    body, _ = await daily_transits_body(request.sign)
+    return json_bytes_response(body)
+
+
+@app.get("/api/daily-transits", response_model=Reading)
+@metrics.instrument
+async def daily_transits_get(http_request: Request, sign: str = Query(max_length=20)):
+    """Today's transits to a sun sign as a cacheable GET"""
+    try:
+        sign = zodiac.normalize_sign(sign)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await cacheable_reading(
+        http_request,
+        ("daily_transits", sign),
+        lambda reading_id: daily_transits_body(sign, reading_id),
+    )
+
+
+@app.post("/api/compatibility", response_model=Reading)
+@metrics.instrument
+async def compatibility(
+    request: CompatibilityRequest,
+    http_request: Request,
+    stream: Optional[StreamFormat] = None,
+):
+    """Generate a compatibility reading between two people"""
+    with metrics.span("ephemeris"):
+        computed = compute_synastry(request)
 
-    return result
+    with metrics.span("prompt"):
+        prompt = prompts.build_prompt(
+            "compatibility",
+            {
+                "person_a": {
+                    "name": request.person_a_name,
+                    "birth_date": request.person_a_birth_date,
+                },
+                "person_b": {
+                    "name": request.person_b_name,
+                    "birth_date": request.person_b_birth_date,
+                },
+                "focus": request.focus,
+                "computed_synastry": computed,
+            },
+        )
+
+    if stream:
+        mock = generate_mock_compatibility_response(request, computed)
+        return streaming_reading_response(mock, prompt, stream)
+
+    reading = await generate_reading(prompt, http_request)
+    if not reading:
+        with metrics.span("mock"):
+            parts = compatibility_mock_parts(request, computed)
+            body = mock_readings.compatibility_json(*parts)
+        return json_bytes_response(body)
+
+    return reading_response(reading)
+
+
+@app.post("/api/compatibility/rank")
+@metrics.instrument
+async def compatibility_rank(request: CompatibilityRankRequest):
+    """Score one person against many candidates and return the best matches"""
+    if len(request.candidates) > COMPATIBILITY_RANK_MAX_POOL:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Pool too large: max {COMPATIBILITY_RANK_MAX_POOL} candidates "
+                "per request"
+            ),
+        )
+    # Deferred like the ephemeris; one array pass scores the whole pool
+    import numpy as np
+
+    import synastry
+
+    person = request.person
+    candidates = request.candidates
+    with metrics.span("ephemeris"):
+        chart = synastry.chart_longitudes(person.birth_date, person.birth_time)
+        pool = synastry.pool_longitudes(
+            [c.birth_date for c in candidates], [c.birth_time for c in candidates]
+        )
+        scores = synastry.score_against_pool(
+            chart,
+            pool,
+            request.focus,
+            person.birth_time != "unknown",
+            np.array([c.birth_time != "unknown" for c in candidates], dtype=bool),
+        )
+        best = synastry.top_k(scores, request.top_k)
+        signs = synastry.sun_signs(pool[best])
+
+    with metrics.span("serialize"):
+        body = dumps(
+            {
+                "focus": request.focus,
+                "pool_size": len(candidates),
+                "person": {
+                    "id": person.id,
+                    "name": person.name or "Person",
+                    "sun_sign": synastry.sun_signs(chart[None, :])[0],
+                },
+                "matches": [
+                    {
+                        "index": i,
+                        "id": candidates[i].id,
+                        "name": candidates[i].name or f"Candidate {i + 1}",
+                        "score": score,
+                        "sun_sign": sign,
+                    }
+                    for i, score, sign in zip(
+                        best.tolist(), scores[best].tolist(), signs
+                    )
+                ],
+            }
+        )
+    return json_bytes_response(body)
+
+
+@app.post("/api/transit-forecast", response_model=Reading)
+@metrics.instrument
+async def transit_forecast(
+    request: TransitForecastRequest,
+    http_request: Request,
+    stream: Optional[StreamFormat] = None,
+):
+    """Generate a transit forecast from the sky over the requested range"""
+    # Deferred like the ephemeris; the sky itself is shared by all users
+    import transits
 
+    try:
+        resolve_birth_timezone(request)
+        sun = zodiac.sun_sign(
+            request.birth_date, request.birth_time, request.birth_timezone
+        )
+        with metrics.span("ephemeris"):
+            analysis = transits.transit_analysis(
+                request.birth_date,
+                request.birth_time,
+                request.birth_timezone,
+                horoscope_cache.today(),
+                request.range,
+                request.focus,
+                sun,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    time_known = request.birth_time != "unknown"
+    input_summary = {
+        "birth_date": request.birth_date,
+        "birth_time": request.birth_time,
+        "birth_timezone": request.birth_timezone,
+        "range": request.range,
+        "focus": request.focus,
+        **geocoded_summary(request.birth_place),
+    }
+    warnings = birth_warnings(request)
+    if not time_known:
+        warnings.append("Birth time unknown - natal Moon position is approximate")
 
-@app.post("/api/compatibility")
-async def compatibility(request: CompatibilityRequest):
-    """Generate a compatibility reading between two people"""
-    prompt = f"""Task: compatibility
-request_id: "{uuid.uuid4()}"
-Data:
-- person_a: {{name: "{request.person_a_name}", birth_date: "{request.person_a_birth_date}"}}
-- person_b: {{name: "{request.person_b_name}", birth_date: "{request.person_b_birth_date}"}}
-- focus: "{request.focus}"
-
-Instructions: Compare sun signs. Give top 3 strengths, top 3 friction points, 3 practical tips for friendship/teamwork. Keep it appropriate for students. Return JSON."""
-
-    result = await call_gemini(prompt)
-    if not result:
-        result = generate_mock_compatibility_response(request)
-
-    return result
-
-
-@app.post("/api/transit-forecast")
-async def transit_forecast(request: TransitForecastRequest):
-    """Generate a transit/daily forecast"""
-    prompt = f"""Task: transit_forecast
-request_id: "{uuid.uuid4()}"
-Data:
-- birth_date: "{request.birth_date}"
-- birth_time: "{request.birth_time}"
-- range: "{request.range}"
-- focus: "{request.focus}"
-
-Instructions: Identify relevant transits and give practical guidance for students. Return JSON."""
-
-    # For demo, use quick horoscope with calculated sign
-    month_day = request.birth_date[5:]
-    signs = [
-        ("01-20", "Capricorn"),
-        ("02-19", "Aquarius"),
-        ("03-20", "Pisces"),
-        ("04-20", "Aries"),
-        ("05-21", "Taurus"),
-        ("06-21", "Gemini"),
-        ("07-22", "Cancer"),
-        ("08-23", "Leo"),
-        ("09-23", "Virgo"),
-        ("10-23", "Libra"),
-        ("11-22", "Scorpio"),
-        ("12-22", "Sagittarius"),
-        ("12-31", "Capricorn"),
-    ]
-    sun_sign = "Aries"
-    for end_date, sign in signs:
-        if month_day <= end_date:
-            sun_sign = sign
-            break
-
-    horoscope_req = QuickHoroscopeRequest(sign=sun_sign, period="today")
-    result = generate_mock_horoscope_response(horoscope_req)
-    result["input_summary"]["focus"] = request.focus
-    result["input_summary"]["range"] = request.range
-
-    return result
+    with metrics.span("prompt"):
+        prompt = prompts.build_prompt(
+            "transit_forecast",
+            {
+                "birth_date": request.birth_date,
+                "birth_time": request.birth_time,
+                "range": request.range,
+                "focus": request.focus,
+                "computed_transits": analysis,
+            },
+        )
+
+    if stream:
+        result = mock_readings.transit_reading(
+            input_summary, analysis, warnings, time_known
+        )
+        return streaming_reading_response(result, prompt, stream)
+
+    reading = await generate_reading(
+        prompt, http_request, {"input_summary": input_summary, "analysis": analysis}
+    )
+    if not reading:
+        with metrics.span("mock"):
+            body = mock_readings.transit_json(
+                input_summary, analysis, warnings, time_known
+            )
+        return json_bytes_response(body)
+
+    # Transits come from the ephemeris, never from the model
+    reading.analysis = analysis
+    reading.input_summary = input_summary
+    missing = [warning for warning in warnings if warning not in reading.warnings]
+    reading.warnings = [*missing, *reading.warnings]
+    return reading_response(reading)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,306 @@
+"""
+AstralSage - Metrics
+Request and stage timings, fallback counters and cache gauges, exposed
+in the Prometheus text format. Histograms use fixed buckets and keep one
+preallocated count list per label set, so recording a timing is a
+bisect and two additions.
+
+The middleware remembers which route a request belongs to, so span()
+and count_fallback() calls anywhere below an endpoint are labelled with it.
+"""
+
+import functools
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Iterable
+
+# Seconds; spans range from microsecond-level parsing to multi-second LLM calls
+BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# (route, request start) of the request being handled
+_request: ContextVar[tuple] = ContextVar("metrics_request", default=("other", 0.0))
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    pairs = ",".join(f'{n}="{v}"' for n, v in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, labelnames: tuple):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            # [bucket counts (last is +Inf), sum]
+            series = self._series[labels] = [[0] * (len(BUCKETS) + 1), 0.0]
+        series[0][bisect_left(BUCKETS, value)] += 1
+        series[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in sorted(self._series.items()):
+            names = self.labelnames + ("le",)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += count
+                le = _labels(names, labels + (bound,))
+                yield f"{self.name}_bucket{le} {cumulative}"
+            base = _labels(self.labelnames, labels)
+            yield f"{self.name}_sum{base} {total}"
+            yield f"{self.name}_count{base} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labelnames: tuple):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+REQUEST_SECONDS = Histogram(
+    "astralsage_request_seconds",
+    "Time from request start to the last response byte",
+    ("route", "method", "status"),
+)
+STAGE_SECONDS = Histogram(
+    "astralsage_stage_seconds",
+    "Time spent in each stage of a request",
+    ("route", "stage"),
+)
+LLM_FALLBACKS = Counter(
+    "astralsage_llm_fallbacks_total",
+    "Requests that fell back to the mock reading, by reason",
+    ("route", "reason"),
+)
+LLM_PARSE = Counter(
+    "astralsage_llm_parse_total",
+    "LLM replies by how their JSON was recovered "
+    "(clean, extracted, repaired, failed)",
+    ("route", "outcome"),
+)
+LLM_REREQUESTS = Counter(
+    "astralsage_llm_rerequests_total",
+    "Follow-up LLM calls for missing or invalid reading fields, "
+    "by whether they completed the reading",
+    ("route", "outcome"),
+)
+GEOCODES = Counter(
+    "astralsage_geocode_total",
+    "Birth places without coordinates looked up in the gazetteer, "
+    "by match (exact, fuzzy, not_found)",
+    ("route", "match"),
+)
+RATE_LIMITED = Counter(
+    "astralsage_rate_limited_total",
+    "API requests refused by the per-client rate limit",
+    ("route",),
+)
+DEDUPLICATED = Counter(
+    "astralsage_deduplicated_total",
+    "POSTs answered with the response to an identical recent one",
+    ("route",),
+)
+
+LLM_CALLS = Counter(
+    "astralsage_llm_calls_total",
+    "Upstream LLM calls made, by the route that started them",
+    ("route",),
+)
+LLM_PROMPT_BYTES = Counter(
+    "astralsage_llm_prompt_bytes_total",
+    "Prompt bytes sent to the LLM, not counting the system instruction",
+    ("route",),
+)
+LLM_TOKENS = Counter(
+    "astralsage_llm_tokens_total",
+    "LLM tokens by kind (prompt includes the system instruction); "
+    "estimated at 4 bytes per token when the upstream reports none",
+    ("route", "kind"),
+)
+
+_METRICS = (
+    REQUEST_SECONDS,
+    STAGE_SECONDS,
+    LLM_FALLBACKS,
+    LLM_PARSE,
+    LLM_REREQUESTS,
+    GEOCODES,
+    RATE_LIMITED,
+    DEDUPLICATED,
+    LLM_CALLS,
+    LLM_PROMPT_BYTES,
+    LLM_TOKENS,
+)
+_collectors: list[Callable[[], Iterable[str]]] = []
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe((_request.get()[0], stage), seconds)
+
+
+class span:
+    """Time a block as one stage of the current request"""
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe_stage(self.stage, perf_counter() - self.start)
+
+
+def count_fallback(reason: str):
+    LLM_FALLBACKS.inc((_request.get()[0], reason))
+
+
+def count_parse(outcome: str):
+    LLM_PARSE.inc((_request.get()[0], outcome))
+
+
+def count_rerequest(outcome: str):
+    LLM_REREQUESTS.inc((_request.get()[0], outcome))
+
+
+def count_geocode(match: str):
+    GEOCODES.inc((_request.get()[0], match))
+
+
+def count_limited():
+    RATE_LIMITED.inc((_request.get()[0],))
+
+
+def count_deduplicated():
+    DEDUPLICATED.inc((_request.get()[0],))
+
+
+def count_llm_usage(
+    prompt_bytes: int, prompt_tokens: int, output_tokens: int, cached_tokens: int
+):
+    route = _request.get()[0]
+    LLM_CALLS.inc((route,))
+    LLM_PROMPT_BYTES.inc((route,), prompt_bytes)
+    LLM_TOKENS.inc((route, "prompt"), prompt_tokens)
+    LLM_TOKENS.inc((route, "output"), output_tokens)
+    if cached_tokens:
+        LLM_TOKENS.inc((route, "cached"), cached_tokens)
+
+
+def instrument(endpoint):
+    """Record everything before the endpoint body (routing, body read,
+    validation) as the "validation" stage"""
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        route, start = _request.get()
+        if start:
+            observe_stage("validation", perf_counter() - start)
+        return await endpoint(*args, **kwargs)
+
+    return wrapper
+
+
+def sample_lines(
+    name: str, kind: str, description: str, samples: Iterable[tuple[dict, float]]
+) -> list:
+    """Lines for a gauge or counter whose values live elsewhere"""
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}")
+    return lines
+
+
+def register_collector(collect: Callable[[], Iterable[str]]):
+    """Add lines computed at scrape time (gauges read from other modules)"""
+    _collectors.append(collect)
+
+
+def render() -> str:
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request by route"""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = None
+
+    def _route(self, scope) -> str:
+        if self._routes is None:
+            app = scope.get("app")
+            self._routes = {
+                getattr(r, "path", None) for r in getattr(app, "routes", ())
+            }
+        path = scope["path"]
+        # Unknown paths share one label, so scanners cannot grow the series
+        return path if path in self._routes else "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = perf_counter()
+        route = self._route(scope)
+        token = _request.set((route, start))
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_SECONDS.observe(
+                (route, scope["method"], str(status)), perf_counter() - start
+            )
+            _request.reset(token)
@@ -0,0 +1,569 @@
+"""
+AstralSage - Mock readings
+Demo/fallback readings built from frozen module-level tables. Everything
+that does not depend on the request is serialized once at import, so a
+reading is assembled by splicing in the request id, timestamp and the
+echoed input.
+"""
+
+import uuid
+from datetime import datetime
+from types import MappingProxyType
+from typing import Optional
+
+import zodiac
+from serialization import dumps, members as _members
+
+MODEL_VERSION = "v1.0-astrology"
+
+
+def _meta() -> dict:
+    return {
+        "model_version": MODEL_VERSION,
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def _head(
+    request_id: Optional[str] = None, generated_at: Optional[datetime] = None
+) -> bytes:
+    """Opening of a reading up to and including request_id; a new id and
+    the current UTC time unless given"""
+    return (
+        '{"meta":{"model_version":"%s","generated_at":"%sZ"},"request_id":"%s",'
+        % (
+            MODEL_VERSION,
+            (generated_at or datetime.utcnow()).isoformat(),
+            request_id or uuid.uuid4(),
+        )
+    ).encode()
+
+
+def _fresh(body: MappingProxyType) -> dict:
+    """Per-response copy of a frozen body, so callers may mutate it"""
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in body.items()}
+
+
+# Quick horoscopes: headline and "Topic: advice" bullets per sign
+_HOROSCOPE_TEXT = {
+    "Aries": (
+        "Bold moves lead to breakthrough moments! 🔥",
+        "Career: Take initiative in group projects",
+        "Social: Reconnect with an old friend",
+        "Self: Channel energy into sports or exercise",
+    ),
+    "Taurus": (
+        "Steady progress brings sweet rewards! 🌿",
+        "Studies: Focus on one subject deeply today",
+        "Money: Good day for saving, not spending",
+        "Self: Enjoy some comfort food guilt-free",
+    ),
+    "Gemini": (
+        "Your words have extra power today! 💬",
+        "Communication: Express your ideas clearly",
+        "Learning: Pick up that book you've been eyeing",
+        "Social: Great day for meaningful conversations",
+    ),
+    "Cancer": (
+        "Home and heart take center stage! 🏠",
+        "Family: Quality time creates lasting memories",
+        "Creative: Try cooking or crafting",
+        "Emotional: Journal your feelings tonight",
+    ),
+    "Leo": (
+        "Time to shine and inspire others! ✨",
+        "Leadership: Others look to you for guidance",
+        "Creative: Your artistic side is strong today",
+        "Social: You're the life of the party",
+    ),
+    "Virgo": (
+        "Organization leads to opportunities! 📚",
+        "Studies: Perfect day for detailed work",
+        "Health: Start a new wellness habit",
+        "Practical: Organize your space, clear your mind",
+    ),
+    "Libra": (
+        "Balance and beauty guide your day! ⚖️",
+        "Relationships: Resolve any lingering conflicts",
+        "Artistic: Appreciate beauty around you",
+        "Decision: Trust your sense of fairness",
+    ),
+    "Scorpio": (
+        "Deep insights surface today! 🦂",
+        "Research: Dig deeper into topics that fascinate you",
+        "Intuition: Trust your gut feelings",
+        "Transformation: Let go of what no longer serves you",
+    ),
+    "Sagittarius": (
+        "Adventure calls your name! 🏹",
+        "Learning: Explore new ideas and cultures",
+        "Social: Plan something fun with friends",
+        "Growth: Step outside your comfort zone",
+    ),
+    "Capricorn": (
+        "Hard work pays off today! 🏔️",
+        "Goals: Make progress on long-term plans",
+        "Responsibility: Others count on you",
+        "Career: Leadership qualities shine through",
+    ),
+    "Aquarius": (
+        "Innovation and friendship align! 💡",
+        "Ideas: Your unique perspective is valuable",
+        "Technology: Good day for tech projects",
+        "Community: Connect with like-minded people",
+    ),
+    "Pisces": (
+        "Creativity and intuition flow freely! 🌊",
+        "Artistic: Express yourself through art or music",
+        "Dreams: Pay attention to nighttime messages",
+        "Compassion: Help someone who needs it",
+    ),
+}
+
+LUCKY_COLORS = MappingProxyType(
+    {
+        "Aries": "Red",
+        "Taurus": "Green",
+        "Gemini": "Yellow",
+        "Cancer": "Silver",
+        "Leo": "Gold",
+        "Virgo": "Navy Blue",
+        "Libra": "Pink",
+        "Scorpio": "Maroon",
+        "Sagittarius": "Purple",
+        "Capricorn": "Brown",
+        "Aquarius": "Electric Blue",
+        "Pisces": "Sea Green",
+    }
+)
+
+LUCKY_NUMBERS = MappingProxyType(
+    {
+        "Aries": 9,
+        "Taurus": 6,
+        "Gemini": 5,
+        "Cancer": 2,
+        "Leo": 1,
+        "Virgo": 5,
+        "Libra": 6,
+        "Scorpio": 8,
+        "Sagittarius": 3,
+        "Capricorn": 4,
+        "Aquarius": 7,
+        "Pisces": 7,
+    }
+)
+
+
+def get_ruling_planet(sign: str) -> str:
+    return zodiac.ruler_of(sign, "Sun")
+
+
+def get_lucky_color(sign: str) -> str:
+    return LUCKY_COLORS.get(sign, "Blue")
+
+
+def get_lucky_number(sign: str) -> int:
+    return LUCKY_NUMBERS.get(sign, 7)
+
+
+def _horoscope_body(sign: str) -> MappingProxyType:
+    headline, *bullets = _HOROSCOPE_TEXT[sign]
+    sections = []
+    for point in bullets:
+        title, _, content = point.partition(":")
+        sections.append({"title": title, "content": content.strip()})
+    return MappingProxyType(
+        {
+            "interpretation": headline,
+            "sections": tuple(sections),
+            "remedies": (
+                f"Lucky color: {get_lucky_color(sign)}",
+                f"Lucky number: {get_lucky_number(sign)}",
+                "Best time for important tasks: Morning hours",
+            ),
+            "confidence_score": 0.75,
+            "warnings": (),
+        }
+    )
+
+
+HOROSCOPE_BODIES = MappingProxyType({s: _horoscope_body(s) for s in zodiac.SIGNS})
+
+# Per (sign, period): the input_summary and analysis objects left open for
+# extra members, and the serialized body that closes the reading
+_HOROSCOPE_JSON = MappingProxyType(
+    {
+        (sign, period): (
+            b'"input_summary":' + dumps({"sign": sign, "period": period})[:-1],
+            b'},"analysis":'
+            + dumps(
+                {
+                    "sign": sign,
+                    "period": period,
+                    "ruling_planet": get_ruling_planet(sign),
+                }
+            )[:-1],
+            b"}," + _members(dict(HOROSCOPE_BODIES[sign])) + b"}",
+        )
+        for sign in zodiac.SIGNS
+        for period in ("today", "tomorrow", "this_week")
+    }
+)
+
+
+def horoscope_reading(sign: str, period: str) -> dict:
+    return {
+        "meta": _meta(),
+        "request_id": str(uuid.uuid4()),
+        "input_summary": {"sign": sign, "period": period},
+        "analysis": {
+            "sign": sign,
+            "period": period,
+            "ruling_planet": get_ruling_planet(sign),
+        },
+        **_fresh(HOROSCOPE_BODIES[sign]),
+    }
+
+
+def horoscope_json(
+    sign: str,
+    period: str,
+    input_extra: Optional[dict] = None,
+    analysis_extra: Optional[dict] = None,
+    request_id: Optional[str] = None,
+    generated_at: Optional[datetime] = None,
+) -> bytes:
+    """Serialized horoscope_reading(), with optional extra echoed fields"""
+    input_open, analysis_open, tail = _HOROSCOPE_JSON[(sign, period)]
+    parts = [_head(request_id, generated_at), input_open]
+    if input_extra:
+        parts += (b",", _members(input_extra))
+    parts.append(analysis_open)
+    if analysis_extra:
+        parts += (b",", _members(analysis_extra))
+    parts.append(tail)
+    return b"".join(parts)
+
+
+def _natal_body(sun_sign: str, time_known: bool) -> MappingProxyType:
+    return MappingProxyType(
+        {
+            "interpretation": f"As a {sun_sign}, you possess natural determination and a practical approach to life. Your personality blends creativity with groundedness. You excel when you have clear goals and steady progress. Your challenge is balancing ambition with patience. The cosmic energies suggest this is a great time for learning and personal growth!",
+            "sections": (
+                {
+                    "title": "Personality",
+                    "content": f"Your {sun_sign} Sun gives you a strong core identity. You're known for being reliable, determined, and having a good sense of aesthetics. Friends see you as someone who follows through on commitments.",
+                },
+                {
+                    "title": "Career & Studies",
+                    "content": "Your analytical mind and creative spark make you well-suited for subjects that blend logic with creativity. Consider exploring technology, design, or communication fields. Group projects bring out your best!",
+                },
+                {
+                    "title": "Relationships",
+                    "content": "You value deep, meaningful connections over superficial friendships. You're loyal and supportive, but need intellectual stimulation. Communication is your love language.",
+                },
+                {
+                    "title": "Growth Areas",
+                    "content": "Practice flexibility when plans change. Your perfectionist tendencies can sometimes slow you down. Remember: done is better than perfect!",
+                },
+            ),
+            "remedies": (
+                "Start a morning routine: 5 minutes of planning your day's priorities",
+                "Try a new creative hobby this month - art, music, or writing",
+                "Practice active listening: ask 2 questions before sharing your opinion",
+                "Take 3 deep breaths before reacting to stressful situations",
+            ),
+            "confidence_score": 0.85 if time_known else 0.65,
+        }
+    )
+
+
+NATAL_BODIES = MappingProxyType(
+    {
+        (sign, known): _natal_body(sign, known)
+        for sign in zodiac.SIGNS
+        for known in (True, False)
+    }
+)
+_NATAL_JSON = MappingProxyType(
+    {key: _members(dict(body)) for key, body in NATAL_BODIES.items()}
+)
+
+
+def natal_reading(
+    input_summary: dict,
+    analysis: dict,
+    warnings: list,
+    sun_sign: str,
+    time_known: bool,
+) -> dict:
+    return {
+        "meta": _meta(),
+        "request_id": str(uuid.uuid4()),
+        "input_summary": input_summary,
+        "analysis": analysis,
+        **_fresh(NATAL_BODIES[(sun_sign, time_known)]),
+        "warnings": warnings,
+    }
+
+
+def natal_json(
+    input_summary: dict,
+    analysis: dict,
+    warnings: list,
+    sun_sign: str,
+    time_known: bool,
+) -> bytes:
+    """Serialized natal_reading()"""
+    return b"".join(
+        (
+            _head(),
+            b'"input_summary":',
+            dumps(input_summary),
+            b',"analysis":',
+            dumps(analysis),
+            b",",
+            _NATAL_JSON[(sun_sign, time_known)],
+            b',"warnings":',
+            dumps(warnings),
+            b"}",
+        )
+    )
+
+
+def _compatibility_body(focus: str) -> MappingProxyType:
+    return MappingProxyType(
+        {
+            "interpretation": f"This {focus} connection shows strong potential! Both individuals value loyalty and emotional security. The combination creates a nurturing dynamic where each person's strengths complement the other's needs.",
+            "sections": (
+                {
+                    "title": "Top 3 Strengths",
+                    "content": "1. Deep emotional understanding\n2. Shared values of loyalty and commitment\n3. Complementary communication styles",
+                },
+                {
+                    "title": "Potential Friction Points",
+                    "content": "1. Different approaches to change (one prefers stability, other seeks growth)\n2. Communication timing - one processes feelings slowly\n3. Social energy levels may differ",
+                },
+                {
+                    "title": "Making It Work",
+                    "content": "Schedule regular check-ins to share feelings. Respect each other's pace. Celebrate differences as strengths, not obstacles.",
+                },
+            ),
+            "remedies": (
+                "Practice patience: allow each other processing time",
+                "Create shared rituals: weekly hangouts or activities",
+                "Learn each other's love languages",
+                "Celebrate small wins together",
+            ),
+            "confidence_score": 0.72,
+        }
+    )
+
+
+COMPATIBILITY_BODIES = MappingProxyType(
+    {f: _compatibility_body(f) for f in ("romantic", "work", "friendship")}
+)
+_COMPATIBILITY_JSON = MappingProxyType(
+    {focus: _members(dict(body)) for focus, body in COMPATIBILITY_BODIES.items()}
+)
+
+
+def compatibility_reading(
+    input_summary: dict, analysis: dict, focus: str, warnings: list
+) -> dict:
+    return {
+        "meta": _meta(),
+        "request_id": str(uuid.uuid4()),
+        "input_summary": input_summary,
+        "analysis": analysis,
+        **_fresh(COMPATIBILITY_BODIES[focus]),
+        "warnings": warnings,
+    }
+
+
+def compatibility_json(
+    input_summary: dict, analysis: dict, focus: str, warnings: list
+) -> bytes:
+    """Serialized compatibility_reading()"""
+    return b"".join(
+        (
+            _head(),
+            b'"input_summary":',
+            dumps(input_summary),
+            b',"analysis":',
+            dumps(analysis),
+            b",",
+            _COMPATIBILITY_JSON[focus],
+            b',"warnings":',
+            dumps(warnings),
+            b"}",
+        )
+    )
+
+
+# Transit forecasts: text composed from the computed transits
+TRANSIT_THEMES = MappingProxyType(
+    {
+        "Sun": "confidence and focus",
+        "Moon": "moods and instincts",
+        "Mercury": "study and communication",
+        "Venus": "friendships and enjoyment",
+        "Mars": "drive and initiative",
+        "Jupiter": "growth and opportunity",
+        "Saturn": "discipline and responsibility",
+        "Uranus": "change and fresh ideas",
+        "Neptune": "imagination and intuition",
+        "Pluto": "deep transformation",
+    }
+)
+TRANSIT_ASPECT_VERBS = MappingProxyType(
+    {
+        "conjunction": "amplifies",
+        "sextile": "opens a door for",
+        "square": "puts pressure on",
+        "trine": "smooths the way for",
+        "opposition": "asks you to balance",
+    }
+)
+TRANSIT_TONE_HEADLINES = MappingProxyType(
+    {
+        "supportive": "The sky is on your side",
+        "challenging": "Expect some friction, and grow through it",
+        "mixed": "Ups and downs that balance out",
+    }
+)
+TRANSIT_REMEDIES = MappingProxyType(
+    {
+        "career": (
+            "Block out one focused hour for your most important task",
+            "Write down three goals for the period and review them nightly",
+        ),
+        "love": (
+            "Send a thoughtful message to someone you care about",
+            "Listen fully before you reply in a tense conversation",
+        ),
+        "health": (
+            "Get outside for a 20-minute walk each day",
+            "Keep a regular sleep time, even on busy days",
+        ),
+        "general": (
+            "Start each day by naming one thing to finish",
+            "Take a short break away from screens every afternoon",
+        ),
+    }
+)
+
+
+def transit_sentence(transit: dict) -> str:
+    """'Mars trine natal Sun (1.2°): drive and initiative smooths the way for...'"""
+    return (
+        f"{transit['transit']} {transit['aspect']} natal {transit['natal']} "
+        f"({transit['orb']}°): {TRANSIT_THEMES[transit['transit']]} "
+        f"{TRANSIT_ASPECT_VERBS[transit['aspect']]} your "
+        f"{TRANSIT_THEMES[transit['natal']]}."
+    )
+
+
+def _transit_body(analysis: dict, time_known: bool) -> dict:
+    days = analysis["days"]
+    total = sum(day["score"] for day in days)
+    tone = "supportive" if total > 0.5 else "challenging" if total < -0.5 else "mixed"
+    strongest = max(
+        (day for day in days if day["transits"]),
+        key=lambda day: abs(day["score"]),
+        default=None,
+    )
+    interpretation = f"{TRANSIT_TONE_HEADLINES[tone]} for {analysis['focus']} matters"
+    if strongest:
+        interpretation += f". Key transit on {strongest['date']}: " + transit_sentence(
+            strongest["transits"][0]
+        )
+    else:
+        interpretation += ": no major transits to your chart, a steady stretch."
+
+    sections = []
+    for day in days:
+        lines = [transit_sentence(t) for t in day["transits"][:2]]
+        if not lines:
+            lines = ["No major transits to your chart - a good day for routine."]
+        if day["retrograde"]:
+            lines.append(f"Retrograde: {', '.join(day['retrograde'])}.")
+        sections.append(
+            {"title": f"{day['date']} ({day['tone']})", "content": " ".join(lines)}
+        )
+
+    return {
+        "interpretation": interpretation,
+        "sections": sections,
+        "remedies": [
+            *TRANSIT_REMEDIES[analysis["focus"]],
+            f"Lucky color: {get_lucky_color(analysis['sun_sign'])}",
+        ],
+        "confidence_score": 0.7 if time_known else 0.6,
+    }
+
+
+def transit_reading(
+    input_summary: dict, analysis: dict, warnings: list, time_known: bool
+) -> dict:
+    return {
+        "meta": _meta(),
+        "request_id": str(uuid.uuid4()),
+        "input_summary": input_summary,
+        "analysis": analysis,
+        **_transit_body(analysis, time_known),
+        "warnings": warnings,
+    }
+
+
+def transit_json(
+    input_summary: dict, analysis: dict, warnings: list, time_known: bool
+) -> bytes:
+    """Serialized transit_reading()"""
+    body = {
+        "input_summary": input_summary,
+        "analysis": analysis,
+        **_transit_body(analysis, time_known),
+        "warnings": warnings,
+    }
+    return _head() + _members(body) + b"}"
+
+
+# Daily sign summaries: the same themes, for whole-sign transits
+def _sign_sky_body(analysis: dict) -> dict:
+    sign = analysis["sign"]
+    lines = [
+        f"{t['transit']} in {t['in']} {TRANSIT_ASPECT_VERBS[t['aspect']]} "
+        f"{sign}: {TRANSIT_THEMES[t['transit']]}."
+        for t in analysis["transits"][:4]
+    ]
+    if analysis["retrograde"]:
+        lines.append(f"Retrograde: {', '.join(analysis['retrograde'])}.")
+    return {
+        "interpretation": (
+            f"{TRANSIT_TONE_HEADLINES[analysis['tone']]}, {sign}, "
+            f"on {analysis['date']}."
+        ),
+        "sections": [{"title": "Today's sky", "content": " ".join(lines)}],
+        "remedies": [
+            *TRANSIT_REMEDIES["general"],
+            f"Lucky color: {get_lucky_color(sign)}",
+        ],
+        "confidence_score": 0.6,
+    }
+
+
+def sign_sky_json(
+    input_summary: dict,
+    analysis: dict,
+    request_id: Optional[str] = None,
+    generated_at: Optional[datetime] = None,
+) -> bytes:
+    """Serialized mock daily summary for one sign"""
+    body = {
+        "input_summary": input_summary,
+        "analysis": analysis,
+        **_sign_sky_body(analysis),
+    }
+    return _head(request_id, generated_at) + _members(body) + b"}"
@@ -0,0 +1,179 @@
+"""
+AstralSage - Natal reading cache
+Persistent, content-addressed store for LLM natal readings. A birth
+chart never changes, so a reading is keyed by a hash of the normalized
+birth data and tone and kept in a local SQLite file (WAL mode), which
+every worker process shares and which survives restarts. Calls block
+(up to the busy timeout while another worker writes), so async code
+runs them in a thread; one connection per process is shared under a
+lock.
+
+Entries carry a version derived from the system prompt and model name;
+rows from another version are never served and are purged on open.
+The table is kept to max_entries by evicting the least recently used.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# Bump when the cached reading layout changes without a prompt change
+CACHE_SCHEMA = 1
+
+# A hit refreshes last_used at most this often, to keep reads read-only
+TOUCH_INTERVAL_SECONDS = 60
+
+# Re-count rows after this many local inserts (other workers insert too)
+RECOUNT_EVERY = 256
+
+# Eviction trims to this fraction of max_entries, so it runs in batches
+EVICT_TO = 0.9
+
+
+def reading_version(*parts: str) -> str:
+    """Short hash of everything that shapes a reading (prompt, model, ...)"""
+    digest = hashlib.sha256(str(CACHE_SCHEMA).encode())
+    for part in parts:
+        digest.update(b"\0" + part.encode())
+    return digest.hexdigest()[:16]
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def natal_key(
+    birth_date: str,
+    birth_time: str,
+    utc_offset_minutes: int,
+    city: str,
+    country: str,
+    lat: Optional[float],
+    lon: Optional[float],
+    tone: str,
+) -> str:
+    """Hash of the normalized birth data; equal charts get equal keys"""
+    normalized = [
+        birth_date,
+        birth_time,
+        utc_offset_minutes,
+        _clean(city),
+        _clean(country),
+        None if lat is None else round(lat, 4),
+        None if lon is None else round(lon, 4),
+        tone,
+    ]
+    return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
+
+
+class NatalReadingCache:
+    def __init__(self, path: str, max_entries: int, version: str):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._rows = 0
+        self._inserts = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use, so forked workers each get their own handle
+        if self._db is None:
+            db = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS readings ("
+                " key TEXT PRIMARY KEY, version TEXT NOT NULL,"
+                " body BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS readings_last_used ON readings(last_used)"
+            )
+            db.execute("DELETE FROM readings WHERE version != ?", (self.version,))
+            self._rows = db.execute("SELECT COUNT(*) FROM readings").fetchone()[0]
+            self._db = db
+        return self._db
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached reading body, or None; a broken cache counts as a miss"""
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        try:
+            db = self._connect()
+            row = db.execute(
+                "SELECT body, last_used FROM readings WHERE key = ? AND version = ?",
+                (key, self.version),
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ Natal cache read failed: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        body, last_used = row
+        now = time.time()
+        if now - last_used > TOUCH_INTERVAL_SECONDS:
+            try:
+                db.execute(
+                    "UPDATE readings SET last_used = ? WHERE key = ?", (now, key)
+                )
+            except sqlite3.Error:
+                pass  # Only the LRU order suffers
+        return body
+
+    def put(self, key: str, body: bytes):
+        with self._lock:
+            self._put(key, body)
+
+    def _put(self, key: str, body: bytes):
+        try:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO readings (key, version, body, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                (key, self.version, body, time.time()),
+            )
+            self._rows += 1
+            self._inserts += 1
+            if self._inserts % RECOUNT_EVERY == 0 or self._rows > self.max_entries:
+                self._evict(db)
+        except sqlite3.Error as e:
+            print(f"⚠️ Natal cache write failed: {e}")
+
+    def _evict(self, db: sqlite3.Connection):
+        self._rows = db.execute("SELECT COUNT(*) FROM readings").fetchone()[0]
+        if self._rows <= self.max_entries:
+            return
+        excess = self._rows - int(self.max_entries * EVICT_TO)
+        if excess > 0:
+            db.execute(
+                "DELETE FROM readings WHERE key IN"
+                " (SELECT key FROM readings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._rows -= excess
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "path": os.path.abspath(self.path),
+            "version": self.version,
+            "entries": self._rows,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
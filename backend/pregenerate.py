@@ -0,0 +1,132 @@
+"""
+AstralSage - Daily pre-generation
+Batch job that asks the LLM for every reading that only depends on the
+day: the 12 x 3 quick horoscopes and the 12 daily transit summaries. At
+most --concurrency calls run at once. The readings are written to the
+day's artifact (daily_artifact.py), which every API worker then serves
+by memory-mapped lookup, with no LLM calls during the day.
+
+Run it once a day before midnight, e.g. from cron, with the same
+environment as the API:
+
+    python pregenerate.py                   # tomorrow, in HOROSCOPE_TIMEZONE
+    python pregenerate.py --date 2026-10-19 --concurrency 4
+
+Readings that fail are left out of the artifact (and served as usual);
+the job then exits with status 1. Artifacts older than yesterday are
+removed.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+from daily_artifact import artifact_key, artifact_path, write_artifact
+
+
+def _entry(reading) -> bytes:
+    # Served with a fresh request_id spliced in front
+    return reading.model_dump_json(exclude={"request_id"}).encode()[1:-1]
+
+
+async def generate(day: date, concurrency: int) -> tuple[dict, list]:
+    """Entries for day by artifact key, and the keys that failed"""
+    import main
+    import zodiac
+
+    limit = asyncio.Semaphore(concurrency)
+    jobs = {
+        artifact_key("quick_horoscope", sign, period): (
+            lambda sign=sign, period=period: main.fetch_quick_horoscope(
+                (sign, period), day
+            )
+        )
+        for sign in zodiac.SIGNS
+        for period in main.HOROSCOPE_PERIODS
+    }
+    jobs.update(
+        (
+            artifact_key("daily_transits", sign),
+            lambda sign=sign: main.fetch_daily_transits(sign, day),
+        )
+        for sign in zodiac.SIGNS
+    )
+
+    async def run(fetch):
+        async with limit:
+            return await fetch()
+
+    results = await asyncio.gather(
+        *(run(fetch) for fetch in jobs.values()), return_exceptions=True
+    )
+    entries, failed = {}, []
+    for key, result in zip(jobs, results):
+        if isinstance(result, main.Reading):
+            entries[key] = _entry(result)
+        else:
+            if isinstance(result, Exception):
+                print(f"⚠️ {key}: {result}")
+            failed.append(key)
+    return entries, failed
+
+
+def remove_old(directory: str, day: date):
+    """Delete artifacts for days before the one before day"""
+    oldest = artifact_path(directory, day - timedelta(days=2))
+    for path in glob.glob(os.path.join(directory, "daily-*.bin")):
+        if path < oldest:
+            os.remove(path)
+
+
+async def main_async(args) -> int:
+    import llm
+    import main
+
+    if not main.DAILY_ARTIFACT_DIR:
+        print("DAILY_ARTIFACT_DIR is empty; nothing to write to")
+        return 2
+    if not await llm.get_model():
+        print("No LLM configured (GEMINI_API_KEY or FAKE_LLM); nothing generated")
+        return 2
+
+    day = (
+        date.fromisoformat(args.date)
+        if args.date
+        else main.horoscope_cache.today() + timedelta(days=1)
+    )
+    concurrency = args.concurrency or llm.GEMINI_MAX_CONCURRENCY
+    start = time.perf_counter()
+    try:
+        entries, failed = await generate(day, concurrency)
+    finally:
+        await llm.aclose()
+    path = artifact_path(main.DAILY_ARTIFACT_DIR, day)
+    size = write_artifact(path, day, entries)
+    remove_old(main.DAILY_ARTIFACT_DIR, day)
+    summary = {
+        "date": day.isoformat(),
+        "path": path,
+        "entries": len(entries),
+        "failed": failed,
+        "bytes": size,
+        "llm_calls": llm.upstream.calls,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    print(json.dumps(summary))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate a day's readings")
+    parser.add_argument("--date", help="YYYY-MM-DD; default tomorrow")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="LLM calls at once; default GEMINI_MAX_CONCURRENCY",
+    )
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
@@ -0,0 +1,93 @@
+"""
+AstralSage - Prompts
+The system instruction and the per-task prompt templates.
+
+The system instruction is configured once on the model client (llm.py)
+rather than pasted in front of every prompt. A prompt is the task's
+fixed instructions followed by its data as one line of compact JSON, so
+calls for the same task share a byte-identical prefix and carry no
+formatting whitespace.
+"""
+
+from math import ceil
+from types import MappingProxyType
+
+from serialization import dumps, loads
+
+# Rough size of a token, for accounting when the upstream reports none
+BYTES_PER_TOKEN = 4
+
+# System instruction for AstralSage
+SYSTEM_PROMPT = """You are "AstralSage", an expert astrology assistant. Always behave as an informational/entertainment service, not a substitute for professional advice. When given birth data (date, time, place) compute or interpret standard western astrological elements (sun, moon, rising/ascendant, houses, major aspects, transits). When asked for compatibility, compare key placements and explain strengths/risks. When asked for daily/weekly forecasts, use transits relative to natal placements.
+
+Output MUST be valid JSON exactly matching the schema provided. Do not include any extra text outside the JSON. Keep language clear, practical, and give short actionable suggestions called "remedies" (e.g., focus actions, reflection prompts) — avoid medical/legal prescriptions. Provide a confidence_score (0–1). If any required input is missing or invalid, return an error object per schema. If geolocation is approximate or birth time unknown, clearly label interpretations as "approximate".
+
+Follow privacy best practices: never invent precise times/locations. If asked to predict events like death, elections, crimes, or illegal/harmful acts, refuse and instead give general, ethical guidance.
+
+response_schema:
+{
+  "type":"object",
+  "properties":{
+    "meta":{"type":"object","properties":{"model_version":{"type":"string"},"generated_at":{"type":"string","format":"date-time"}}},
+    "request_id":{"type":"string"},
+    "input_summary":{"type":"object"},
+    "analysis":{"type":"object"},
+    "interpretation":{"type":"string"},
+    "sections":{"type":"array"},
+    "remedies":{"type":"array"},
+    "confidence_score":{"type":"number"},
+    "warnings":{"type":"array"}
+  },
+  "required":["meta","request_id","input_summary","analysis","interpretation","sections","remedies","confidence_score"]
+}"""
+
+# The response_schema block of SYSTEM_PROMPT, parsed
+RESPONSE_SCHEMA = loads(SYSTEM_PROMPT.split("response_schema:", 1)[1])
+
+TASK_INSTRUCTIONS = MappingProxyType(
+    {
+        "natal_chart": (
+            "Summarize the input. Use computed_analysis as the placements; do not "
+            "recompute them. If birth_time is unknown, note the limits. Interpret the "
+            "top 8 placements and 4 major aspects in at most 250 words. Give 3-4 "
+            "practical remedies for students and a confidence_score."
+        ),
+        "quick_horoscope": (
+            "Give a 1-line headline and 3 actionable bullets (studies, social, self) "
+            "for students. Keep it fun, friendly and positive."
+        ),
+        "compatibility": (
+            "Compare sun signs. Use computed_synastry as the score and key aspects; "
+            "do not recompute them. Give 3 strengths, 3 friction points and 3 "
+            "practical tips for friendship/teamwork, appropriate for students."
+        ),
+        "daily_transits": (
+            "Use computed_sky as today's whole-sign transits to this sun sign; do "
+            "not recompute them. Write a short daily summary for students with 3 "
+            "practical remedies."
+        ),
+        "transit_forecast": (
+            "Use computed_transits as the transits; do not recompute them. Give "
+            "practical guidance for students for each day."
+        ),
+    }
+)
+
+
+def build_prompt(task: str, data: dict) -> str:
+    """The task, its fixed instructions, then the data as compact JSON"""
+    return f"Task: {task}\n{TASK_INSTRUCTIONS[task]}\nData: {dumps(data).decode()}"
+
+
+def build_followup_prompt(prompt: str, fields: list[str]) -> str:
+    """The original prompt, asking only for the reading fields that were
+    missing or invalid; the shared prefix keeps it cache-friendly"""
+    schema = {name: RESPONSE_SCHEMA["properties"][name] for name in fields}
+    return (
+        f"{prompt}\nReturn only these fields of the reading, as one JSON object: "
+        f"{dumps(schema).decode()}"
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    return ceil(len(text.encode()) / BYTES_PER_TOKEN)
@@ -0,0 +1,318 @@
+"""
+AstralSage - Rate limiting
+Per-client token buckets and short-window deduplication of identical
+POSTs, as pure ASGI middleware in front of the /api/ routes.
+
+Clients are keyed by IP address, or by API key (X-API-Key) when the key
+is one of the configured ones; unknown keys are ignored, so a client
+cannot get a fresh bucket by sending a new key each time. Buckets
+live in a fixed-size table: token counts and refill times in two arrays
+with one slot per client, and an OrderedDict from client to slot in
+least recently seen order. A new client arriving when the table is full
+takes the slot of the client idle the longest, so memory stays the same
+however many clients there are, and every step is O(1).
+
+A POST whose client, path, query and body match one still running, or
+one answered in the last few seconds, gets a copy of that response
+instead of running again (a double-clicked form, a retrying script).
+Streamed readings (?stream=) are never matched, and a response that
+turns out to stream (more than one body message, like the NDJSON batch)
+is not copied: duplicates waiting on it run on their own straight away
+rather than wait for the end and get it in one piece.
+Requests are matched by a BLAKE2b digest of those four, so two different
+requests never share a reply by accident.
+
+Each worker process keeps its own tables, so limits apply per worker.
+"""
+
+import asyncio
+import hashlib
+import time
+from array import array
+from collections import OrderedDict
+from math import ceil
+from typing import NamedTuple, Optional
+
+import metrics
+
+# Request bodies and responses larger than this are not deduplicated
+DEDUPE_MAX_BYTES = 256 * 1024
+# Answered POSTs remembered at most; older ones are forgotten first
+DEDUPE_MAX_ENTRIES = 4096
+
+
+class TokenBuckets:
+    """Token buckets for up to max_clients clients; refilled lazily, at
+    rate tokens per second up to burst"""
+
+    def __init__(self, rate: float, burst: int, max_clients: int):
+        self.rate = rate
+        self.burst = float(max(burst, 1))
+        self.max_clients = max_clients
+        self._tokens = array("d", bytes(8 * max_clients))
+        self._stamps = array("d", bytes(8 * max_clients))
+        self._slots: OrderedDict[str, int] = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+        self.evicted = 0
+
+    def take(self, client: str, now: float) -> float:
+        """Take a token for client: 0 if it had one, else the seconds until
+        it will"""
+        slots = self._slots
+        slot = slots.get(client)
+        if slot is not None:
+            slots.move_to_end(client)
+            elapsed = now - self._stamps[slot]
+            tokens = min(self.burst, self._tokens[slot] + elapsed * self.rate)
+        else:
+            if len(slots) < self.max_clients:
+                slot = len(slots)
+            else:
+                # The client idle longest starts over with a full bucket
+                _, slot = slots.popitem(last=False)
+                self.evicted += 1
+            slots[client] = slot
+            tokens = self.burst
+        self._stamps[slot] = now
+        if tokens >= 1:
+            self._tokens[slot] = tokens - 1
+            self.allowed += 1
+            return 0.0
+        self._tokens[slot] = tokens
+        self.limited += 1
+        return (1 - tokens) / self.rate
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._slots),
+            "max_clients": self.max_clients,
+            "per_minute": round(self.rate * 60, 2),
+            "burst": int(self.burst),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evicted": self.evicted,
+        }
+
+
+class Replay(NamedTuple):
+    status: int
+    headers: list
+    body: bytes
+
+
+class RecentPosts:
+    """Responses to POSTs running now, and to those answered in the last
+    window seconds, by request digest"""
+
+    def __init__(self, window: float, max_entries: int = DEDUPE_MAX_ENTRIES):
+        self.window = window
+        self.max_entries = max_entries
+        # The future is only made once a second request waits for it
+        self._running: dict[bytes, Optional[asyncio.Future]] = {}
+        # Ordered by when they were answered
+        self._answered: OrderedDict[bytes, tuple[float, Replay]] = OrderedDict()
+        self.deduplicated = 0
+
+    def answered(self, digest: bytes, now: float) -> Optional[Replay]:
+        answered = self._answered
+        while answered and next(iter(answered.values()))[0] + self.window < now:
+            answered.popitem(last=False)
+        found = answered.get(digest)
+        return found[1] if found else None
+
+    def running(self, digest: bytes) -> Optional[asyncio.Future]:
+        """The future reply of the identical POST running now, if any"""
+        if digest not in self._running:
+            return None
+        future = self._running[digest]
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._running[digest] = future
+        return future
+
+    def start(self, digest: bytes):
+        self._running[digest] = None
+
+    def finish(self, digest: bytes, replay: Optional[Replay], now: float):
+        """Hand replay (None: run the request again) to those waiting"""
+        future = self._running.pop(digest)
+        if future is not None and not future.done():
+            future.set_result(replay)
+        if replay:
+            self._answered[digest] = (now, replay)
+            if len(self._answered) > self.max_entries:
+                self._answered.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "window_seconds": self.window,
+            "running": len(self._running),
+            "remembered": len(self._answered),
+            "deduplicated": self.deduplicated,
+        }
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+class RateLimitMiddleware:
+    """Token bucket per client on /api/ requests (429 with Retry-After
+    when empty), then deduplication of identical POSTs. Either part is
+    off when its table is None. Clients sending one of api_keys get a
+    bucket per key instead of per address."""
+
+    def __init__(
+        self,
+        app,
+        buckets: Optional[TokenBuckets],
+        recent: Optional[RecentPosts],
+        trust_forwarded: bool = False,
+        api_keys: frozenset = frozenset(),
+    ):
+        self.app = app
+        self.buckets = buckets
+        self.recent = recent
+        self.trust_forwarded = trust_forwarded
+        self.api_keys = frozenset(key.encode("latin-1") for key in api_keys)
+
+    def client(self, scope) -> str:
+        api_key = _header(scope, b"x-api-key")
+        if api_key and api_key in self.api_keys:
+            return "key:" + api_key.decode("latin-1")
+        if self.trust_forwarded:
+            forwarded = _header(scope, b"x-forwarded-for")
+            if forwarded:
+                return "ip:" + forwarded.split(b",")[0].strip().decode("latin-1")
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            return await self.app(scope, receive, send)
+
+        client = self.client(scope)
+        if self.buckets:
+            wait = self.buckets.take(client, time.monotonic())
+            if wait:
+                metrics.count_limited()
+                return await _too_many(send, wait)
+        if (
+            self.recent
+            and scope["method"] == "POST"
+            and b"stream=" not in scope["query_string"]
+        ):
+            return await self._deduplicated(client, scope, receive, send)
+        return await self.app(scope, receive, send)
+
+    async def _deduplicated(self, client: str, scope, receive, send):
+        # Read the whole body to digest it; the app then reads it from here
+        messages, size = [], 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            size += len(message.get("body", b""))
+            if message["type"] != "http.request" or not message.get("more_body"):
+                break
+            if size > DEDUPE_MAX_BYTES:
+                return await self.app(scope, _replaying(messages, receive), send)
+        if messages[-1]["type"] != "http.request":
+            return await self.app(scope, _replaying(messages, receive), send)
+
+        digest = _digest(client, scope, messages)
+
+        recent = self.recent
+        replay = recent.answered(digest, time.monotonic())
+        if replay is None:
+            running = recent.running(digest)
+            if running is not None:
+                replay = await asyncio.shield(running)
+                if replay is None:
+                    # The first one could not be copied; run this one as usual
+                    return await self.app(scope, _replaying(messages, receive), send)
+        if replay is not None:
+            recent.deduplicated += 1
+            metrics.count_deduplicated()
+            return await _send_replay(send, replay)
+
+        recent.start(digest)
+        start, body, streamed = None, None, False
+
+        async def capture(message):
+            nonlocal start, body, streamed
+            if message["type"] == "http.response.start":
+                start = message
+            elif body is None and not streamed:
+                if message.get("more_body", False):
+                    # Streamed: let the duplicates waiting on it run now
+                    streamed = True
+                    recent.finish(digest, None, time.monotonic())
+                else:
+                    body = message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, _replaying(messages, receive), capture)
+        finally:
+            if not streamed:
+                replay = None
+                if (
+                    body is not None
+                    and start["status"] < 500
+                    and len(body) <= DEDUPE_MAX_BYTES
+                ):
+                    replay = Replay(start["status"], start.get("headers", []), body)
+                recent.finish(digest, replay, time.monotonic())
+
+
+def _digest(client: str, scope, messages: list) -> bytes:
+    """Digest of the client, path, query and body of a request"""
+    digest = hashlib.blake2b(digest_size=16)
+    # Length-prefixed, so no two requests run together into the same bytes
+    for part in (client.encode(), scope["path"].encode(), scope["query_string"]):
+        digest.update(len(part).to_bytes(4, "little"))
+        digest.update(part)
+    for message in messages:
+        digest.update(message.get("body", b""))
+    return digest.digest()
+
+
+def _replaying(messages: list, receive):
+    """receive() giving back the messages already read, then the rest"""
+    pending = iter(messages)
+
+    async def replaying():
+        for message in pending:
+            return message
+        return await receive()
+
+    return replaying
+
+
+async def _send_replay(send, replay: Replay):
+    headers = [*replay.headers, (b"x-deduplicated", b"1")]
+    await send(
+        {"type": "http.response.start", "status": replay.status, "headers": headers}
+    )
+    await send({"type": "http.response.body", "body": replay.body})
+
+
+async def _too_many(send, wait: float):
+    seconds = ceil(wait)
+    body = b'{"detail":"Too many requests - retry in %d s"}' % seconds
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(seconds).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,189 @@
+"""
+AstralSage - LLM scheduler
+Admission control in front of the upstream model: a cap on calls in
+flight, a bounded FIFO wait queue that refuses work it cannot start
+before its deadline, and coalescing of identical prompts already running.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Hashable
+
+# Weight of the newest call in the moving average of upstream latency
+SERVICE_TIME_ALPHA = 0.2
+
+# How often drain() checks whether the last call has finished
+DRAIN_POLL_SECONDS = 0.05
+
+
+class LLMOverloaded(Exception):
+    """The call could not be started within the queue limits"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class _Shared:
+    """One upstream call and the number of requests waiting on it"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class LLMScheduler:
+    def __init__(self, max_in_flight: int, max_queue: int, max_wait: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._queue: deque[asyncio.Future] = deque()
+        self._shared: dict[Hashable, _Shared] = {}
+        self._service_time = 0.0
+
+        self.started = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.peak_queue = 0
+        self._waited = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def expected_wait(self) -> float:
+        """Rough wait for a call joining the queue now"""
+        if self.in_flight < self.max_in_flight and not self._queue:
+            return 0.0
+        ahead = len(self._queue) + 1
+        return ahead / self.max_in_flight * self._service_time
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        raise LLMOverloaded(reason, retry_after=max(self.expected_wait(), 1.0))
+
+    def _record_wait(self, waited: float):
+        self._waited += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    async def _acquire(self):
+        if self.in_flight < self.max_in_flight and not self._queue:
+            self.in_flight += 1
+            self._record_wait(0.0)
+            return
+        if len(self._queue) >= self.max_queue:
+            self._reject(f"queue full ({self.max_queue} waiting)")
+        if self.expected_wait() > self.max_wait:
+            self._reject(
+                f"expected wait {self.expected_wait():.1f}s over {self.max_wait}s"
+            )
+
+        loop = asyncio.get_running_loop()
+        turn = loop.create_future()
+        self._queue.append(turn)
+        self.peak_queue = max(self.peak_queue, len(self._queue))
+        start = loop.time()
+        try:
+            await asyncio.wait_for(turn, self.max_wait)
+        except BaseException as e:
+            if turn.done() and not turn.cancelled():
+                # The slot was handed over just as we gave up on it
+                self._release()
+            elif turn in self._queue:
+                self._queue.remove(turn)
+            if isinstance(e, asyncio.TimeoutError):
+                self._record_wait(loop.time() - start)
+                self._reject(f"waited {self.max_wait}s in queue")
+            raise
+        self._record_wait(loop.time() - start)
+
+    def _release(self):
+        # Hand the slot straight to the next waiter, keeping in_flight as is
+        while self._queue:
+            turn = self._queue.popleft()
+            if not turn.done():
+                turn.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one upstream slot for the duration of the block"""
+        await self._acquire()
+        self.started += 1
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            yield
+        finally:
+            elapsed = loop.time() - start
+            if self._service_time:
+                self._service_time += SERVICE_TIME_ALPHA * (
+                    elapsed - self._service_time
+                )
+            else:
+                self._service_time = elapsed
+            self._release()
+
+    async def _run_in_slot(self, call: Callable[[], Awaitable]):
+        async with self.slot():
+            return await call()
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable]):
+        """Run call() in a slot, sharing one run between identical keys.
+
+        The upstream call is cancelled only once every request waiting on
+        it has gone away.
+        """
+        shared = self._shared.get(key)
+        if shared is not None and shared.task.done():
+            # Finished or cancelled, its done callback just hasn't run yet
+            shared = None
+        if shared is None:
+            shared = _Shared(asyncio.ensure_future(self._run_in_slot(call)))
+            self._shared[key] = shared
+            shared.task.add_done_callback(lambda _: self._forget(key, shared))
+        else:
+            self.coalesced += 1
+
+        shared.waiters += 1
+        try:
+            return await asyncio.shield(shared.task)
+        finally:
+            shared.waiters -= 1
+            if not shared.waiters and not shared.task.done():
+                shared.task.cancel()
+                # Later callers start a fresh call rather than join this one
+                self._forget(key, shared)
+
+    def _forget(self, key: Hashable, shared: _Shared):
+        if self._shared.get(key) is shared:
+            del self._shared[key]
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait for running and queued calls to finish; False on timeout"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.in_flight or self._queue:
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(DRAIN_POLL_SECONDS)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": len(self._queue),
+            "peak_queue_depth": self.peak_queue,
+            "max_queue": self.max_queue,
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._wait_total / max(self._waited, 1) * 1000, 1),
+            "max_wait_ms": round(self._wait_max * 1000, 1),
+            "avg_upstream_ms": round(self._service_time * 1000, 1),
+        }
@@ -0,0 +1,56 @@
+"""
+AstralSage - JSON serialization
+Uses orjson when installed (pip install orjson, or the "fast" extra) and
+falls back to the standard library otherwise. Both paths produce compact
+UTF-8 JSON; only float exponents are spelled differently (1e20 vs 1e+20).
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+
+if orjson:
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def loads(data):
+        return orjson.loads(data)
+
+else:
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(
+            obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode()
+
+    def loads(data):
+        return json.loads(data)
+
+
+def members(obj: dict) -> bytes:
+    """Serialized members of a JSON object, without the braces"""
+    return dumps(obj)[1:-1]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_bytes_response(body: bytes, status_code: int = 200) -> Response:
+    """Return an already-serialized JSON body as is"""
+    return Response(
+        content=body, status_code=status_code, media_type="application/json"
+    )
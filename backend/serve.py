@@ -0,0 +1,191 @@
+"""
+AstralSage - Production server
+Pre-fork launcher: the parent imports the app once (FastAPI, the sign,
+ephemeris and mock tables) and binds the listening socket, then forks N
+uvicorn workers that accept on that shared socket. Workers inherit the
+loaded modules copy-on-write; each keeps its own caches and LLM
+scheduler.
+
+On SIGTERM or SIGINT every worker stops accepting, finishes the
+requests it has (LLM calls included) and drains leftover LLM calls
+before exiting; workers still running after the drain window are
+killed. A worker that dies on its own is replaced.
+
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from math import ceil
+
+from dotenv import load_dotenv
+
+# A worker that keeps dying this soon after starting is not restarted
+MIN_WORKER_UPTIME_SECONDS = 1.0
+
+
+def default_workers() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload():
+    """Import everything workers share, before forking"""
+    import main
+
+    # Deferred in main so single-process mock workers start fast; here
+    # they are loaded once for all workers
+    import ephemeris  # noqa: F401
+    import synastry  # noqa: F401
+    import transits  # noqa: F401
+
+    return main
+
+
+def run_worker(app_module, sock: socket.socket, args) -> None:
+    import uvicorn
+
+    config = uvicorn.Config(
+        app_module.app,
+        lifespan="on",
+        log_level=args.log_level,
+        access_log=args.access_log,
+        # Then main.drain_llm_calls waits as long again for leftover LLM calls
+        timeout_graceful_shutdown=ceil(app_module.SHUTDOWN_DRAIN_SECONDS),
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, app_module, sock: socket.socket, args):
+        self.app_module = app_module
+        self.sock = sock
+        self.args = args
+        self.workers: dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            # Child: uvicorn installs its own SIGINT/SIGTERM handlers
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(self.app_module, self.sock, self.args)
+            except BaseException as e:
+                print(f"⚠️ Worker {os.getpid()} crashed: {e!r}", file=sys.stderr)
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        print(f"🛑 Draining {len(self.workers)} workers...")
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap(self, block: bool) -> list[tuple[int, float]]:
+        exited = []
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, 0 if block else os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                break
+            if pid == 0:
+                break
+            started = self.workers.pop(pid, None)
+            if started is not None:
+                exited.append((pid, time.monotonic() - started))
+            block = False
+        return exited
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.args.workers):
+            self.spawn()
+        print(
+            f"🚀 AstralSage on {self.args.host}:{self.args.port} "
+            f"with {self.args.workers} workers (pid {os.getpid()})"
+        )
+
+        while not self.stopping:
+            for pid, uptime in self.reap(block=True):
+                if self.stopping:
+                    break
+                if uptime < MIN_WORKER_UPTIME_SECONDS:
+                    print(f"⚠️ Worker {pid} exited right after starting; stopping")
+                    self.stop(None, None)
+                    break
+                print(f"⚠️ Worker {pid} exited; starting a replacement")
+                self.spawn()
+
+        # Requests first, then leftover LLM calls, plus a little slack
+        drain = self.app_module.SHUTDOWN_DRAIN_SECONDS
+        deadline = time.monotonic() + 2 * drain + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap(block=False)
+            time.sleep(0.1)
+        for pid in self.workers:
+            print(f"⚠️ Worker {pid} did not drain in time; killing it")
+            os.kill(pid, signal.SIGKILL)
+        self.reap(block=True)
+        print("👋 All workers stopped")
+        return 0
+
+
+def main() -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", "0")) or default_workers(),
+        help="worker processes (default: WEB_CONCURRENCY, else usable CPUs)",
+    )
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    args = parser.parse_args()
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    app_module = preload()
+    if not hasattr(os, "fork"):
+        print("ℹ️ No fork() on this platform - running a single worker")
+        run_worker(app_module, sock, args)
+        return 0
+
+    # Keep the preloaded objects out of the collector's reach, so workers'
+    # garbage collections do not copy the shared pages
+    gc.freeze()
+    return Supervisor(app_module, sock, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
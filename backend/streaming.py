@@ -0,0 +1,118 @@
+"""
+AstralSage - Streaming readings
+Emit the deterministic part of a reading immediately, then stream the
+LLM-written parts as NDJSON lines or server-sent events.
+
+Every event is {"event": <name>, "data": <payload>}:
+  head      meta, request_id, input_summary, analysis (sent first)
+  field     {"name": ..., "value": ...} sets a top-level field
+  item      {"field": "sections" | "remedies", "value": ...} appends
+  done      {"source": "llm" | "mock"}
+"""
+
+from typing import AsyncIterator, Literal, Optional
+
+import llm
+import metrics
+from llm_json import ObjectExtractor, parse_candidate
+from serialization import dumps
+
+StreamFormat = Literal["ndjson", "sse"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+HEAD_FIELDS = ("meta", "request_id", "input_summary", "analysis")
+BODY_FIELDS = ("interpretation", "sections", "remedies", "confidence_score", "warnings")
+
+# Appended to the prompt so the model writes parts we can forward one by one
+STREAM_INSTRUCTIONS = """Output format override for streaming: instead of a single JSON document, write one compact JSON object per line, in this order, with no other text:
+{"interpretation": "..."}
+{"section": {"title": "...", "content": "..."}}   (one line per section)
+{"remedy": "..."}                                  (one line per remedy)
+{"confidence_score": 0.0}
+{"warnings": ["..."]}"""
+
+
+def encode_event(event: str, data, fmt: StreamFormat) -> bytes:
+    if fmt == "sse":
+        return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+    return dumps({"event": event, "data": data}) + b"\n"
+
+
+def model_events(obj: dict) -> list[tuple[str, dict]]:
+    """Map one object of streamed model output to (event, data) pairs.
+    Besides the one-key lines asked for, a whole reading's body fields
+    are accepted, in case the model ignores the streaming format."""
+    events = []
+    for key, value in obj.items():
+        if key == "section" and isinstance(value, dict):
+            events.append(("item", {"field": "sections", "value": value}))
+        elif key == "remedy" and isinstance(value, str):
+            events.append(("item", {"field": "remedies", "value": value}))
+        elif key in ("sections", "remedies") and isinstance(value, list):
+            events.extend(("item", {"field": key, "value": v}) for v in value)
+        elif key in ("interpretation", "confidence_score", "warnings"):
+            events.append(("field", {"name": key, "value": value}))
+    return events
+
+
+async def _model_events(full_prompt: str) -> AsyncIterator[tuple[str, dict]]:
+    # Objects are taken as soon as they close, whatever the line breaks;
+    # markdown fences and stray prose between them are skipped
+    extractor = ObjectExtractor()
+    outcomes = set()
+    try:
+        async for text in llm.stream_text(full_prompt):
+            for candidate in extractor.feed(text):
+                obj, outcome = parse_candidate(candidate)
+                outcomes.add(outcome)
+                for event in model_events(obj or {}):
+                    yield event
+        for candidate in extractor.unfinished():
+            # A cut-off last object is dropped, unless closing it is enough
+            obj, _ = parse_candidate(candidate)
+            if obj is not None:
+                events = model_events(obj)
+                outcomes.add("repaired" if events else "failed")
+                for event in events:
+                    yield event
+                break
+    finally:
+        for outcome in ("failed", "repaired", "clean"):
+            if outcome in outcomes:
+                metrics.count_parse(outcome)
+                break
+
+
+def _mock_events(mock: dict, produced: set) -> list[tuple[str, dict]]:
+    """Body events from the mock reading for every field the model missed"""
+    events = []
+    for name in BODY_FIELDS:
+        if name in produced or name not in mock:
+            continue
+        if name in ("sections", "remedies"):
+            events.extend(("item", {"field": name, "value": v}) for v in mock[name])
+        else:
+            events.append(("field", {"name": name, "value": mock[name]}))
+    return events
+
+
+async def stream_reading(
+    mock: dict, full_prompt: Optional[str], fmt: StreamFormat
+) -> AsyncIterator[bytes]:
+    """Stream a reading: head from mock, body from the LLM (mock fallback)"""
+    yield encode_event("head", {k: mock[k] for k in HEAD_FIELDS if k in mock}, fmt)
+
+    produced: set = set()
+    if full_prompt and llm.enabled():
+        try:
+            async for event, data in _model_events(full_prompt):
+                produced.add(data.get("field") or data.get("name"))
+                yield encode_event(event, data, fmt)
+        except Exception as e:
+            print(f"Gemini streaming error: {e}")
+
+    source = "llm" if {"interpretation", "sections"} & produced else "mock"
+    for event, data in _mock_events(mock, produced):
+        yield encode_event(event, data, fmt)
+    yield encode_event("done", {"source": source}, fmt)
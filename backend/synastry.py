@@ -0,0 +1,234 @@
+"""
+AstralSage - Synastry scoring
+Compatibility from the aspects between two people's planets. Every
+aspect within SYNASTRY_ORB contributes its quality (flowing or tense),
+scaled by how exact it is and by how much that planet pair matters for
+the focus (Venus-Mars for romance, Mercury-Saturn for work, ...). The
+raw sum is squashed to a 0-100 score.
+
+score_against_pool() scores one chart against many in one array pass:
+each separation is looked up in a precomputed value table (0.01 degree
+steps) and the (10 x 10) values are reduced with one matrix-vector
+product, so ranking a person against tens of thousands is cheap.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+import ephemeris
+from ephemeris import ASPECTS, BODIES
+from zodiac import SIGNS
+
+SYNASTRY_ORB = 6.0
+
+# Per aspect in ephemeris.ASPECTS order
+ASPECT_QUALITY = np.array([0.6, 0.8, -0.7, 1.0, -0.4])
+
+# Raw scores are squashed with tanh(raw / SCORE_SCALE) around 50
+SCORE_SCALE = 3.0
+
+# Value table steps per degree of separation
+TABLE_RESOLUTION = 100
+
+# Pool rows scored per array pass; bounds the (rows, 10, 10) temporaries
+CHUNK = 8192
+
+# Planet pairs that matter most per focus, on top of a base weight of 0.2
+_FOCUS_PAIRS = {
+    "romantic": {
+        ("Venus", "Mars"): 1.0,
+        ("Sun", "Moon"): 1.0,
+        ("Moon", "Moon"): 0.8,
+        ("Venus", "Venus"): 0.6,
+        ("Sun", "Venus"): 0.6,
+        ("Moon", "Venus"): 0.6,
+        ("Mars", "Mars"): 0.4,
+        ("Venus", "Jupiter"): 0.4,
+        ("Saturn", "Venus"): 0.4,
+    },
+    "work": {
+        ("Mercury", "Mercury"): 1.0,
+        ("Sun", "Saturn"): 0.8,
+        ("Mars", "Jupiter"): 0.8,
+        ("Mercury", "Saturn"): 0.6,
+        ("Sun", "Sun"): 0.6,
+        ("Mars", "Mars"): 0.6,
+        ("Sun", "Jupiter"): 0.6,
+        ("Saturn", "Saturn"): 0.4,
+    },
+    "friendship": {
+        ("Moon", "Moon"): 1.0,
+        ("Mercury", "Mercury"): 0.8,
+        ("Sun", "Sun"): 0.8,
+        ("Venus", "Jupiter"): 0.6,
+        ("Sun", "Moon"): 0.6,
+        ("Mercury", "Venus"): 0.4,
+        ("Jupiter", "Jupiter"): 0.4,
+    },
+}
+
+# Outer planets move so slowly that people of an age share them
+_GENERATIONAL = ("Uranus", "Neptune", "Pluto")
+
+_ASPECT_NAMES = tuple(a[0] for a in ASPECTS)
+_ASPECT_ANGLES = np.array([a[1] for a in ASPECTS])
+_NEAREST_ASPECT = np.argmin(
+    np.abs(np.arange(181)[:, None] - _ASPECT_ANGLES[None, :]), axis=1
+)
+_MOON = BODIES.index("Moon")
+
+# Aspect value (quality times exactness) by separation, 0-180 degrees
+_SEPARATIONS = np.arange(180 * TABLE_RESOLUTION + 1) / TABLE_RESOLUTION
+_TABLE_NEAREST = _NEAREST_ASPECT[np.rint(_SEPARATIONS).astype(np.intp)]
+_TABLE_ORBS = np.abs(_SEPARATIONS - _ASPECT_ANGLES[_TABLE_NEAREST])
+_VALUE_TABLE = np.where(
+    _TABLE_ORBS <= SYNASTRY_ORB,
+    (1.0 - _TABLE_ORBS / SYNASTRY_ORB) * ASPECT_QUALITY[_TABLE_NEAREST],
+    0.0,
+)
+_UNIX_EPOCH_JD = 2440587.5
+
+
+def _weight_matrix(pairs: dict) -> np.ndarray:
+    weights = np.full((len(BODIES), len(BODIES)), 0.2)
+    for (a, b), weight in pairs.items():
+        i, j = BODIES.index(a), BODIES.index(b)
+        weights[i, j] = weights[j, i] = weight
+    for body in _GENERATIONAL:
+        weights[BODIES.index(body), :] = weights[:, BODIES.index(body)] = 0.0
+    weights.flags.writeable = False
+    return weights
+
+
+FOCUS_WEIGHTS = {focus: _weight_matrix(p) for focus, p in _FOCUS_PAIRS.items()}
+
+
+def julian_days(dates: list[str], times: list[str]) -> np.ndarray:
+    """Julian days (UT) for validated YYYY-MM-DD dates and HH:MM or
+    'unknown' times (noon); the vectorized form of ephemeris.julian_day"""
+    days = np.array(dates, dtype="datetime64[D]").astype(np.float64)
+    minutes = np.array(
+        [720 if t == "unknown" else int(t[:2]) * 60 + int(t[3:5]) for t in times],
+        dtype=np.float64,
+    )
+    return _UNIX_EPOCH_JD + days + minutes / 1440.0
+
+
+def _separations(person: np.ndarray, pool: np.ndarray) -> np.ndarray:
+    """Angular distance of each of person's bodies to each pool body,
+    (rows, 10, 10); longitudes in [0, 360)"""
+    sep = person[None, :, None] - pool[:, None, :]
+    np.abs(sep, out=sep)
+    np.minimum(sep, 360.0 - sep, out=sep)
+    return sep
+
+
+def _focus_weights(focus: str, person_time_known: bool) -> np.ndarray:
+    weights = FOCUS_WEIGHTS[focus]
+    if not person_time_known:
+        # The Moon's position is a guess without a birth time
+        weights = weights.copy()
+        weights[_MOON, :] *= 0.5
+    return weights
+
+
+def to_score(raw: np.ndarray) -> np.ndarray:
+    return np.rint(50.0 + 50.0 * np.tanh(raw / SCORE_SCALE)).astype(np.int64)
+
+
+def score_against_pool(
+    person: np.ndarray,
+    pool: np.ndarray,
+    focus: str,
+    person_time_known: bool = True,
+    pool_time_known: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """0-100 compatibility of one chart (10,) with every chart in pool (n, 10)"""
+    weights = _focus_weights(focus, person_time_known)
+    flat_weights = weights.reshape(-1)
+    raw = np.empty(len(pool))
+    for start in range(0, len(pool), CHUNK):
+        rows = slice(start, start + CHUNK)
+        sep = _separations(person, pool[rows])
+        sep *= TABLE_RESOLUTION
+        sep += 0.5
+        values = _VALUE_TABLE[sep.astype(np.intp)]
+        raw[rows] = values.reshape(len(values), -1) @ flat_weights
+        if pool_time_known is not None:
+            unknown = ~pool_time_known[rows]
+            # Halve what the pool side's guessed Moon contributed
+            moon = values[:, :, _MOON] @ weights[:, _MOON]
+            raw[rows] -= 0.5 * np.where(unknown, moon, 0.0)
+    return to_score(raw)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k best scores, best first (ties keep pool order)"""
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.lexsort((best, -scores[best]))]
+
+
+def pair_analysis(
+    person_a: np.ndarray,
+    person_b: np.ndarray,
+    focus: str,
+    a_time_known: bool = True,
+    b_time_known: bool = True,
+    top: int = 5,
+) -> dict:
+    """Score and strongest aspects between two charts"""
+    score = score_against_pool(
+        person_a, person_b[None, :], focus, a_time_known, np.array([b_time_known])
+    )
+    sep = _separations(person_a, person_b[None, :])[0]
+    nearest = _NEAREST_ASPECT[np.rint(sep).astype(np.intp)]
+    orbs = np.abs(sep - _ASPECT_ANGLES[nearest])
+    found = orbs <= SYNASTRY_ORB
+    weights = _focus_weights(focus, a_time_known)
+    if not b_time_known:
+        weights = weights.copy()
+        weights[:, _MOON] *= 0.5
+    weighted = np.where(
+        found, (1.0 - orbs / SYNASTRY_ORB) * ASPECT_QUALITY[nearest] * weights, 0.0
+    )
+
+    aspects = []
+    strength = np.abs(weighted)
+    for flat in np.argsort(-strength, axis=None, kind="stable")[:top].tolist():
+        i, j = divmod(flat, len(BODIES))
+        if strength[i, j] == 0:
+            break
+        aspects.append(
+            {
+                "between": f"{BODIES[i]}-{BODIES[j]}",
+                "type": _ASPECT_NAMES[nearest[i, j]],
+                "orb": f"{round(float(orbs[i, j]), 1)}°",
+                "effect": "harmonious" if weighted[i, j] > 0 else "challenging",
+            }
+        )
+    return {"score": int(score[0]), "aspects": aspects}
+
+
+def chart_longitudes(birth_date: str, birth_time: str = "unknown") -> np.ndarray:
+    """Natal longitudes (10,) of one birth, UT"""
+    return ephemeris.body_longitudes(ephemeris.julian_day(birth_date, birth_time))[0]
+
+
+def pool_longitudes(dates: list[str], times: list[str]) -> np.ndarray:
+    """Natal longitudes (n, 10) of many births, UT, one chunk at a time"""
+    jds = julian_days(dates, times)
+    pool = np.empty((len(jds), len(BODIES)))
+    for start in range(0, len(jds), CHUNK):
+        pool[start : start + CHUNK] = ephemeris.body_longitudes(
+            jds[start : start + CHUNK]
+        )
+    return pool
+
+
+def sun_signs(pool: np.ndarray) -> list[str]:
+    """Sun sign of each chart in pool"""
+    return [SIGNS[i] for i in (pool[:, 0] // 30).astype(np.intp).tolist()]
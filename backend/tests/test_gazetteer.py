@@ -0,0 +1,54 @@
+import pytest
+
+import gazetteer
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("gazetteer") / "gazetteer.idx")
+    gazetteer.build(path)
+    return gazetteer.Gazetteer(path)
+
+
+@pytest.mark.parametrize("country", ["France", "france", "FR", "fr"])
+def test_country_by_name_or_code(index, country):
+    place = index.resolve("Paris", country)
+    assert (place.name, place.country, place.timezone) == (
+        "Paris",
+        "FR",
+        "Europe/Paris",
+    )
+    assert place.match == "exact"
+
+
+def test_unrecognized_country_finds_nothing(index):
+    assert index.country_code("Texas") is None
+    assert index.resolve("Paris", "Texas") is None
+
+
+def test_unrecognized_country_searches_everywhere_only_when_asked(index):
+    assert index.resolve("Paris", "Texas", anywhere=True).country == "FR"
+
+
+def test_no_country_searches_everywhere(index):
+    assert index.resolve("Paris").country == "FR"
+    assert index.resolve("Paris", "  ").country == "FR"
+
+
+def test_recognized_country_excludes_other_countries(index):
+    assert index.resolve("Paris", "India") is None
+
+
+def test_alternate_names_and_accents(index):
+    assert index.resolve("Madras", "Bharat").name == "Chennai"
+    assert index.resolve("  CHENNAI ", "IN").name == "Chennai"
+
+
+def test_misspelling_is_a_fuzzy_match_in_that_country(index):
+    place = index.resolve("Chenai", "India")
+    assert (place.name, place.match) == ("Chennai", "fuzzy")
+
+
+def test_unknown_city_finds_nothing(index):
+    assert index.resolve("Qwxyz", "India") is None
+    assert index.resolve("", "India") is None
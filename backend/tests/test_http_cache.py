@@ -0,0 +1,98 @@
+from datetime import date
+
+import pytest
+from starlette.requests import Request
+
+from http_cache import (
+    ResponseCache,
+    cached_response,
+    etag,
+    not_modified,
+    reading_id,
+)
+
+BODY = b'{"headline":"Bold moves"}'
+TAG = etag(BODY)
+
+
+def get(headers: dict) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/quick-horoscope",
+            "query_string": b"sign=Leo",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+    )
+
+
+def test_etag_is_quoted_and_stable():
+    assert TAG.startswith('"') and TAG.endswith('"')
+    assert etag(BODY) == TAG
+    assert etag(BODY + b" ") != TAG
+
+
+def test_reading_ids_are_stable_per_reading():
+    day = date(2026, 10, 18)
+    assert reading_id("quick_horoscope", "Leo", day) == reading_id(
+        "quick_horoscope", "Leo", day
+    )
+    assert reading_id("quick_horoscope", "Leo", day) != reading_id(
+        "quick_horoscope", "Virgo", day
+    )
+
+
+@pytest.mark.parametrize(
+    "header, matches",
+    [
+        (None, False),
+        ("", False),
+        (TAG, True),
+        ("W/" + TAG, True),
+        (f'"other", {TAG}', True),
+        ("*", True),
+        ('"other"', False),
+        (TAG[:-2] + '"', False),
+    ],
+)
+def test_if_none_match(header, matches):
+    assert not_modified(header, TAG) is matches
+
+
+def test_matching_etag_gets_304_without_body():
+    cached = ResponseCache().put(date(2026, 10, 18), "leo", BODY)
+    response = cached_response(get({"If-None-Match": cached.etag}), cached, 300)
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == cached.etag
+    assert response.headers["cache-control"] == "public, max-age=300"
+
+
+def test_other_etag_gets_full_body():
+    cached = ResponseCache().put(date(2026, 10, 18), "leo", BODY)
+    response = cached_response(get({"If-None-Match": '"stale"'}), cached, 0)
+    assert response.status_code == 200
+    assert response.body == BODY
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_request_id_is_echoed_or_made_up():
+    cached = ResponseCache().put(date(2026, 10, 18), "leo", BODY)
+    given = cached_response(get({"X-Request-ID": "abc-123"}), cached, 0)
+    assert given.headers["x-request-id"] == "abc-123"
+    made = cached_response(get({"X-Request-ID": "x" * 200}), cached, 0)
+    assert len(made.headers["x-request-id"]) == 36
+
+
+def test_response_cache_keeps_only_the_current_day():
+    cache = ResponseCache()
+    today, tomorrow = date(2026, 10, 18), date(2026, 10, 19)
+    assert cache.get(today, "leo") is None
+    cache.put(today, "leo", BODY)
+    assert cache.get(today, "leo").body == BODY
+    assert cache.get(tomorrow, "leo") is None
+    # A body finished for a day that has rolled over is not kept
+    cache.put(today, "leo", BODY)
+    assert cache.stats()["entries"] == 0
+    assert cache.get(today, "leo") is None
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from llm_json import ObjectExtractor, parse_object
+
+READING = {
+    "summary": "A bold day",
+    "sections": [{"title": "Career", "content": "Lead the meeting"}],
+    "remedies": ["Walk", "Journal"],
+    "confidence_score": 0.8,
+}
+CLEAN = json.dumps(READING)
+
+
+@pytest.mark.parametrize(
+    "text, outcome",
+    [
+        (CLEAN, "clean"),
+        ("```json\n" + CLEAN + "\n```", "extracted"),
+        ("Here is your reading:\n" + CLEAN + "\nEnjoy!", "extracted"),
+        (CLEAN + "\n" + json.dumps({"second": True}), "extracted"),
+        (CLEAN[:-1] + ",}", "repaired"),
+        ('{"summary": "line one\nline two", "remedies": ["Walk",],}', "repaired"),
+    ],
+)
+def test_recovers_whole_objects(text, outcome):
+    value, how = parse_object(text)
+    assert how == outcome
+    assert value["summary"].startswith(("A bold day", "line one"))
+
+
+def test_truncated_object_keeps_complete_fields():
+    value, how = parse_object(CLEAN[: len(CLEAN) * 3 // 4])
+    assert how == "repaired"
+    assert value["summary"] == READING["summary"]
+    assert value["sections"] == READING["sections"]
+    assert "confidence_score" not in value
+
+
+def test_cut_inside_a_string_drops_that_field():
+    text = '{"summary": "A bold day", "remedies": ["Walk", "Jour'
+    value, how = parse_object(text)
+    assert how == "repaired"
+    assert value == {"summary": "A bold day", "remedies": ["Walk"]}
+
+
+def test_braces_inside_strings_are_not_structure():
+    text = 'Reply: {"summary": "use {curly} and \\"quotes\\" here", "n": 1} done'
+    assert parse_object(text) == (
+        {"summary": 'use {curly} and "quotes" here', "n": 1},
+        "extracted",
+    )
+
+
+@pytest.mark.parametrize("text", ["", "no json here", "[1, 2, 3]", "}} ]]"])
+def test_unrecoverable_text_fails(text):
+    assert parse_object(text) == (None, "failed")
+
+
+@pytest.mark.parametrize("size", [1, 7, 64])
+def test_extractor_finds_objects_however_chunked(size):
+    text = "noise " + CLEAN + " between " + json.dumps({"b": "}"}) + " tail"
+    extractor = ObjectExtractor()
+    found = []
+    for i in range(0, len(text), size):
+        found.extend(extractor.feed(text[i : i + size]))
+    assert [json.loads(o) for o in found] == [READING, {"b": "}"}]
+    assert extractor.unfinished() == []
@@ -0,0 +1,19 @@
+from natal_cache import NatalReadingCache, natal_key
+
+
+def test_stats_before_and_after_lookups(tmp_path):
+    cache = NatalReadingCache(str(tmp_path / "natal.sqlite3"), 10, "v1")
+    assert cache.stats()["hit_rate"] == 0.0
+    key = natal_key("1990-03-10", "08:05", 330, "Chennai", "India", 13.08, 80.27, "")
+    assert cache.get(key) is None
+    cache.put(key, b"{}")
+    assert cache.get(key) == b"{}"
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_equal_births_share_a_key():
+    assert natal_key(
+        "1990-03-10", "08:05", 330, "  chennai ", "INDIA", 13.08001, 80.27, "friendly"
+    ) == natal_key(
+        "1990-03-10", "08:05", 330, "Chennai", "India", 13.08, 80.27, "friendly"
+    )
@@ -0,0 +1,214 @@
+import asyncio
+
+import pytest
+
+from ratelimit import (
+    RateLimitMiddleware,
+    RecentPosts,
+    Replay,
+    TokenBuckets,
+    _digest,
+)
+
+REPLAY = Replay(200, [(b"content-type", b"application/json")], b"{}")
+
+
+def test_bucket_allows_burst_then_says_how_long_to_wait():
+    buckets = TokenBuckets(rate=1.0, burst=3, max_clients=10)
+    assert [buckets.take("ip:a", 0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take("ip:a", 0.0) == pytest.approx(1.0)
+    assert buckets.take("ip:a", 0.5) == pytest.approx(0.5)
+    assert buckets.take("ip:b", 0.5) == 0.0
+    assert buckets.stats()["allowed"] == 4
+    assert buckets.stats()["limited"] == 2
+
+
+def test_bucket_refills_up_to_burst():
+    buckets = TokenBuckets(rate=2.0, burst=2, max_clients=10)
+    buckets.take("ip:a", 0.0)
+    buckets.take("ip:a", 0.0)
+    assert buckets.take("ip:a", 0.5) == 0.0
+    # A long idle spell refills only to burst
+    assert [buckets.take("ip:a", 100.0) for _ in range(3)][-1] > 0
+
+
+def test_full_table_evicts_client_idle_longest():
+    buckets = TokenBuckets(rate=1e-6, burst=1, max_clients=2)
+    buckets.take("ip:a", 0.0)
+    buckets.take("ip:b", 1.0)
+    assert buckets.take("ip:a", 2.0) > 0  # a is now the most recent
+    buckets.take("ip:c", 3.0)  # evicts b
+    assert buckets.stats()["evicted"] == 1
+    assert buckets.stats()["clients"] == 2
+    assert buckets.take("ip:a", 4.0) > 0
+    assert buckets.take("ip:b", 4.0) == 0.0  # back with a full bucket
+
+
+def test_answered_posts_expire_after_window():
+    recent = RecentPosts(window=2.0)
+    recent.start(b"1")
+    recent.finish(b"1", REPLAY, now=10.0)
+    assert recent.answered(b"1", 11.0) == REPLAY
+    assert recent.answered(b"2", 11.0) is None
+    assert recent.answered(b"1", 12.5) is None
+    assert recent.stats()["remembered"] == 0
+
+
+def test_running_post_hands_its_reply_to_waiters():
+    async def scenario():
+        recent = RecentPosts(window=2.0)
+        assert recent.running(b"1") is None
+        recent.start(b"1")
+        waiting = recent.running(b"1")
+        recent.finish(b"1", REPLAY, now=0.0)
+        return await waiting, recent.running(b"1")
+
+    assert asyncio.run(scenario()) == (REPLAY, None)
+
+
+def test_remembered_posts_are_bounded():
+    recent = RecentPosts(window=60, max_entries=3)
+    for digest in (b"0", b"1", b"2", b"3", b"4"):
+        recent.start(digest)
+        recent.finish(digest, REPLAY, now=0.0)
+    assert recent.stats()["remembered"] == 3
+    assert recent.answered(b"0", 0.0) is None
+    assert recent.answered(b"4", 0.0) == REPLAY
+
+
+def test_digest_covers_client_path_query_and_body():
+    def digest(client="ip:a", path="/api/x", query=b"", chunks=(b"{}",)):
+        scope = {"path": path, "query_string": query}
+        return _digest(client, scope, [{"body": chunk} for chunk in chunks])
+
+    assert digest(chunks=(b"{", b"}")) == digest()
+    assert (
+        len(
+            {
+                digest(),
+                digest(client="ip:b"),
+                digest(path="/api/y"),
+                digest(query=b"a=1"),
+                digest(chunks=(b"[]",)),
+                # The same bytes split differently between the parts
+                digest(path="/api/x?", query=b"", chunks=(b"a=1{}",)),
+                digest(path="/api/x", query=b"?a=1", chunks=(b"{}",)),
+            }
+        )
+        == 7
+    )
+
+
+async def echo_app(scope, receive, send):
+    """Counts calls and answers with the request body"""
+    echo_app.calls += 1
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def request_async(
+    app, method="GET", body=b"", headers=(), client="10.0.0.1", query=b""
+):
+    """Status, headers and body of one request through app"""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": "/api/natal-chart",
+        "query_string": query,
+        "headers": list(headers),
+        "client": (client, 50000),
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    chunks = b"".join(message.get("body", b"") for message in sent[1:])
+    return sent[0]["status"], dict(sent[0]["headers"]), chunks
+
+
+def request(app, *args, **kwargs):
+    return asyncio.run(request_async(app, *args, **kwargs))
+
+
+@pytest.fixture
+def counted_app():
+    echo_app.calls = 0
+    return echo_app
+
+
+def test_empty_bucket_gets_429_with_retry_after(counted_app):
+    app = RateLimitMiddleware(counted_app, TokenBuckets(1.0, 2, 10), None)
+    statuses = [request(app)[0] for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    status, headers, body = request(app)
+    assert headers[b"retry-after"] == b"1"
+    assert b"Too many requests" in body
+    assert counted_app.calls == 2
+
+
+def test_only_configured_api_keys_get_their_own_bucket(counted_app):
+    app = RateLimitMiddleware(
+        counted_app, TokenBuckets(1e-6, 1, 10), None, api_keys=frozenset({"k1"})
+    )
+    assert request(app)[0] == 200
+    # A made-up key is ignored: same address, same empty bucket
+    assert request(app, headers=[(b"x-api-key", b"random")])[0] == 429
+    assert request(app, headers=[(b"x-api-key", b"k1")])[0] == 200
+    assert app.buckets.stats()["clients"] == 2
+
+
+def test_repeated_post_is_replayed(counted_app):
+    app = RateLimitMiddleware(counted_app, None, RecentPosts(2.0))
+    first = request(app, "POST", b'{"a":1}')
+    second = request(app, "POST", b'{"a":1}')
+    other_body = request(app, "POST", b'{"a":2}')
+    other_client = request(app, "POST", b'{"a":1}', client="10.0.0.2")
+    assert counted_app.calls == 3
+    assert second[2] == first[2] == b'{"a":1}'
+    assert second[1][b"x-deduplicated"] == b"1"
+    assert b"x-deduplicated" not in other_body[1]
+    assert b"x-deduplicated" not in other_client[1]
+
+
+def test_stream_requests_are_not_deduplicated(counted_app):
+    app = RateLimitMiddleware(counted_app, None, RecentPosts(2.0))
+    for _ in range(2):
+        request(app, "POST", b"{}", query=b"stream=ndjson")
+    assert counted_app.calls == 2
+
+
+def test_duplicate_of_a_streamed_response_does_not_wait_for_its_end():
+    async def streaming_app(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"a", "more_body": True})
+        await asyncio.sleep(0.2)
+        await send({"type": "http.response.body", "body": b"b"})
+
+    app = RateLimitMiddleware(streaming_app, None, RecentPosts(2.0))
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first = asyncio.create_task(request_async(app, "POST", b"[]"))
+        await asyncio.sleep(0.01)
+        second = await request_async(app, "POST", b"[]")
+        waited = loop.time() - started
+        await first
+        return waited, second
+
+    waited, (status, headers, body) = asyncio.run(scenario())
+    assert waited < 0.3  # its own stream, not 0.2 s of waiting on the first
+    assert b"x-deduplicated" not in headers
+    assert app.recent.stats()["remembered"] == 0
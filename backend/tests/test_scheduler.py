@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from scheduler import LLMOverloaded, LLMScheduler
+
+
+def test_identical_keys_share_one_call():
+    async def scenario():
+        scheduler = LLMScheduler(max_in_flight=2, max_queue=10, max_wait=5)
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "reading"
+
+        results = await asyncio.gather(
+            *(scheduler.run("leo", call) for _ in range(3)),
+            scheduler.run("virgo", call),
+        )
+        return results, calls, scheduler
+
+    results, calls, scheduler = asyncio.run(scenario())
+    assert results == ["reading"] * 4
+    assert calls == 2
+    assert scheduler.coalesced == 2
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_call_cancelled_once_last_waiter_leaves():
+    async def scenario():
+        scheduler = LLMScheduler(max_in_flight=1, max_queue=10, max_wait=5)
+        cancelled = asyncio.Event()
+
+        async def call():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.create_task(scheduler.run("k", call))
+        second = asyncio.create_task(scheduler.run("k", call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        still_running = not cancelled.is_set()
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0)
+        return still_running, scheduler
+
+    still_running, scheduler = asyncio.run(scenario())
+    assert still_running
+    assert scheduler.in_flight == 0
+
+
+def test_caller_after_cancel_starts_a_fresh_call():
+    async def scenario():
+        scheduler = LLMScheduler(max_in_flight=2, max_queue=10, max_wait=5)
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return calls
+
+        first = asyncio.create_task(scheduler.run("k", call))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        # The shared call is cancelled but has not finished unwinding yet
+        await asyncio.sleep(0)
+        return await scheduler.run("k", call)
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_full_queue_is_rejected():
+    async def scenario():
+        scheduler = LLMScheduler(max_in_flight=1, max_queue=1, max_wait=5)
+        release = asyncio.Event()
+
+        async def call():
+            await release.wait()
+            return "done"
+
+        running = asyncio.create_task(scheduler.run("a", call))
+        queued = asyncio.create_task(scheduler.run("b", call))
+        await asyncio.sleep(0.01)
+        with pytest.raises(LLMOverloaded, match="queue full") as refused:
+            await scheduler.run("c", call)
+        release.set()
+        return await asyncio.gather(running, queued), refused.value, scheduler
+
+    results, refused, scheduler = asyncio.run(scenario())
+    assert results == ["done", "done"]
+    assert refused.retry_after >= 1.0
+    assert scheduler.rejected == 1
+
+
+def test_queued_call_gives_up_after_max_wait():
+    async def scenario():
+        scheduler = LLMScheduler(max_in_flight=1, max_queue=5, max_wait=0.05)
+
+        async def slow():
+            await asyncio.sleep(0.5)
+
+        running = asyncio.create_task(scheduler.run("a", slow))
+        await asyncio.sleep(0.01)
+        with pytest.raises(LLMOverloaded, match="waited"):
+            await scheduler.run("b", slow)
+        depth = scheduler.stats()["queue_depth"]
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+        return depth
+
+    assert asyncio.run(scenario()) == 0
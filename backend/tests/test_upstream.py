@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import pytest
+
+from upstream import (
+    HEDGE_MIN_SAMPLES,
+    CircuitBreaker,
+    CircuitOpen,
+    Upstream,
+    UpstreamHTTPError,
+    is_transient,
+)
+
+
+def failing(status: int, times: int, result="reading"):
+    """attempt() raising UpstreamHTTPError(status) times, then succeeding"""
+    attempts = 0
+
+    async def attempt():
+        nonlocal attempts
+        attempts += 1
+        if attempts <= times:
+            raise UpstreamHTTPError(status, "upstream", None)
+        return result
+
+    return attempt
+
+
+def test_transient_errors():
+    assert is_transient(UpstreamHTTPError(503, "", None))
+    assert is_transient(UpstreamHTTPError(429, "", None))
+    assert is_transient(TimeoutError())
+    assert not is_transient(UpstreamHTTPError(400, "", None))
+    assert not is_transient(ValueError())
+
+
+def test_breaker_opens_after_threshold_and_refuses():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+    for _ in range(2):
+        breaker.failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open"
+    assert breaker.opens == 1
+    assert not breaker.allow()
+    assert breaker.refused == 1
+    assert breaker.retry_after() > 59
+
+
+def test_breaker_half_open_admits_one_probe():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.02)
+    breaker.failure()
+    time.sleep(0.03)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+    assert breaker.allow()
+
+
+def test_breaker_reopens_when_probe_fails():
+    breaker = CircuitBreaker(failure_threshold=5, cooldown=0.02)
+    for _ in range(5):
+        breaker.failure()
+    time.sleep(0.03)
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open"
+    assert breaker.opens == 2
+
+
+def test_breaker_abandoned_probe_frees_the_slot():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.02)
+    breaker.failure()
+    time.sleep(0.03)
+    assert breaker.allow()
+    breaker.abandon()
+    assert breaker.allow()
+
+
+def test_retries_transient_errors_until_success():
+    upstream = Upstream(3, 0.001, False, CircuitBreaker(10, 60))
+    result = asyncio.run(upstream.call(failing(503, 2), timeout=5))
+    assert result == "reading"
+    assert upstream.attempts == 3
+    assert upstream.retries == 2
+    assert upstream.breaker.state == "closed"
+
+
+def test_bad_request_is_not_retried():
+    upstream = Upstream(3, 0.001, False, CircuitBreaker(10, 60))
+    with pytest.raises(UpstreamHTTPError):
+        asyncio.run(upstream.call(failing(400, 5), timeout=5))
+    assert upstream.attempts == 1
+    assert upstream.breaker.failures == 0
+
+
+def test_open_circuit_refuses_calls():
+    upstream = Upstream(5, 0.001, False, CircuitBreaker(2, 60))
+    with pytest.raises(UpstreamHTTPError):
+        asyncio.run(upstream.call(failing(503, 10), timeout=5))
+    assert upstream.breaker.state == "open"
+    assert upstream.attempts == 2
+    with pytest.raises(CircuitOpen):
+        asyncio.run(upstream.call(failing(503, 0), timeout=5))
+    assert upstream.attempts == 2
+
+
+def test_call_timeout_includes_retries():
+    upstream = Upstream(10, 0.001, False, CircuitBreaker(100, 60))
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    start = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(upstream.call(hang, timeout=0.05))
+    assert time.perf_counter() - start < 0.5
+
+
+def test_slow_call_is_hedged_and_second_attempt_wins():
+    async def scenario():
+        upstream = Upstream(0, 0.001, True, CircuitBreaker(10, 60))
+
+        async def quick():
+            return "warmup"
+
+        for _ in range(HEDGE_MIN_SAMPLES):
+            await upstream.call(quick, timeout=1)
+        assert upstream.hedge_delay() is not None
+
+        attempts = 0
+
+        async def first_slow():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                await asyncio.sleep(1)
+                return "slow"
+            return "hedge"
+
+        return await upstream.call(first_slow, timeout=2), upstream
+
+    result, upstream = asyncio.run(scenario())
+    assert result == "hedge"
+    assert upstream.hedges == 1
+    assert upstream.hedge_wins == 1
+
+
+def test_no_hedging_until_enough_samples():
+    upstream = Upstream(0, 0.001, True, CircuitBreaker(10, 60))
+    assert upstream.hedge_delay() is None
@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+import ephemeris
+import zodiac
+
+# Leap years across the supported range, so every one of the 366 days
+# is checked
+YEARS = (1804, 1948, 2000, 2024, 2096)
+# The extremes of local time: earliest and latest UT for a calendar day
+MOMENTS = (("00:00", "+14:00"), ("23:59", "-12:00"), ("unknown", "+00:00"))
+
+
+def days_of(year: int) -> list[str]:
+    first = date(year, 1, 1)
+    return [(first + timedelta(days=i)).isoformat() for i in range(366)]
+
+
+@pytest.mark.parametrize("year", YEARS)
+@pytest.mark.parametrize("birth_time, offset", MOMENTS)
+def test_sun_sign_matches_ephemeris_every_day(year, birth_time, offset):
+    days = days_of(year)
+    jds = [ephemeris.julian_day(day, birth_time, offset) for day in days]
+    suns = ephemeris.body_longitudes(np.array(jds))[:, 0]
+    expected = [zodiac.SIGNS[int(sun // 30) % 12] for sun in suns]
+    found = [zodiac.sun_sign(day, birth_time, offset)["sign"] for day in days]
+    wrong = [day for day, e, f in zip(days, expected, found) if e != f]
+    assert wrong == []
+
+
+def test_cusp_days_say_which_signs():
+    result = zodiac.sun_sign("2000-03-20")
+    assert result["method"] == "ephemeris"
+    assert result["cusp"] == "Pisces-Aries"
+    assert zodiac.sun_sign("2000-08-05") == {
+        "sign": "Leo",
+        "cusp": None,
+        "method": "table",
+    }
+
+
+@pytest.mark.parametrize(
+    "value, parsed",
+    [
+        ("12:30", "12:30"),
+        ("9:05", "09:05"),
+        (" 23:59 ", "23:59"),
+        ("07:45:30", "07:45"),
+        ("", "unknown"),
+        ("Unknown", "unknown"),
+    ],
+)
+def test_birth_times(value, parsed):
+    assert zodiac.parse_birth_time(value) == parsed
+
+
+@pytest.mark.parametrize(
+    "value", ["12:305", "12:3099", "12:5", "24:00", "12:60", "1230", "12:30:60"]
+)
+def test_malformed_birth_times_are_rejected(value):
+    with pytest.raises(ValueError, match="Invalid time"):
+        zodiac.parse_birth_time(value)
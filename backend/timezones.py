@@ -0,0 +1,108 @@
+"""
+AstralSage - Birth timezones
+The UTC offset in force at a local birth time, from the tz database
+(zoneinfo): daylight saving and each zone's past rule changes included,
+e.g. +01:00 for a 1968 birth in London (British Standard Time).
+
+A zone's offsets over one calendar year are worked out once and kept in
+an LRU cache, as the local times at which they change. Resolving a
+birth is then one bisect into a handful of boundaries, whatever the
+zone. Local times that happen twice (clocks set back) are "ambiguous"
+and get the earlier moment; times that never happen (clocks set
+forward) are "nonexistent" and get the offset from before the change.
+"""
+
+import bisect
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# (zone, year) offset tables kept; each is a few integers
+TABLE_CACHE_SIZE = 4096
+
+# Offset changes are looked for at this spacing, then pinned to the second
+_SCAN_SECONDS = 6 * 3600
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_DAY = 86400
+
+
+class LocalTime(NamedTuple):
+    offset: int  # seconds east of UTC
+    status: str  # "unique", "ambiguous" or "nonexistent"
+
+
+@lru_cache(maxsize=1024)
+def zone(name: str) -> Optional[ZoneInfo]:
+    """The tz database zone for an IANA name; None if there is none"""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError, OSError):
+        return None
+
+
+def _offset_at(tz: ZoneInfo, timestamp: int) -> int:
+    return int(datetime.fromtimestamp(timestamp, tz).utcoffset().total_seconds())
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def year_table(name: str, year: int) -> tuple[list[int], list[LocalTime]]:
+    """A zone's local-time intervals over a year: start of each interval
+    in seconds from local midnight on January 1, and what applies in it"""
+    tz = zone(name)
+    if tz is None:
+        raise ValueError(f"Unknown timezone {name!r}")
+    # Local seconds = UTC timestamp + offset - origin
+    origin = int((datetime(year, 1, 1, tzinfo=timezone.utc) - _EPOCH).total_seconds())
+    end = origin + (date(year + 1, 1, 1) - date(year, 1, 1)).days * _DAY + _DAY
+    moment = origin - _DAY
+    before = _offset_at(tz, moment)
+    starts, spans = [-2 * _DAY], [LocalTime(before, "unique")]
+    while moment < end:
+        step = moment + _SCAN_SECONDS
+        after = _offset_at(tz, step)
+        if after != before:
+            low, high = moment, step
+            while high - low > 1:
+                middle = (low + high) // 2
+                if _offset_at(tz, middle) == before:
+                    low = middle
+                else:
+                    high = middle
+            # Wall clocks jump from high + before to high + after
+            early, late = sorted((high + before - origin, high + after - origin))
+            status = "nonexistent" if after > before else "ambiguous"
+            starts += [early, late]
+            spans += [LocalTime(before, status), LocalTime(after, "unique")]
+            before = after
+        moment = step
+    return starts, spans
+
+
+def local_offset(name: str, day: date, hour: int = 12, minute: int = 0) -> LocalTime:
+    """Offset and status of a local date and time in zone name"""
+    starts, spans = year_table(name, day.year)
+    seconds = (day.toordinal() - date(day.year, 1, 1).toordinal()) * _DAY
+    seconds += hour * 3600 + minute * 60
+    return spans[bisect.bisect_right(starts, seconds) - 1]
+
+
+def format_offset(seconds: int) -> str:
+    """The offset as "+05:30", to the nearest minute (local mean times,
+    used before standard time, have seconds)"""
+    minutes = round(seconds / 60)
+    sign = "-" if minutes < 0 else "+"
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+def stats() -> dict:
+    info = year_table.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
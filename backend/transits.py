@@ -0,0 +1,233 @@
+"""
+AstralSage - Transit engine
+Daily forecasts from the aspects today's planets make to a natal chart.
+
+The sky for a forecast window (one position row per day, at noon UT) is
+the same for every user, so it is computed once per window and shared;
+a user's forecast only compares those rows with their ten natal
+longitudes. transit_hits() does that for any number of users at once.
+sign_sky() reads one day's sky from a sun sign instead of a chart, for
+the per-sign daily summaries.
+"""
+
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+
+import ephemeris
+from ephemeris import ASPECTS, BODIES, SIGNS
+
+RANGE_DAYS = {"today": 1, "3-day": 3, "7-day": 7}
+
+# Transits are only reported this close to exact (degrees, any aspect)
+TRANSIT_ORB = 3.0
+
+# Strongest transits listed per day
+MAX_TRANSITS_PER_DAY = 5
+
+# Bodies each focus cares about; a transit touching one counts double
+FOCUS_BODIES = {
+    "career": frozenset(("Sun", "Mercury", "Mars", "Jupiter", "Saturn")),
+    "love": frozenset(("Sun", "Moon", "Venus", "Mars")),
+    "health": frozenset(("Sun", "Moon", "Mars", "Saturn")),
+    "general": frozenset(BODIES),
+}
+
+# Slow movers shape a period more than the fast Moon does
+BODY_WEIGHTS = np.array([1.0, 0.5, 0.8, 0.8, 1.0, 1.2, 1.3, 1.1, 1.0, 1.0])
+
+# +1 flowing, -1 tense, 0 depends on the planets involved
+ASPECT_TONES = np.array([0, 1, -1, 1, -1])
+
+# Sky windows kept in memory (a few ranges for today and tomorrow)
+MAX_WINDOWS = 16
+
+_ASPECT_NAMES = tuple(a[0] for a in ASPECTS)
+_FOCUS_MASKS = {
+    focus: np.array([body in bodies for body in BODIES])
+    for focus, bodies in FOCUS_BODIES.items()
+}
+_ASPECT_ANGLES = np.array([a[1] for a in ASPECTS])
+
+# Nearest aspect for each whole degree of separation 0-180. Aspect angles
+# are at least 30 degrees apart, so rounding never picks the wrong one
+# within TRANSIT_ORB
+_NEAREST_ASPECT = np.argmin(
+    np.abs(np.arange(181)[:, None] - _ASPECT_ANGLES[None, :]), axis=1
+)
+
+# Whole-sign aspect (index into ASPECTS, -1 = none) by distance in signs
+_SIGN_ASPECTS = np.array([0, -1, 1, 2, 3, -1, 4, -1, 3, 2, 1, -1])
+
+_windows: OrderedDict = OrderedDict()
+
+
+class SkyWindow:
+    """Positions for consecutive days from start, with per-day labels"""
+
+    __slots__ = ("longitudes", "retrograde", "dates", "retrograde_names")
+
+    def __init__(self, start: date, days: int):
+        noon = ephemeris.julian_day(start.isoformat())
+        self.longitudes, self.retrograde = ephemeris.positions_and_motion(
+            noon + np.arange(days)
+        )
+        self.dates = [(start + timedelta(days=d)).isoformat() for d in range(days)]
+        self.retrograde_names = [
+            [BODIES[k] for k in np.flatnonzero(row).tolist()] for row in self.retrograde
+        ]
+
+
+def sky_window(start: date, days: int) -> SkyWindow:
+    """The sky for days from start, computed on first use and then shared
+    by every forecast for that window"""
+    key = (start, days)
+    window = _windows.get(key)
+    if window is None:
+        window = _windows[key] = SkyWindow(start, days)
+        while len(_windows) > MAX_WINDOWS:
+            _windows.popitem(last=False)
+    return window
+
+
+def natal_longitudes(
+    birth_date: str, birth_time: str = "unknown", birth_timezone: str = "+00:00"
+) -> np.ndarray:
+    """The ten natal longitudes of one birth, shape (10,)"""
+    jd = ephemeris.julian_day(birth_date, birth_time, birth_timezone)
+    return ephemeris.body_longitudes(jd)[0]
+
+
+def transit_hits(
+    natal: np.ndarray, sky: np.ndarray, orb: float = TRANSIT_ORB
+) -> tuple[np.ndarray, np.ndarray]:
+    """Aspects from every sky row to every natal chart.
+
+    natal is (users, 10) and sky is (days, 10), longitudes in [0, 360).
+    Returns the aspect index (-1 = none) and orb, each (users, days,
+    transiting body, natal body).
+    """
+    # In place on one buffer: these arrays get large for batches of users
+    sep = sky[None, :, :, None] - natal[:, None, None, :]
+    np.abs(sep, out=sep)
+    np.minimum(sep, 360.0 - sep, out=sep)
+    nearest = _NEAREST_ASPECT[np.rint(sep).astype(np.intp)]
+    orbs = sep
+    orbs -= _ASPECT_ANGLES[nearest]
+    np.abs(orbs, out=orbs)
+    return np.where(orbs <= orb, nearest, -1), orbs
+
+
+def forecast(
+    natal: np.ndarray, start: date, range_: str, focus: str = "general"
+) -> list[dict]:
+    """Per-day transits to one natal chart, strongest first"""
+    days = RANGE_DAYS[range_]
+    sky = sky_window(start, days)
+    aspect, orbs = transit_hits(natal[None, :], sky.longitudes)
+    aspect, orbs = aspect[0], orbs[0]
+
+    # Tighter orbs, slower planets and focus bodies weigh more
+    relevant = _FOCUS_MASKS[focus]
+    weights = (
+        (1.0 - orbs / TRANSIT_ORB)
+        * BODY_WEIGHTS[None, :, None]
+        * (1.0 + (relevant[None, :, None] | relevant[None, None, :]))
+    )
+    found = aspect >= 0
+    tones = ASPECT_TONES[np.maximum(aspect, 0)]
+    scores = np.round(np.where(found, weights * tones, 0.0).sum(axis=(1, 2)), 2)
+
+    # All hits at once, ordered by day and then by weight
+    day, body, natal_body = np.nonzero(found)
+    order = np.lexsort((-weights[day, body, natal_body], day))
+    day, body, natal_body = day[order], body[order], natal_body[order]
+    hit_aspects = aspect[day, body, natal_body].tolist()
+    hit_orbs = np.round(orbs[day, body, natal_body], 1).tolist()
+
+    per_day: list[list] = [[] for _ in range(days)]
+    for d, t, n, a, orb in zip(
+        day.tolist(), body.tolist(), natal_body.tolist(), hit_aspects, hit_orbs
+    ):
+        listed = per_day[d]
+        if len(listed) < MAX_TRANSITS_PER_DAY:
+            listed.append(
+                {
+                    "transit": BODIES[t],
+                    "aspect": _ASPECT_NAMES[a],
+                    "natal": BODIES[n],
+                    "orb": orb,
+                }
+            )
+
+    return [
+        {
+            "date": sky.dates[d],
+            "tone": (
+                "supportive"
+                if score > 0.5
+                else "challenging" if score < -0.5 else "mixed"
+            ),
+            "score": score,
+            "transits": per_day[d],
+            "retrograde": list(sky.retrograde_names[d]),
+        }
+        for d, score in enumerate(scores.tolist())
+    ]
+
+
+def transit_analysis(
+    birth_date: str,
+    birth_time: str,
+    birth_timezone: str,
+    start: date,
+    range_: str,
+    focus: str,
+    sun: Optional[dict] = None,
+) -> dict:
+    """The analysis block of a transit forecast reading"""
+    natal = natal_longitudes(birth_date, birth_time, birth_timezone)
+    days = forecast(natal, start, range_, focus)
+    analysis = {
+        "sun_sign": sun["sign"] if sun else ephemeris.sign_of(natal[0]),
+        "range": range_,
+        "focus": focus,
+        "start": days[0]["date"],
+        "end": days[-1]["date"],
+        "days": days,
+    }
+    if sun and sun["cusp"]:
+        analysis["cusp"] = sun["cusp"]
+    return analysis
+
+
+def sign_sky(sign: str, day: date) -> dict:
+    """The day's sky seen from one sun sign: the whole-sign aspect each
+    planet makes to it, with the same tone and score as a forecast day"""
+    sky = sky_window(day, 1)
+    planet_signs = (sky.longitudes[0] // 30).astype(np.intp)
+    aspect = _SIGN_ASPECTS[(planet_signs - SIGNS.index(sign)) % 12]
+    found = aspect >= 0
+    score = round(float((BODY_WEIGHTS * ASPECT_TONES[aspect] * found).sum()), 2)
+    # Slow planets first: they set the tone for longer
+    order = np.argsort(-BODY_WEIGHTS, kind="stable")
+    return {
+        "sign": sign,
+        "date": sky.dates[0],
+        "tone": (
+            "supportive" if score > 0.5 else "challenging" if score < -0.5 else "mixed"
+        ),
+        "score": score,
+        "transits": [
+            {
+                "transit": BODIES[b],
+                "in": SIGNS[planet_signs[b]],
+                "aspect": _ASPECT_NAMES[aspect[b]],
+            }
+            for b in order.tolist()
+            if found[b]
+        ],
+        "retrograde": list(sky.retrograde_names[0]),
+    }
@@ -0,0 +1,269 @@
+"""
+AstralSage - Upstream resilience
+What happens when LLM calls misbehave. Upstream wraps calls to any model
+(Gemini over REST or the SDK, or the fake one) with bounded
+exponential-backoff retries for transient failures, an optional hedged
+second request once a call runs past the recent p95 latency, and a
+circuit breaker that refuses calls outright while the upstream keeps
+failing.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+# HTTP statuses worth retrying: timeouts, rate limits and server errors
+RETRYABLE_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+
+# httpx network errors and google.api_core exceptions for the same
+# conditions, matched by name so neither library is imported here
+RETRYABLE_ERROR_NAMES = frozenset(
+    (
+        "TransportError",
+        "DeadlineExceeded",
+        "GatewayTimeout",
+        "InternalServerError",
+        "ResourceExhausted",
+        "ServiceUnavailable",
+        "TooManyRequests",
+    )
+)
+
+# Retry backoff never waits longer than this between attempts
+MAX_BACKOFF_SECONDS = 4.0
+
+# Hedging starts once this many call latencies have been seen, and never
+# sooner than HEDGE_MIN_DELAY_SECONDS into a call
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY_SECONDS = 0.05
+LATENCY_WINDOW = 256
+
+
+class UpstreamHTTPError(Exception):
+    """The model API answered with an error status"""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float]):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpen(Exception):
+    """The upstream is failing, so the call was not attempted"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"circuit open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether trying the same call again may succeed"""
+    if isinstance(error, UpstreamHTTPError):
+        return error.status in RETRYABLE_STATUSES
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    names = {cls.__name__ for cls in type(error).__mro__}
+    # FakeLLMError stands in for an upstream outage in load tests
+    return bool(names & RETRYABLE_ERROR_NAMES) or "FakeLLMError" in names
+
+
+class CircuitBreaker:
+    """Closed until failure_threshold failures in a row, then open (every
+    call refused) for cooldown seconds, then half-open: one probe call
+    decides whether to close again or reopen"""
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opens = 0
+        self.refused = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def retry_after(self) -> float:
+        return max(self._opened_at + self.cooldown - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; half-open admits one probe"""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and self.retry_after() == 0:
+            self.state = "half_open"
+        if self.state == "open" or self._probing:
+            self.refused += 1
+            return False
+        self._probing = True
+        return True
+
+    def success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opens += 1
+                print(f"⚠️ LLM circuit open after {self.failures} failures")
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+    def abandon(self):
+        """The call ended without an outcome (e.g. it was cancelled)"""
+        self._probing = False
+
+
+class Upstream:
+    """Retries, hedging and circuit breaking around model calls"""
+
+    def __init__(
+        self,
+        max_retries: int,
+        backoff: float,
+        hedge: bool,
+        breaker: CircuitBreaker,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge = hedge
+        self.breaker = breaker
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def check(self):
+        """Raise CircuitOpen right away while the upstream is failing"""
+        if self.breaker.state == "open" and self.breaker.retry_after() > 0:
+            self.breaker.refused += 1
+            raise CircuitOpen(self.breaker.retry_after())
+
+    def hedge_delay(self) -> Optional[float]:
+        """The recent p95 latency, or None while there is too little data"""
+        if not self.hedge or len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        p95 = ordered[min(int(len(ordered) * HEDGE_QUANTILE), len(ordered) - 1)]
+        return max(p95, HEDGE_MIN_DELAY_SECONDS)
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        # Full jitter, so retries from many requests do not line up
+        wait = random.uniform(0, min(self.backoff * 2**attempt, MAX_BACKOFF_SECONDS))
+        return max(wait, getattr(error, "retry_after", None) or 0.0)
+
+    async def _timed(self, attempt: Callable[[], Awaitable]):
+        self.attempts += 1
+        start = time.perf_counter()
+        result = await attempt()
+        self._latencies.append(time.perf_counter() - start)
+        return result
+
+    async def _hedged(self, attempt: Callable[[], Awaitable], hedge: bool):
+        """One attempt, plus a second one if the first runs past p95;
+        whichever succeeds first wins"""
+        delay = self.hedge_delay() if hedge else None
+        first = asyncio.ensure_future(self._timed(attempt))
+        if delay is None:
+            return await first
+
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.hedges += 1
+                pending.add(asyncio.ensure_future(self._timed(attempt)))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(
+        self, attempt: Callable[[], Awaitable], timeout: float, hedge: bool = True
+    ):
+        """Run attempt() until it succeeds, a non-transient error occurs,
+        the retries or the timeout run out, or the breaker opens.
+
+        Timeouts count as failures; the whole call, backoff included,
+        finishes within timeout seconds (else asyncio.TimeoutError).
+        """
+        self.check()
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        outcome = False
+        try:
+            for tries in range(self.max_retries + 1):
+                if not self.breaker.allow():
+                    raise CircuitOpen(self.breaker.retry_after())
+                # No hedging while probing a half-open circuit
+                hedged = hedge and self.breaker.state == "closed"
+                try:
+                    result = await asyncio.wait_for(
+                        self._hedged(attempt, hedged), deadline - loop.time()
+                    )
+                except Exception as e:
+                    outcome = True
+                    if not is_transient(e):
+                        # The upstream answered; the request itself is bad
+                        self.breaker.success()
+                        raise
+                    self.breaker.failure()
+                    wait = self._backoff(tries, e)
+                    if (
+                        tries == self.max_retries
+                        or self.breaker.state == "open"
+                        or loop.time() + wait >= deadline
+                    ):
+                        raise
+                    self.retries += 1
+                    await asyncio.sleep(wait)
+                    continue
+                outcome = True
+                self.breaker.success()
+                return result
+        finally:
+            if not outcome:
+                self.breaker.abandon()
+
+    async def open_stream(
+        self, attempt: Callable[[], Awaitable[AsyncIterator]], timeout: float
+    ) -> AsyncIterator:
+        """Start a streamed call with retries; chunks already sent to the
+        client cannot be replayed, so only opening the stream is retried"""
+        return await self.call(attempt, timeout, hedge=False)
+
+    def stats(self) -> dict:
+        delay = self.hedge_delay()
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "circuit_opens": self.breaker.opens,
+            "circuit_refused": self.breaker.refused,
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay_ms": None if delay is None else round(delay * 1000, 1),
+        }
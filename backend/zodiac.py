@@ -0,0 +1,203 @@
+"""
+AstralSage - Zodiac lookups
+Sign names, rulers and elements, plus a precomputed day-of-year table
+for sun signs. Dates on a cusp (where the Sun changes sign from year to
+year) are resolved with the ephemeris when the birth year is known.
+"""
+
+import re
+from datetime import date, timedelta
+from typing import Optional
+
+SIGNS = (
+    "Aries",
+    "Taurus",
+    "Gemini",
+    "Cancer",
+    "Leo",
+    "Virgo",
+    "Libra",
+    "Scorpio",
+    "Sagittarius",
+    "Capricorn",
+    "Aquarius",
+    "Pisces",
+)
+
+# Modern rulers and classical elements, indexed like SIGNS
+RULERS = (
+    "Mars",
+    "Venus",
+    "Mercury",
+    "Moon",
+    "Sun",
+    "Mercury",
+    "Venus",
+    "Pluto",
+    "Jupiter",
+    "Saturn",
+    "Uranus",
+    "Neptune",
+)
+ELEMENTS = ("Fire", "Earth", "Air", "Water") * 3
+
+# Conventional first day (month, day) of each sign, in SIGNS order
+_SIGN_STARTS = (
+    (3, 21),
+    (4, 20),
+    (5, 21),
+    (6, 21),
+    (7, 23),
+    (8, 23),
+    (9, 23),
+    (10, 23),
+    (11, 22),
+    (12, 22),
+    (1, 20),
+    (2, 19),
+)
+
+_SIGN_INDEX = {sign.lower(): i for i, sign in enumerate(SIGNS)}
+
+# Day-of-year offsets for a leap year, so Feb 29 has its own slot
+_MONTH_OFFSETS = (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+
+MIN_YEAR = 1800
+MAX_YEAR = 2100
+
+# Over 1800-2100 and all UTC offsets, the Sun changes sign up to two days
+# either side of the conventional start date
+CUSP_DAYS = 2
+
+
+def _day_index(month: int, day: int) -> int:
+    return _MONTH_OFFSETS[month - 1] + day - 1
+
+
+def _build_tables() -> tuple[bytes, bytes]:
+    """Sign index per day of year, and per day 0 or 1 + the sign starting
+    at a nearby cusp"""
+    signs = bytearray(366)
+    starts = sorted((_day_index(m, d), i) for i, (m, d) in enumerate(_SIGN_STARTS))
+    current = starts[-1][1]  # Capricorn carries over from December
+    boundaries = dict(starts)
+    for day in range(366):
+        current = boundaries.get(day, current)
+        signs[day] = current
+
+    # The ingress day drifts between years and timezones, so days near a
+    # sign change can belong to either sign
+    cusps = bytearray(366)
+    for start, sign in starts:
+        for day in range(start - CUSP_DAYS, start + CUSP_DAYS + 1):
+            cusps[day % 366] = 1 + sign
+    return bytes(signs), bytes(cusps)
+
+
+_DAY_SIGN, _DAY_CUSP = _build_tables()
+
+
+# H:MM or HH:MM, optionally with :SS
+_BIRTH_TIME = re.compile(
+    r"(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?", re.ASCII
+)
+
+
+def parse_birth_date(value: str) -> date:
+    """Parse and validate a YYYY-MM-DD birth date"""
+    try:
+        parsed = date.fromisoformat(value.strip())
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid date {value!r}: expected YYYY-MM-DD")
+    if not MIN_YEAR <= parsed.year <= MAX_YEAR:
+        raise ValueError(f"Birth year must be between {MIN_YEAR} and {MAX_YEAR}")
+    return parsed
+
+
+def parse_birth_time(value: str) -> str:
+    """Validate an H:MM or HH:MM birth time (seconds are accepted and
+    dropped); empty or 'unknown' becomes 'unknown'"""
+    text = (value or "").strip().lower()
+    if text in ("", "unknown"):
+        return "unknown"
+    match = _BIRTH_TIME.fullmatch(text)
+    if (
+        not match
+        or int(match["hour"]) > 23
+        or int(match["minute"]) > 59
+        or int(match["second"] or 0) > 59
+    ):
+        raise ValueError(f"Invalid time {value!r}: expected HH:MM or 'unknown'")
+    return f"{int(match['hour']):02d}:{match['minute']}"
+
+
+def parse_utc_offset(offset: str) -> timedelta:
+    """Parse '+05:30' / '-0400' / 'Z' style offsets"""
+    text = offset.strip().upper()
+    if text in ("Z", "UTC", "GMT", ""):
+        return timedelta(0)
+    sign = -1 if text[0] == "-" else 1
+    digits = text.lstrip("+-").replace(":", "")
+    if not digits.isdigit() or len(digits) not in (2, 4):
+        raise ValueError(f"Invalid UTC offset: {offset!r}")
+    hours, minutes = int(digits[:2]), int(digits[2:] or 0)
+    if hours > 14 or minutes >= 60:
+        raise ValueError(f"Invalid UTC offset: {offset!r}")
+    return sign * timedelta(hours=hours, minutes=minutes)
+
+
+def normalize_sign(name: str) -> str:
+    """Canonical sign name for case-insensitive input"""
+    index = _SIGN_INDEX.get(name.strip().lower())
+    if index is None:
+        raise ValueError(f"Unknown zodiac sign {name!r}")
+    return SIGNS[index]
+
+
+def table_sun_sign(month: int, day: int) -> str:
+    """Conventional sun sign for a calendar day (no year needed)"""
+    return SIGNS[_DAY_SIGN[_day_index(month, day)]]
+
+
+def is_cusp(month: int, day: int) -> bool:
+    return bool(_DAY_CUSP[_day_index(month, day)])
+
+
+def sun_sign(
+    birth_date: str,
+    birth_time: str = "unknown",
+    birth_timezone: str = "+00:00",
+) -> dict:
+    """Sun sign for a birth, with cusp days resolved by the ephemeris.
+
+    Returns {"sign", "cusp", "method"} where cusp names the neighbouring
+    signs ("Aries-Taurus") on cusp days and method is "table" or
+    "ephemeris".
+    """
+    born = parse_birth_date(birth_date)
+    index = _day_index(born.month, born.day)
+    cusp = _DAY_CUSP[index]
+    if not cusp:
+        return {"sign": SIGNS[_DAY_SIGN[index]], "cusp": None, "method": "table"}
+
+    # Deferred so plain table lookups never pay for importing NumPy
+    import ephemeris
+
+    jd = ephemeris.julian_day(birth_date, birth_time, birth_timezone)
+    sun = float(ephemeris.body_longitudes(jd)[0, 0])
+    resolved = int(sun // 30) % 12
+    after = cusp - 1
+    return {
+        "sign": SIGNS[resolved],
+        "cusp": f"{SIGNS[after - 1]}-{SIGNS[after]}",
+        "method": "ephemeris",
+    }
+
+
+def element_of(sign: str) -> str:
+    return ELEMENTS[_SIGN_INDEX[sign.lower()]]
+
+
+def ruler_of(sign: str, default: Optional[str] = None) -> Optional[str]:
+    index = _SIGN_INDEX.get(sign.lower())
+    return RULERS[index] if index is not None else default
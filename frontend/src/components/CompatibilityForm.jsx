@@ -1,5 +1,5 @@
 import { useState } from 'react'
-import axios from 'axios'
+import { streamReading } from '../streamReading'
 
 export default function CompatibilityForm({ onResult, onError, onLoading }) {
   const [personA, setPersonA] = useState({
@@ -32,7 +32,7 @@ export default function CompatibilityForm({ onResult, onError, onLoading }) {
 
     onLoading(true)
     try {
-      const response = await axios.post('/api/compatibility', {
+      await streamReading('/api/compatibility', {
         person_a_name: personA.name || 'Person A',
         person_a_birth_date: personA.birth_date,
         person_a_birth_time: personA.birth_time || 'unknown',
@@ -48,10 +48,12 @@ export default function CompatibilityForm({ onResult, onError, onLoading }) {
           country: personB.birth_country || 'Unknown'
         },
         focus: focus
-      })
-      onResult(response.data)
+      }, (partial) => {
+        onResult(partial)
+        onLoading(false)
+      }, 'Failed to check compatibility. Please try again.')
     } catch (err) {
-      onError(err.response?.data?.detail || 'Failed to check compatibility. Please try again.')
+      onError(err.message || 'Failed to check compatibility. Please try again.')
     } finally {
       onLoading(false)
     }
@@ -1,5 +1,6 @@
 import { useState } from 'react'
-import axios from 'axios'
+import { streamReading } from '../streamReading'
+import { usePlaceSuggestions } from '../placeSuggestions'
 
 export default function NatalChartForm({ onResult, onError, onLoading }) {
   const [formData, setFormData] = useState({
@@ -10,9 +11,25 @@ export default function NatalChartForm({ onResult, onError, onLoading }) {
     birth_country: '',
     tone: 'friendly'
   })
+  // Coordinates and timezone of the suggestion picked for the birth city
+  const [location, setLocation] = useState(null)
+  const places = usePlaceSuggestions(formData.birth_city)
 
   const handleChange = (e) => {
     setFormData({ ...formData, [e.target.name]: e.target.value })
+    if (e.target.name === 'birth_city' || e.target.name === 'birth_country') {
+      setLocation(null)
+    }
+  }
+
+  const handleCityChange = (e) => {
+    const place = places.find((p) => p.label === e.target.value)
+    if (!place) {
+      handleChange(e)
+      return
+    }
+    setFormData({ ...formData, birth_city: place.city, birth_country: place.country })
+    setLocation({ lat: place.lat, lon: place.lon, timezone: place.timezone })
   }
 
   const handleSubmit = async (e) => {
@@ -29,20 +46,24 @@ export default function NatalChartForm({ onResult, onError, onLoading }) {
 
     onLoading(true)
     try {
-      const response = await axios.post('/api/natal-chart', {
+      await streamReading('/api/natal-chart', {
         name: formData.name || 'Friend',
         birth_date: formData.birth_date,
         birth_time: formData.birth_time || 'unknown',
-        birth_timezone: '+05:30',
+        birth_timezone: 'auto',
         birth_place: {
           city: formData.birth_city,
-          country: formData.birth_country
+          country: formData.birth_country,
+          ...location
         },
         tone: formData.tone
-      })
-      onResult(response.data)
+      }, (partial) => {
+        // Show the chart summary as soon as it arrives; sections stream in after
+        onResult(partial)
+        onLoading(false)
+      }, 'Failed to generate chart. Please try again.')
     } catch (err) {
-      onError(err.response?.data?.detail || 'Failed to generate chart. Please try again.')
+      onError(err.message || 'Failed to generate chart. Please try again.')
     } finally {
       onLoading(false)
     }
@@ -106,13 +127,20 @@ export default function NatalChartForm({ onResult, onError, onLoading }) {
               type="text"
               name="birth_city"
               value={formData.birth_city}
-              onChange={handleChange}
+              onChange={handleCityChange}
               placeholder="e.g., Chennai"
+              list="birth-city-suggestions"
+              autoComplete="off"
               required
               className="w-full px-4 py-2 bg-white/10 border border-white/20 rounded-lg 
                 focus:border-star-gold focus:outline-none focus:ring-1 focus:ring-star-gold
                 placeholder-gray-500"
             />
+            <datalist id="birth-city-suggestions">
+              {places.map((p) => (
+                <option key={p.label} value={p.label} />
+              ))}
+            </datalist>
           </div>
           <div>
             <label className="block text-sm font-medium mb-1">Country *</label>
@@ -29,9 +29,9 @@ export default function QuickHoroscopeForm({ onResult, onError, onLoading }) {
 
     onLoading(true)
     try {
-      const response = await axios.post('/api/quick-horoscope', {
-        sign: selectedSign,
-        period: period
+      // GET, so the browser and any CDN can reuse the day's reading
+      const response = await axios.get('/api/quick-horoscope', {
+        params: { sign: selectedSign, period }
       })
       onResult(response.data)
     } catch (err) {
@@ -14,21 +14,23 @@ export default function ResultDisplay({ result }) {
 
   return (
     <div className="mt-8 space-y-6 animate-fadeIn">
-      {/* Confidence Badge */}
-      <div className="flex justify-center">
-        <div className="inline-flex items-center gap-2 px-4 py-2 bg-white/10 rounded-full border border-white/20">
-          <span className="text-sm text-gray-300">Confidence:</span>
-          <div className="flex items-center gap-1">
-            <div className="w-24 h-2 bg-white/20 rounded-full overflow-hidden">
-              <div 
-                className="h-full bg-gradient-to-r from-star-gold to-yellow-300 rounded-full transition-all duration-1000"
-                style={{ width: `${(confidence_score || 0.8) * 100}%` }}
-              />
+      {/* Confidence Badge (arrives last when the reading is streamed) */}
+      {confidence_score !== undefined && (
+        <div className="flex justify-center">
+          <div className="inline-flex items-center gap-2 px-4 py-2 bg-white/10 rounded-full border border-white/20">
+            <span className="text-sm text-gray-300">Confidence:</span>
+            <div className="flex items-center gap-1">
+              <div className="w-24 h-2 bg-white/20 rounded-full overflow-hidden">
+                <div 
+                  className="h-full bg-gradient-to-r from-star-gold to-yellow-300 rounded-full transition-all duration-1000"
+                  style={{ width: `${(confidence_score || 0.8) * 100}%` }}
+                />
+              </div>
+              <span className="text-star-gold font-semibold">{Math.round((confidence_score || 0.8) * 100)}%</span>
             </div>
-            <span className="text-star-gold font-semibold">{Math.round((confidence_score || 0.8) * 100)}%</span>
           </div>
         </div>
-      </div>
+      )}
 
       {/* Analysis Summary */}
       {analysis && Object.keys(analysis).length > 0 && (
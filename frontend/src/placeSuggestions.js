@@ -0,0 +1,35 @@
+// Birth place autocomplete: asks /api/places for cities matching what
+// has been typed so far, once typing pauses, and drops stale answers.
+import { useEffect, useState } from 'react'
+
+const DEBOUNCE_MS = 150
+
+export function usePlaceSuggestions(query, country = '') {
+  const [places, setPlaces] = useState([])
+
+  useEffect(() => {
+    const q = query.trim()
+    if (q.length < 2) {
+      setPlaces([])
+      return
+    }
+    const controller = new AbortController()
+    const timer = setTimeout(async () => {
+      try {
+        const params = new URLSearchParams({ q, country })
+        const response = await fetch(`/api/places?${params}`, { signal: controller.signal })
+        if (response.ok) {
+          setPlaces((await response.json()).places)
+        }
+      } catch {
+        // Aborted by newer input, or offline: keep the old suggestions
+      }
+    }, DEBOUNCE_MS)
+    return () => {
+      clearTimeout(timer)
+      controller.abort()
+    }
+  }, [query, country])
+
+  return places
+}
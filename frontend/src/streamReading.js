@@ -0,0 +1,58 @@
+// Reads an NDJSON reading stream (?stream=ndjson) and reports the
+// partially assembled result after every event, so the UI can render
+// the chart summary before the written sections arrive.
+
+const applyEvent = (result, { event, data }) => {
+  switch (event) {
+    case 'head':
+      return { ...result, ...data }
+    case 'field':
+      return { ...result, [data.name]: data.value }
+    case 'item':
+      return { ...result, [data.field]: [...(result[data.field] || []), data.value] }
+    default:
+      return result
+  }
+}
+
+const errorMessage = async (response, fallback) => {
+  try {
+    const body = await response.json()
+    return typeof body.detail === 'string' ? body.detail : fallback
+  } catch {
+    return fallback
+  }
+}
+
+export async function streamReading(url, payload, onUpdate, fallbackError) {
+  const response = await fetch(`${url}?stream=ndjson`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(payload)
+  })
+  if (!response.ok) {
+    throw new Error(await errorMessage(response, fallbackError))
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let result = {}
+
+  const handleLine = (line) => {
+    if (!line.trim()) return
+    result = applyEvent(result, JSON.parse(line))
+    onUpdate(result)
+  }
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    const lines = buffer.split('\n')
+    buffer = lines.pop()
+    lines.forEach(handleLine)
+  }
+  handleLine(buffer + decoder.decode())
+  return result
+}